@@ -1,13 +1,15 @@
 # copyright PhantomFX 2024
+from __future__ import annotations
 from abc import ABC, abstractmethod
 import logging
-import json
 from pathlib import Path
-import importlib.util
 
-import pymel.core as pm
+from ....core.ptx_lazy_import import lazy_import
+from ....core.ptx_module_registry import registry
+from ....core.ptx_trace import call_asset, span, trace_subclass_method
 
-logging.basicConfig(level=logging.WARNING)
+# pymel is only imported the first time a process actually touches the scene
+pm = lazy_import("pymel.core")
 
 
 class MayaProcessBase(ABC):
@@ -24,6 +26,11 @@ class MayaProcessBase(ABC):
         #  2: The process succeeded
         self.__process_state: int = -1
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Every process implementation records a span when tracing is on
+        trace_subclass_method(cls, "process")
+
     @property
     def process_state(self):
         return self.__process_state
@@ -42,6 +49,16 @@ class MayaProcessBase(ABC):
         """
         pass
 
+    async def process_async(self) -> int:
+        """
+        * Awaitable counterpart of process(); returns the process state, with the same meaning.
+        * The default implementation runs process() on the event loop's thread, as Maya commands
+        * have to run on the main thread; it blocks the loop, so it doesn't overlap with anything.
+        * Override it in processes that wait on a child process, eg: through run_subprocess_async.
+        """
+        self.process()
+        return self.process_state
+
 
 class MayaExportProcessBase(MayaProcessBase):
     """
@@ -162,9 +179,8 @@ class MayaProcessFactory:
     * The "Factory" class to return an initialized object of the particular type of process
     """
     def __init__(self) -> None:
-        self._processes = dict()
-        with open(f"{Path(__file__).parent}/maya_processes.conf") as file:
-            self._processes = json.load(file)
+        # The conf is parsed once per process and shared between factory instances
+        self._processes = registry.config(f"{Path(__file__).parent}/maya_processes.conf")
 
     def register_process(self, proc_type, proc):
         """
@@ -176,7 +192,7 @@ class MayaProcessFactory:
         if proc not in self._processes[proc_type].keys():
             raise ValueError("Given process isn't registered with the system")
                 
-        return importlib.util.find_spec(".".join(['ptx_publish', 'app_modules', 'maya', 'interchange', self._processes[proc_type][proc]]))
+        return registry.find_spec(".".join(['ptx_publish', 'app_modules', 'maya', 'interchange', self._processes[proc_type][proc]]))
 
     def create(self, mod_spec, *args, **kwargs):
         """
@@ -185,6 +201,6 @@ class MayaProcessFactory:
         if mod_spec == None:
             raise ValueError("Invalid module specified")
         
-        mod = mod_spec.loader.load_module()
-        NodeBuilder = mod.ProcessNodeBuilder()
-        return NodeBuilder(*args, **kwargs)
\ No newline at end of file
+        with span("MayaProcessFactory.create", call_asset(args, kwargs), module=mod_spec.name):
+            NodeBuilder = registry.builder(mod_spec, "ProcessNodeBuilder")()
+            return NodeBuilder(*args, **kwargs)
\ No newline at end of file
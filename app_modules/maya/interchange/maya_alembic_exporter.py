@@ -1,10 +1,12 @@
-import pymel.core as pm
+from ....core.ptx_lazy_import import lazy_import
 from ..factories.maya_process_factory import MayaExportProcessBase
 from ..utils import alembic_utils as au
 
 import logging
 from pathlib import Path
 
+pm = lazy_import("pymel.core")
+
 
 class MayaAlembicExporter(MayaExportProcessBase):
     def __init__(self, *args, **kwargs) -> None:
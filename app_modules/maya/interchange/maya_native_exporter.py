@@ -1,9 +1,11 @@
-import pymel.core as pm
+from ....core.ptx_lazy_import import lazy_import
 from ..factories.maya_process_factory import MayaExportProcessBase
 
 import logging
 from pathlib import Path
 
+pm = lazy_import("pymel.core")
+
 
 class MayaNativeExporter(MayaExportProcessBase):
     __extension_map__ = {"mataAscii": "ma", "mayaBinary": "mb"}
@@ -1,8 +1,10 @@
-import pymel.core as pm
+from ....core.ptx_lazy_import import lazy_import
 from ..factories.maya_process_factory import MayaImportProxyProcessBase
 
 import logging
 
+pm = lazy_import("pymel.core")
+
 
 class MayaNativeImporter(MayaImportProxyProcessBase):
     def __init__(self, *args, **kwargs) -> None:
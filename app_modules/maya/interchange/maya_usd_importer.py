@@ -1,9 +1,11 @@
-import pymel.core as pm
+from ....core.ptx_lazy_import import lazy_import
 from ..factories.maya_process_factory import MayaImportProxyProcessBase
 from ..utils import usd_utils as uu
 
 import logging
 
+pm = lazy_import("pymel.core")
+
 
 class MayaUsdImporter(MayaImportProxyProcessBase):
     def __init__(self, *args, **kwargs) -> None:
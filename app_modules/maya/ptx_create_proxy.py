@@ -1,9 +1,11 @@
-import pymel.core as pm
+from ...core.ptx_lazy_import import lazy_import
 from ...core.ptx_publish_factory import AssetInfo, Passive
 from .factories import maya_process_factory as mpf
 
 import logging
 
+pm = lazy_import("pymel.core")
+
 
 class PtxCreateProxy(Passive):
     """
@@ -35,6 +37,10 @@ class PtxCreateProxy(Passive):
         # Set the publish state to the minimum of the exporter and proxy process states
         self.publish_state = self.__proxy.process_state
 
+    def input_files(self):
+        # The cache the proxy is created from
+        return super().input_files() + ([self.export_path] if self.export_path else [])
+
     def reroute_proxy(self, new_path: str):
         return super().reroute_proxy(new_path)
 
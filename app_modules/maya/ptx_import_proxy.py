@@ -1,9 +1,11 @@
-import pymel.core as pm
+from ...core.ptx_lazy_import import lazy_import
 from ...core.ptx_publish_factory import Activate, AssetInfo
 from .factories import maya_process_factory as mpf
 
 import logging
 
+pm = lazy_import("pymel.core")
+
 
 class PtxImportProxy(Activate):
     """
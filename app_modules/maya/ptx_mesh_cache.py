@@ -1,9 +1,12 @@
-import pymel.core as pm
+from ...core.ptx_lazy_import import lazy_import
 from ...core.ptx_publish_factory import AssetInfo, Passive
 from .factories import maya_process_factory as mpf
 
 import logging
 
+pm = lazy_import("pymel.core")
+cmds = lazy_import("maya.cmds")
+
 
 class PtxGenerateMeshCache(Passive):
     """
@@ -37,9 +40,18 @@ class PtxGenerateMeshCache(Passive):
 
         # Set the export path to the export path generated by the exporter
         self.export_path = self.__exporter.export_path
+        self.out_file = self.export_path
 
         self.publish_state = self.__exporter.process_state
 
+    def input_files(self):
+        # The saved scene the cache is generated from
+        return super().input_files() + [pm.sceneName()]
+
+    def cacheable(self):
+        # Unsaved edits aren't in the saved scene the fingerprint is taken from
+        return bool(pm.sceneName()) and not cmds.file(q=True, modified=True)
+
     def reroute_proxy(self, new_path: str):
         pass
 
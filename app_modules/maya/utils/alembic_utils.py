@@ -1,10 +1,12 @@
 """
 * A set of utilities for creating almebic files from Maya
 """
-import pymel.core as pm
+from ....core.ptx_lazy_import import lazy_import
 from pathlib import Path
 import logging
 
+pm = lazy_import("pymel.core")
+
 
 def generate_abc_command(node_list, out_file, start, end, attr_list=[], no_normals=False, uv_write=True, write_color_sets=True, write_face_sets=True,
                          whole_frame_geo=True, world_space=True, write_visibility=True, strip_namespaces=True, euler_filter=True, auto_subd=True,
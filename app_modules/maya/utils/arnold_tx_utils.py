@@ -1,12 +1,15 @@
 """
 * A set of utilities for arnold in maya
 """
-import pymel.core as pm
+from ....core.ptx_lazy_import import lazy_import
+from ....core.ptx_async_utils import run_subprocess_async
 import os
 import glob
 import logging
 import subprocess
 
+pm = lazy_import("pymel.core")
+
 
 def list_textures():
     """
@@ -23,23 +26,37 @@ def list_textures():
     return tex_list
 
 
-def create_txfile(file_path, output_folder, task_id, show_name, rez_activate='P:/TOOLS/rez/activate_rez.cmd'):
+def txfile_command(file_path, output_folder, task_id, show_name, rez_activate='P:/TOOLS/rez/activate_rez.cmd'):
     """
     * @param file_path: type str: path of the texture
     * @param output_folder: type str: path of where we want to store the tx files
     * @param task_id: type str: the task id of the process
     * @param show_name: type str: name of the show
     * @param rez_activate: type str: path to the rez.cmd
-    * Starts a process to convert textures into arnold's native tx format
+    * Builds the shell command that converts a texture into arnold's native tx format
     """
     tx_file = file_path.replace(f"{os.path.splitext(file_path)[-1]}", '.tx')
     tx_out_file = f'{output_folder}/{os.path.basename(tx_file)}'.replace('\\', '/')
+    tex_file = file_path.replace('\\', '/')
     env = f'set task_id={task_id}'
     cmd = f'{env}&& {rez_activate} && rez-env maya {show_name}_maya arnold --maketx '
-    cmd += f'"-v" "-u" "-oiio" "--checknan" "ACEScg" {file_path.replace("\\", "/")} "--format" "exr" "-d" "half" '
+    cmd += f'"-v" "-u" "-oiio" "--checknan" "ACEScg" {tex_file} "--format" "exr" "-d" "half" '
     cmd += f'"--compression" "dwaa" "-o" "{tx_out_file}"'
-    
-    logging.info(f'cmd: {0}'.format(cmd))
+
+    logging.info(f'cmd: {cmd}')
+    return cmd
+
+
+def create_txfile(file_path, output_folder, task_id, show_name, rez_activate='P:/TOOLS/rez/activate_rez.cmd'):
+    """
+    * @param file_path: type str: path of the texture
+    * @param output_folder: type str: path of where we want to store the tx files
+    * @param task_id: type str: the task id of the process
+    * @param show_name: type str: name of the show
+    * @param rez_activate: type str: path to the rez.cmd
+    * Starts a process to convert textures into arnold's native tx format
+    """
+    cmd = txfile_command(file_path, output_folder, task_id, show_name, rez_activate)
 
     result = subprocess.Popen(cmd, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
     out, err = result.communicate()
@@ -48,6 +65,19 @@ def create_txfile(file_path, output_folder, task_id, show_name, rez_activate='P:
     return (out, err)
 
 
+async def create_txfile_async(file_path, output_folder, task_id, show_name, rez_activate='P:/TOOLS/rez/activate_rez.cmd'):
+    """
+    * Awaitable counterpart of create_txfile; lets many conversions run side by side in one
+    * event loop, eg: gather_limited([create_txfile_async(tex, ...) for tex in list_textures()], 8)
+    """
+    cmd = txfile_command(file_path, output_folder, task_id, show_name, rez_activate)
+
+    out, err, _ = await run_subprocess_async(cmd, shell=True)
+    logging.info(out)
+    logging.info(err)
+    return (out, err)
+
+
 def replace_txfiles():
     """
     * Replace the path to the texture file in the fileTextureNode to the equivalent .tx file path
@@ -1,9 +1,11 @@
 """
 * A set of utilities to manage references inside a maya scene
 """
-import pymel.core as pm
+from ....core.ptx_lazy_import import lazy_import
 import logging
 
+pm = lazy_import("pymel.core")
+
 
 def clear_namespaces():
     """
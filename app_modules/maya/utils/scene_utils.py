@@ -0,0 +1,19 @@
+"""
+* A set of utilities to manage the maya scene itself
+"""
+from ....core.ptx_lazy_import import lazy_import
+import logging
+import os
+
+pm = lazy_import("pymel.core")
+
+
+def open_scene(scene_path: str):
+    """
+    * Open the scene, discarding any unsaved changes to the current one, eg: in a batch publish worker
+    """
+    if not os.path.isfile(scene_path):
+        raise FileNotFoundError(f"Scene {scene_path} doesn't exist")
+
+    logging.info(f'Opening {scene_path}')
+    pm.openFile(scene_path, force=True)
@@ -1,10 +1,12 @@
 """
 * A set of utilities for creating usd files from Maya
 """
-import pymel.core as pm
+from ....core.ptx_lazy_import import lazy_import
 from pathlib import Path
 import logging
 
+pm = lazy_import("pymel.core")
+
 
 def export_usd(file:str, append=False, chaser="", chaserArgs=[], convertMaterialsTo="UsdPreviewSurface", compatibility="", defaultCameras=False, 
                defaultMeshScheme="catmullClark", defaultUSDFormat="usdc", eulerFilter=False, exportBlendShapes=False, exportCollectionBasedBindings=False,
@@ -0,0 +1,219 @@
+"""
+Profiles what a published asset costs downstream: opening, loading, bounding and binding resolution
+of its GEO layer, the way a viewer or a renderer would hit them.
+
+- open_load_none / open_load_all: Usd.Stage.Open with payloads unloaded / all loaded
+- payload_load: Usd.Stage.Load of every payload prim one at a time, on the stage opened with LoadNone
+- bbox_first_query: the first UsdGeom.BBoxCache.ComputeWorldBound of the asset root, once loaded
+- binding_resolve: UsdShade.MaterialBindingAPI.ComputeBoundMaterial of every mesh, one at a time,
+  and binding_resolve_bulk: ComputeBoundMaterials over all of them at once
+
+Every repeat runs in a fresh worker process so none of the asset's layers is open yet. The first stage
+a process opens also pays for loading the plugins, the schema registry and the file format, whichever
+load policy it uses, so the worker warms those up on an anonymous stage before timing anything; that
+one-time cost is reported on its own as registry_warmup. The timings are the medians over the repeats. The report is json, with the compose manifest options of the asset
+when there is one, so profiles of different compose options and versions can be compared:
+
+python -m ptx_publish.app_modules.usd.composers.ptx_asset_profiler /show/asset/usd Character Alien --usd-format usdc --json alien.json
+python -m ptx_publish.app_modules.usd.composers.ptx_asset_profiler /show/asset/usd Character Alien --usd-format usdc --baseline alien.json
+"""
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import statistics
+import time
+
+from ptx_publish.app_modules.usd.composers import ptx_compose_validator as pcv
+from ptx_publish.app_modules.usd.composers import ptx_looks_utils as plu
+
+
+# The timings compare_profiles compares, all in seconds
+__TIMINGS__ = ("open_load_none", "open_load_all", "payload_load_total", "bbox_first_query",
+               "binding_resolve_total", "binding_resolve_bulk")
+
+
+def _distribution(values: List[float]) -> Dict:
+    values = sorted(values)
+    if not values:
+        return {"count": 0, "total": 0.0}
+    return {"count": len(values), "total": sum(values), "mean": statistics.fmean(values), "p50": values[len(values) // 2],
+            "p95": values[min(len(values) - 1, int(len(values) * 0.95))], "max": values[-1]}
+
+
+def _warm_up_registries(file_format: str):
+    """
+    Load what the first stage of a process pays for: the plugins, the schema registry and the file
+    format of the layers, on an anonymous stage with a bound mesh
+    """
+    from pxr import Sdf, Usd, UsdGeom, UsdShade
+
+    stage = Usd.Stage.Open(Sdf.Layer.CreateAnonymous(f"warm_up{file_format}"), Usd.Stage.LoadAll)
+    mesh = UsdGeom.Mesh.Define(stage, "/warm_up/mesh")
+    material = UsdShade.Material.Define(stage, "/warm_up/material")
+    UsdShade.Shader.Define(stage, "/warm_up/material/shader")
+    UsdShade.MaterialBindingAPI.Apply(mesh.GetPrim()).Bind(material)
+    UsdGeom.BBoxCache(Usd.TimeCode.Default(), [UsdGeom.Tokens.default_]).ComputeWorldBound(stage.GetPseudoRoot())
+    UsdShade.MaterialBindingAPI(mesh.GetPrim()).ComputeBoundMaterial()
+
+
+def _profile_once(geo_path: str, max_payloads: int = 0, slowest: int = 10) -> Dict:
+    """
+    One pass of every measurement; runs in a fresh worker.
+    """
+    from pxr import Usd, UsdGeom, UsdShade
+
+    start = time.perf_counter()
+    _warm_up_registries(os.path.splitext(geo_path)[1] or ".usda")
+    registry_warmup = time.perf_counter() - start
+
+    timings = {}
+    start = time.perf_counter()
+    stage = Usd.Stage.Open(geo_path, Usd.Stage.LoadNone)
+    timings["open_load_none"] = time.perf_counter() - start
+
+    payload_prims = [prim.GetPath() for prim in Usd.PrimRange.Stage(stage, Usd.PrimAllPrimsPredicate)
+                     if prim.HasAuthoredPayloads()]
+    if max_payloads:
+        payload_prims = payload_prims[:max_payloads]
+    payload_times = []
+    for prim_path in payload_prims:
+        start = time.perf_counter()
+        stage.Load(prim_path)
+        payload_times.append(time.perf_counter() - start)
+    timings["payload_load_total"] = sum(payload_times)
+    del stage
+
+    start = time.perf_counter()
+    stage = Usd.Stage.Open(geo_path, Usd.Stage.LoadAll)
+    timings["open_load_all"] = time.perf_counter() - start
+
+    root_prim = stage.GetDefaultPrim() or stage.GetPseudoRoot()
+    start = time.perf_counter()
+    bbox_cache = UsdGeom.BBoxCache(Usd.TimeCode.Default(), [UsdGeom.Tokens.default_, UsdGeom.Tokens.render])
+    bound = bbox_cache.ComputeWorldBound(root_prim)
+    timings["bbox_first_query"] = time.perf_counter() - start
+
+    meshes = [prim for prim in stage.Traverse() if prim.IsA(UsdGeom.Mesh)]
+    binding_times = []
+    unbound = 0
+    for prim in meshes:
+        start = time.perf_counter()
+        material, _ = UsdShade.MaterialBindingAPI(prim).ComputeBoundMaterial()
+        binding_times.append(time.perf_counter() - start)
+        unbound += 0 if material else 1
+    timings["binding_resolve_total"] = sum(binding_times)
+
+    start = time.perf_counter()
+    UsdShade.MaterialBindingAPI.ComputeBoundMaterials(meshes)
+    timings["binding_resolve_bulk"] = time.perf_counter() - start
+
+    slowest_payloads = sorted(zip(payload_times, payload_prims), key=lambda item: item[0], reverse=True)[:slowest]
+    return {"timings": timings, "registry_warmup": registry_warmup,
+            "payload_load": {**_distribution(payload_times),
+                             "slowest": [{"prim": str(path), "time": value} for value, path in slowest_payloads]},
+            "binding_resolve": _distribution(binding_times),
+            "counts": {"prims_loaded": sum(1 for _ in stage.Traverse()), "payload_prims": len(payload_prims),
+                       "meshes": len(meshes), "unbound_meshes": unbound},
+            "bound_empty": bound.GetRange().IsEmpty(),
+            "usd_version": ".".join(str(part) for part in Usd.GetVersion())}
+
+
+def profile_layers(geo_path: str, repeat: int = 3, max_payloads: int = 0) -> Dict:
+    """
+    Profile the GEO layer of an asset.
+
+    :param geo_path:      type str:   The GEO layer of the asset
+    :param repeat:        type int:   How many fresh workers to profile in; the timings are their medians
+    :param max_payloads:  type int:   Only load this many payload prims one at a time; all of them by default
+
+    :return: type dict : {"timings": {name: seconds}, "timings_per_run", "registry_warmup", "payload_load", "binding_resolve", "counts", ...}
+    """
+    ctx = multiprocessing.get_context("spawn")
+    runs = []
+    for _ in range(max(1, repeat)):
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+            runs.append(pool.submit(_profile_once, geo_path, max_payloads).result())
+
+    timings = {key: statistics.median(run["timings"][key] for run in runs) for key in __TIMINGS__}
+    # The distributions come from the run closest to the median, rather than being mixed across runs
+    median_run = min(runs, key=lambda run: abs(run["timings"]["open_load_all"] - timings["open_load_all"]))
+    return {"repeat": len(runs), "usd_version": runs[0]["usd_version"], "timings": timings,
+            "timings_per_run": [run["timings"] for run in runs],
+            "registry_warmup": statistics.median(run["registry_warmup"] for run in runs),
+            **{key: median_run[key] for key in ("payload_load", "binding_resolve", "counts", "bound_empty")}}
+
+
+def profile_composed_asset(usd_base_location: str, asset_type: str, asset_name: str, usd_format: str = "usda",
+                           repeat: int = 3, max_payloads: int = 0, label: str = "") -> Dict:
+    """
+    Profile the layers compose_pfx_usd wrote for an asset, see profile_layers. The report also carries
+    the layer sizes and the compose options of the asset's manifest, to tell profiles apart.
+
+    :param label:     type str:   A label for the report, eg: the compose options or the version under test
+
+    :return: type dict
+    """
+    paths = pcv.composed_layer_paths(usd_base_location, asset_type, asset_name, usd_format)
+    manifest = plu.read_manifest(f"{usd_base_location}/compose_manifest_{asset_type}_{asset_name}.json") or {}
+    report = {"asset": f"{asset_type}_{asset_name}", "label": label, "profiled_at": time.time(),
+              "host": platform.node(), "python": platform.python_version(), "layers": paths,
+              "layer_size_bytes": {key: os.path.getsize(path) for key, path in paths.items() if os.path.exists(path)},
+              "compose_options": manifest.get("options"), "materials": len(manifest.get("materials", {})) or None}
+    report.update(profile_layers(paths["geo"], repeat, max_payloads))
+    timings = report["timings"]
+    logging.info(f"{asset_name}: warm-up {report['registry_warmup']:.3f}s, open {timings['open_load_none']:.3f}s (none) {timings['open_load_all']:.3f}s (all), "
+                 f"payloads {timings['payload_load_total']:.3f}s, bbox {timings['bbox_first_query']:.3f}s, "
+                 f"bindings {timings['binding_resolve_total']:.3f}s")
+    return report
+
+
+def compare_profiles(profile: Dict, baseline: Dict, threshold: float = 0.15) -> List[str]:
+    """
+    The timings that grew by more than the threshold (a fraction) against the baseline profile
+
+    :return: type List[str]
+    """
+    regressions = []
+    for key in __TIMINGS__:
+        base, current = baseline.get("timings", {}).get(key), profile["timings"].get(key)
+        if base and current is not None and current > base * (1.0 + threshold):
+            regressions.append(f"{key}: {base:.4f}s -> {current:.4f}s ({(current / base - 1.0) * 100.0:+.0f}%)")
+    return regressions
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+    parser = argparse.ArgumentParser(description='Profile the open, load, bbox and binding resolution times of a composed asset.')
+    parser.add_argument('usd_base_location', type=str, help='The folder compose_pfx_usd wrote the layers to')
+    parser.add_argument('asset_type', type=str, help='The asset type')
+    parser.add_argument('asset_name', type=str, help='The asset name')
+    parser.add_argument('--usd-format', choices=['usda', 'usdc', 'usd'], default='usda', help='The format of the layers')
+    parser.add_argument('--repeat', type=int, default=3, help='Fresh workers to profile in; the timings are their medians')
+    parser.add_argument('--max-payloads', type=int, default=0, help='Only load this many payload prims one at a time')
+    parser.add_argument('--label', type=str, default='', help='A label for the report, eg: the compose options under test')
+    parser.add_argument('--json', dest='json_path', default='', help='Optional path to write the report to')
+    parser.add_argument('--baseline', type=str, default='', help='A report of the same asset to compare against')
+    parser.add_argument('--threshold', type=float, default=0.15, help='Allowed timing growth against the baseline')
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    report = profile_composed_asset(args.usd_base_location, args.asset_type, args.asset_name, args.usd_format,
+                                    args.repeat, args.max_payloads, args.label)
+    if args.json_path:
+        with open(args.json_path, 'w') as file:
+            json.dump(report, file, indent=4)
+    else:
+        print(json.dumps(report, indent=4))
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare_profiles(report, json.load(file), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        sys.exit(1 if regressions else 0)
@@ -1,11 +1,37 @@
-from dataclasses import dataclass, fields
-from pxr import Usd, Sdf, UsdGeom, Kind, Gf, UsdShade, Tf
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from functools import lru_cache, partial
 from pathlib import Path
-from typing import List
+from typing import Callable, Dict, Iterable, List
+import hashlib
+import logging
+import multiprocessing
 import os
+import sys
+import tempfile
 
-from chitragupta.ptx_data_structs import ptx_usd_structs as ptusds
+from ptx_publish.core.ptx_lazy_import import lazy_import
+from ptx_publish.core.ptx_async_utils import run_subprocess_async
+from ptx_publish.core.ptx_trace import span
 from ptx_publish.app_modules.usd.factories import phantom_usd_factory as puf
+from ptx_publish.app_modules.usd.composers import ptx_looks_utils as plu
+from ptx_publish.app_modules.usd.composers import ptx_stage_pool as psp
+from ptx_publish.app_modules.usd.shaders import shader_inputs as psi
+
+# pxr and chitragupta are only imported once a compose actually runs
+Usd = lazy_import("pxr.Usd")
+Sdf = lazy_import("pxr.Sdf")
+UsdGeom = lazy_import("pxr.UsdGeom")
+Kind = lazy_import("pxr.Kind")
+Gf = lazy_import("pxr.Gf")
+UsdShade = lazy_import("pxr.UsdShade")
+Tf = lazy_import("pxr.Tf")
+ptusds = lazy_import("chitragupta.ptx_data_structs.ptx_usd_structs")
+
+# Layer formats compose_pfx_usd can write; .usd layers are written with crate (binary) encoding
+__USD_FORMATS__ = ("usda", "usdc", "usd")
 
 __MATERIALX_PARAM_WHITELIST__ = {"base": "base", "baseColor": "base_color", "diffuseRoughness": "diffuse_roughness", "normalColor": "normal", "tangent": "tangent",  
                                  "metalness": "metalness", "specular": "specular", "specularColor": "specular_color", "specularRoughness": "specular_roughness",
@@ -28,6 +54,8 @@ class PhantomMatStruct:
     meshes: List
     parameters: List
     sg_node: str = ""
+    # Names of the identical materials merged into this one, see ptx_looks_utils.merge_identical_materials
+    merged_names: List = field(default_factory=list)
 
 
 def convert_to_relative_path(abs_path: str, base_path: str) -> str:
@@ -42,23 +70,44 @@ def convert_to_relative_path(abs_path: str, base_path: str) -> str:
     return os.path.relpath(abs_path, base_path)
 
 
-def usd_stage(pfx_stage_path: str, stage_up_axis: UsdGeom.Tokens = UsdGeom.Tokens.y) -> Usd.Stage:
+def usd_stage(pfx_stage_path: str, stage_up_axis: UsdGeom.Tokens = None) -> Usd.Stage:
     """
     Take a path, and see if a USD stage exists here.
     If it exists, just open the stage and return it. If it doesn't, create a new usd stage
-    at that location.
+    at that location. With an active ptx_stage_pool.StagePool, the stage comes from the pool.
     :param pfx_stage_path:    type str:               The path of the USD stage on disk
     :param stage_up_axis:     type UsdGeom.Tokens:    The Up-Axis to use for this stage. By default, it's Y-Axis 
     
     :return: type Usd.Stage 
     """
+    pool = psp.active_pool()
+    if pool is None:
+        return _open_or_create_stage(pfx_stage_path, Usd.Stage.LoadAll, stage_up_axis)
+
+    if not Path(pfx_stage_path).exists():
+        # Don't hand back a pooled stage of a layer that's gone from disk, nor keep it alive in another pooled stage
+        pool.evict_layer(pfx_stage_path)
+    return pool.open(pfx_stage_path, opener=partial(_open_or_create_stage, stage_up_axis=stage_up_axis))
+
+
+def _open_or_create_stage(pfx_stage_path: str, load: Usd.Stage.InitialLoadSet, stage_up_axis: UsdGeom.Tokens = None) -> Usd.Stage:
+    """
+    Open the stage at the path with the given load policy, or create it
+    """
+    if stage_up_axis is None:
+        stage_up_axis = UsdGeom.Tokens.y
+
     usd_stage = None
     # Create the payload stage and save it
     if not Path(pfx_stage_path).exists():
-        usd_stage = Usd.Stage.CreateNew(pfx_stage_path)
+        if Path(pfx_stage_path).suffix == ".usd":
+            # Don't leave the encoding of .usd layers to USD_DEFAULT_FILE_FORMAT
+            usd_stage = Usd.Stage.Open(Sdf.Layer.CreateNew(pfx_stage_path, args={"format": "usdc"}), load)
+        else:
+            usd_stage = Usd.Stage.CreateNew(pfx_stage_path, load)
         UsdGeom.SetStageUpAxis(usd_stage, stage_up_axis)
     else:
-        usd_stage = Usd.Stage.Open(pfx_stage_path)
+        usd_stage = Usd.Stage.Open(pfx_stage_path, load)
 
     return usd_stage
 
@@ -156,6 +205,34 @@ def usd_mesh_payload(stage: Usd.Stage, prim_path: str, extern_payload_path: str,
     return mesh_payload
 
 
+def usd_group_payload(stage: Usd.Stage, prim_path: str, extern_payload_path: str, payload_prim_path: str) -> Usd.Prim:
+    """
+    Get the Xform prim carrying the payload of a whole group (or of the whole asset), creating it,
+    its missing ancestors and the payload if they don't exist.
+    
+    :param stage:                     type Usd.Stage: The USD stage to add the payload prim to
+    :param prim_path:                 type str:       The stage relative path of the group
+    :param extern_payload_path:       type str:       The path to the payload on storage
+    :param payload_prim_path:         type str:       The path of the group in the payload file
+     
+    :return: type Usd.Prim 
+    """
+    prim_path = Sdf.Path(prim_path)
+    for prefix in prim_path.GetPrefixes():
+        if not stage.GetPrimAtPath(prefix):
+            UsdGeom.Xform.Define(stage, prefix)
+
+    group_prim: Usd.Prim = stage.GetPrimAtPath(prim_path)
+    payload = Sdf.Payload(extern_payload_path, Sdf.Path(payload_prim_path))
+    for prim_spec in group_prim.GetPrimStack():
+        if payload in prim_spec.payloadList.prependedItems:
+            return group_prim
+
+    group_prim.GetPayloads().AddPayload(payload)
+    UsdShade.MaterialBindingAPI.Apply(group_prim)
+    return group_prim
+
+
 def usd_scope(stage: Usd.Stage, parent_prim: Usd.Prim = None, scope_name: str = "Scope") -> Usd.Prim:
     """
     Define a scope in the stage. If we have a valid parent prim, define the scope
@@ -171,8 +248,79 @@ def usd_scope(stage: Usd.Stage, parent_prim: Usd.Prim = None, scope_name: str =
     return geom_scope
 
 
+@lru_cache(maxsize=None)
+def mtlx_param_types(shader_prim: str = "aiStandardSurface") -> Dict[str, tuple]:
+    """
+    Resolve the MaterialX whitelist against the shader inputs of the shader node, once per process.
+    
+    :param shader_prim:    type str:       The shader prim registered under "shaders" in phantom_usd_defs.conf
+    
+    :return: type dict : Maya parameter name -> (shader input name, ptusds.UsdAttributeType)
+    """
+    p_fac = puf.PhantomUsdFactory()
+    mtlx_node = p_fac.create(p_fac.register_usd_type("shaders", shader_prim), "MtlX", [])
+    # The shader inputs are InitVars backed by descriptors (see shaders/shader_inputs), which fields() doesn't list
+    attr_types = psi.input_types(type(mtlx_node))
+
+    param_types = {}
+    for maya_name, input_name in __MATERIALX_PARAM_WHITELIST__.items():
+        if input_name not in attr_types:
+            logging.warning(f"{shader_prim} has no input {input_name}; {maya_name} won't be exported")
+            continue
+        param_types[maya_name] = (input_name, attr_types[input_name]().type)
+    return param_types
+
+
+def _author_bool(input_name: str, value_type, stage: Usd.Stage, mat_path: Sdf.Path, shader: UsdShade.Shader, param: dict, mtl_name: str,
+                 textures: SharedTextures = None):
+    shader.CreateInput(input_name, value_type).Set(param["value"] == "true")
+
+
+def _author_float(input_name: str, value_type, stage: Usd.Stage, mat_path: Sdf.Path, shader: UsdShade.Shader, param: dict, mtl_name: str,
+                  textures: SharedTextures = None):
+    shader.CreateInput(input_name, value_type).Set(param["value"])
+
+
+def _author_vec3(input_name: str, value_type, stage: Usd.Stage, mat_path: Sdf.Path, shader: UsdShade.Shader, param: dict, mtl_name: str,
+                 textures: SharedTextures = None):
+    if "texture" in param and textures is not None:
+        tex_node = usd_shared_texture(stage, textures, param["texture"]["path"], input_name)
+        shader.CreateInput(input_name, value_type).ConnectToSource(tex_node.ConnectableAPI(), "rgb")
+    elif "texture" in param:
+        tex_node, coord_node = usd_create_texture(stage, stage.GetPrimAtPath(mat_path), param["texture"]["path"], input_name, None, mtl_name)
+        shader.CreateInput(input_name, value_type).ConnectToSource(tex_node.ConnectableAPI(), "rgb")
+    else:
+        val_arr = param["value"]
+        shader.CreateInput(input_name, value_type).Set(Gf.Vec3f(val_arr[0], val_arr[1], val_arr[2]))
+
+
+@lru_cache(maxsize=None)
+def mtlx_param_dispatch(shader_prim: str = "aiStandardSurface") -> Dict[str, Callable]:
+    """
+    Compile the whitelist, the shader field types and the Sdf value types into a dispatch table,
+    so authoring a parameter is a single dict lookup and a call. Built once per process.
+    Every routine takes (stage, material path, surface shader, parameter record, material name, shared textures).
+    
+    :param shader_prim:    type str:       The shader prim registered under "shaders" in phantom_usd_defs.conf
+    
+    :return: type dict : Maya parameter name -> authoring routine
+    """
+    routines = {
+        ptusds.UsdAttributeType.bool: (_author_bool, Sdf.ValueTypeNames.Bool),
+        ptusds.UsdAttributeType.float: (_author_float, Sdf.ValueTypeNames.Float),
+        ptusds.UsdAttributeType.vector3: (_author_vec3, Sdf.ValueTypeNames.Normal3f),
+    }
+    dispatch = {}
+    for maya_name, (input_name, param_type) in mtlx_param_types(shader_prim).items():
+        # Anything that isn't a bool, float or vector is authored as a color
+        routine, value_type = routines.get(param_type, (_author_vec3, Sdf.ValueTypeNames.Color3f))
+        dispatch[maya_name] = partial(routine, input_name, value_type)
+    return dispatch
+
+
 def usd_create_mtlx(stage: Usd.Stage, parent_prim: Usd.Prim = None, mtl_name: str = "MtlX", mtl_param_list: list = [],
-                    mtlx_type:str = "/__class_mtl__/mtlxmaterial", shader_type:str = "ND_standard_surface_surfaceshader") -> UsdShade.Material:
+                    mtlx_type:str = "/__class_mtl__/mtlxmaterial", shader_type:str = "ND_standard_surface_surfaceshader",
+                    textures: SharedTextures = None) -> UsdShade.Material:
     """
     :Create a mtlx shader and override the parameters that need to be overridden.
     
@@ -182,15 +330,11 @@ def usd_create_mtlx(stage: Usd.Stage, parent_prim: Usd.Prim = None, mtl_name: st
     :param mtl_param_list: type list:      The list of parameters to override
     :param mtlx_type:      type str:       The type of mtlx shader. 
     :param shader_type:    type str:       The type of shader to create.
+    :param textures:       type SharedTextures: Share texture nodes between materials. By default every material gets its own
      
     :return: type UsdShade.Material 
     """
-    # Get an instance of our USDMaterialX Node
-    p_fac = puf.PhantomUsdFactory()
-    mtl_spec = p_fac.register_usd_type("shaders", "aiStandardSurface")
-
-    # Create a materialX node, but as of now we don't need to feed in the mesh list.
-    mtlx_node = p_fac.create(mtl_spec, mtl_name, [])
+    dispatch = mtlx_param_dispatch()
 
     # Get the looks parent prim path
     looks_path = Sdf.Path(parent_prim.GetPath())
@@ -208,31 +352,10 @@ def usd_create_mtlx(stage: Usd.Stage, parent_prim: Usd.Prim = None, mtl_name: st
     shd_std_srf = UsdShade.Shader.Define(stage, mat_path.AppendChild(f"{mtl_name}_standard_surface"))
     shd_std_srf.CreateIdAttr(shader_type)
 
-    find_field = lambda usd_node, field_name: next((f for f in fields(usd_node) if f.name == field_name), None)
-    
     for param in mtl_param_list:
-        if param["name"] in __MATERIALX_PARAM_WHITELIST__.keys():
-            fld = find_field(mtlx_node, __MATERIALX_PARAM_WHITELIST__[param["name"]])
-            texture_info = param.get("texture")
-            param_type = getattr(mtlx_node, fld.name).type
-            if param_type == ptusds.UsdAttributeType.bool:
-                shd_std_srf.CreateInput(fld.name, Sdf.ValueTypeNames.Bool).Set(True if param["value"] == "true" else False)
-            elif param_type == ptusds.UsdAttributeType.float:
-                shd_std_srf.CreateInput(fld.name, Sdf.ValueTypeNames.Float).Set(param["value"])
-            elif param_type == ptusds.UsdAttributeType.vector3:
-                val_arr = param["value"]
-                if "texture" in param.keys():
-                    tex_node, coord_node = usd_create_texture(stage, stage.GetPrimAtPath(mat_path), param["texture"]["path"], __MATERIALX_PARAM_WHITELIST__[param["name"]], ptusds.Float2(1.0, 1.0), mtl_name)
-                    shd_std_srf.CreateInput(fld.name, Sdf.ValueTypeNames.Normal3f).ConnectToSource(tex_node.ConnectableAPI(), "rgb")
-                else:
-                    shd_std_srf.CreateInput(fld.name, Sdf.ValueTypeNames.Normal3f).Set(Gf.Vec3f(val_arr[0], val_arr[1], val_arr[2]))
-            else:
-                val_arr = param["value"]
-                if "texture" in param.keys():
-                    tex_node, coord_node = usd_create_texture(stage, stage.GetPrimAtPath(mat_path), param["texture"]["path"], __MATERIALX_PARAM_WHITELIST__[param["name"]], ptusds.Float2(1.0, 1.0), mtl_name)
-                    shd_std_srf.CreateInput(fld.name, Sdf.ValueTypeNames.Color3f).ConnectToSource(tex_node.ConnectableAPI(), "rgb")
-                else:
-                    shd_std_srf.CreateInput(fld.name, Sdf.ValueTypeNames.Color3f).Set(Gf.Vec3f(val_arr[0], val_arr[1], val_arr[2]))
+        author = dispatch.get(param["name"])
+        if author is not None:
+            author(stage, mat_path, shd_std_srf, param, mtl_name, textures)
 
     # Create the MtlX displacement shader definitions
     shd_displ = UsdShade.Shader.Define(stage, mat_path.AppendChild("Displacement"))
@@ -245,7 +368,7 @@ def usd_create_mtlx(stage: Usd.Stage, parent_prim: Usd.Prim = None, mtl_name: st
     return mat_def
 
 
-def usd_create_texture(stage: Usd.Stage, parent_prim: Usd.Prim, texture_path: str, param_name: str, uv_tile: ptusds.Float2 = ptusds.Float2(1.0, 1.0), mtl_name: str = "MtlX") -> tuple[UsdShade.Shader, UsdShade.Shader]:
+def usd_create_texture(stage: Usd.Stage, parent_prim: Usd.Prim, texture_path: str, param_name: str, uv_tile: ptusds.Float2 = None, mtl_name: str = "MtlX") -> tuple[UsdShade.Shader, UsdShade.Shader]:
     """
     Create a UsdUVTexture node, along with its associated uv coordinate node.
     We also handle creation for normal & tangent maps
@@ -260,6 +383,9 @@ def usd_create_texture(stage: Usd.Stage, parent_prim: Usd.Prim, texture_path: st
     
     :return: type tuple(UsdShade.Shader, UsdShade.Shader)
     """
+    if uv_tile is None:
+        uv_tile = ptusds.Float2(1.0, 1.0)
+
     # define the Textures scope
     tex_scope_path = Sdf.Path(parent_prim.GetPath().AppendChild(f"{mtl_name}Textures"))
     tex_scope = stage.DefinePrim(tex_scope_path, "Scope")
@@ -301,6 +427,102 @@ def usd_create_texture(stage: Usd.Stage, parent_prim: Usd.Prim, texture_path: st
     return (tex_node, uv_node)
 
 
+def texture_settings(param_name: str) -> tuple:
+    """
+    The colour space, scale and bias of the texture read feeding the parameter.
+    Normal and tangent maps are read raw and remapped to -1..1.
+    
+    :param param_name:    type str:       The name of the shader parameter
+    
+    :return: type tuple(str, tuple, tuple)
+    """
+    if "normal" in param_name or "tangent" in param_name:
+        return ("raw", (2.0, 2.0, 2.0, 1.0), (-1.0, -1.0, -1.0, 0.0))
+    return ("sRGB", (1.0, 1.0, 1.0, 1.0), None)
+
+
+class SharedTextures:
+    """
+    Texture reads shared between all the materials of a look. A texture node is keyed by
+    (file, colour space, scale, bias, wrapS, wrapT, uv set) and there's one texcoord node per uv set,
+    all under a single scope, instead of a texture and texcoord node per parameter per material.
+    
+    :param scope_path:    type str:       The path of the scope the shared nodes are defined under
+    """
+    def __init__(self, scope_path: str = "/Looks/SharedTextures") -> None:
+        self.scope_path = Sdf.Path(scope_path)
+        self.tex_nodes: Dict[tuple, object] = {}
+        self.uv_nodes: Dict[int, object] = {}
+
+    @staticmethod
+    def key(texture_path: str, param_name: str, uv_index: int = 0) -> tuple:
+        color_space, scale, bias = texture_settings(param_name)
+        return (texture_path, color_space, scale, bias, "repeat", "repeat", uv_index)
+
+    @staticmethod
+    def prim_name(key: tuple) -> str:
+        """
+        A readable name from the file name, made unique (and stable between runs) by a hash of the key
+        """
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()[:8]
+        return f"{Tf.MakeValidIdentifier(Path(key[0]).stem)}_{digest}_UsdUVTex"
+
+    @staticmethod
+    def uv_prim_name(uv_index: int) -> str:
+        return f"texcoord{uv_index}_UsdUVNode"
+
+
+def usd_shared_texture(stage: Usd.Stage, textures: SharedTextures, texture_path: str, param_name: str, uv_index: int = 0) -> UsdShade.Shader:
+    """
+    Get the shared UsdUVTexture node reading the file with the settings the parameter needs,
+    creating it (and the texcoord node of its uv set) the first time it's asked for.
+    
+    :param stage:         type Usd.Stage:       The USD stage to create the texture under
+    :param textures:      type SharedTextures:  The shared textures of the look
+    :param texture_path:  type str:             The path to the texture file
+    :param param_name:    type str:             The name of the shader parameter the texture feeds
+    :param uv_index:      type int:             The uv set to read the texture with
+    
+    :return: type UsdShade.Shader
+    """
+    key = textures.key(texture_path, param_name, uv_index)
+    tex_node = textures.tex_nodes.get(key)
+    if tex_node is not None:
+        return tex_node
+
+    stage.DefinePrim(textures.scope_path, "Scope")
+
+    uv_node = textures.uv_nodes.get(uv_index)
+    if uv_node is None:
+        uv_node = UsdShade.Shader.Define(stage, textures.scope_path.AppendChild(textures.uv_prim_name(uv_index)))
+        uv_node.CreateIdAttr("ND_texcoord_vector2")
+        uv_node.CreateInput("index", Sdf.ValueTypeNames.Int).Set(uv_index)
+        uv_node.CreateOutput("out", Sdf.ValueTypeNames.Float2)
+        textures.uv_nodes[uv_index] = uv_node
+
+    color_space, scale, bias = texture_settings(param_name)
+    tex_node = UsdShade.Shader.Define(stage, textures.scope_path.AppendChild(textures.prim_name(key)))
+    tex_node.CreateIdAttr("ND_UsdUVTexture")
+    tex_node.CreateInput("file", Sdf.ValueTypeNames.Asset).Set(Sdf.AssetPath(texture_path))
+    tex_node.CreateInput("wrapS", Sdf.ValueTypeNames.Token).Set("repeat")
+    tex_node.CreateInput("wrapT", Sdf.ValueTypeNames.Token).Set("repeat")
+    tex_node.CreateOutput("a", Sdf.ValueTypeNames.Float)
+    tex_node.CreateInput("color_space", Sdf.ValueTypeNames.String).Set(color_space)
+    tex_node.CreateInput("scale", Sdf.ValueTypeNames.Float4).Set(Gf.Vec4f(*scale))
+    if bias is not None:
+        tex_node.CreateInput("bias", Sdf.ValueTypeNames.Float4).Set(Gf.Vec4f(*bias))
+        tex_node.CreateOutput("rgb", Sdf.ValueTypeNames.Normal3f)
+    else:
+        tex_node.CreateOutput("r", Sdf.ValueTypeNames.Float)
+        tex_node.CreateOutput("g", Sdf.ValueTypeNames.Float)
+        tex_node.CreateOutput("b", Sdf.ValueTypeNames.Float)
+        tex_node.CreateOutput("rgb", Sdf.ValueTypeNames.Color3f)
+    tex_node.CreateInput("st", Sdf.ValueTypeNames.Token).ConnectToSource(uv_node.ConnectableAPI(), "out")
+
+    textures.tex_nodes[key] = tex_node
+    return tex_node
+
+
 def usd_apply_material(prim: Usd.Prim, mtl_name: str, mtl: UsdShade.Material, mesh_list: List[UsdGeom.Mesh]):
     """
     Bind the given material to the list of meshes provided. We will use the collection method to bind the
@@ -309,21 +531,242 @@ def usd_apply_material(prim: Usd.Prim, mtl_name: str, mtl: UsdShade.Material, me
     :param prim:      type Usd.Prim:              The USD Prim which is the parent of the list of meshes
     :param mtl_name:  type str:                   Name of the Material we want to create the binding for
     :param mtl        type UsdShade.Material:     The Material Primitive to to create the binding for
-    :param mesh_list: type List[UsdGeom.Mesh]:    The list of USD Meshes to bind the material to
+    :param mesh_list: type List[UsdGeom.Mesh]:    The list of USD Meshes (or their paths) to bind the material to
     """
     mat_bind_api = UsdShade.MaterialBindingAPI.Apply(prim)
     collection_name = f"mat_bind_{mtl_name}"
     collection_api = Usd.CollectionAPI.Apply(prim, collection_name)
-    for each_mesh in mesh_list:
-        collection_api.GetIncludesRel().AddTarget(each_mesh.GetPath())
+    if mesh_list:
+        # One bulk set of the prepended targets rather than an AddTarget (and its change notice) per mesh
+        includes = collection_api.CreateIncludesRel()
+        includes_spec = prim.GetStage().GetEditTarget().GetPropertySpecForScenePath(includes.GetPath())
+        targets = list(includes_spec.targetPathList.prependedItems)
+        known = set(targets)
+        for each_mesh in mesh_list:
+            mesh_path = each_mesh if isinstance(each_mesh, Sdf.Path) else each_mesh.GetPath()
+            if mesh_path not in known:
+                known.add(mesh_path)
+                targets.append(mesh_path)
+        includes_spec.targetPathList.prependedItems = targets
     
     collection_api.GetExpansionRuleAttr().Set(Usd.Tokens.expandPrims)
     mat_bind_api.Bind(collection_api, mtl, collection_name) 
 
 
+def usd_set_kind(prim: Usd.Prim, kind: str):
+    """
+    Set the model kind of the prim, eg: Kind.Tokens.component
+    """
+    Usd.ModelAPI(prim).SetKind(kind)
+
+
+def usd_remove_prim(stage: Usd.Stage, prim_path: str):
+    """
+    Remove the prim, if it exists, from the stage's edit target
+    """
+    if stage.GetPrimAtPath(prim_path):
+        stage.RemovePrim(prim_path)
+
+
+def usd_remove_material_binding(prim: Usd.Prim, mtl_name: str):
+    """
+    Undo usd_apply_material: remove the mat_bind_<mtl_name> collection and its binding from the prim
+    """
+    collection_name = f"mat_bind_{mtl_name}"
+    prim.RemoveAPI(Usd.CollectionAPI, collection_name)
+    for prop_name in (f"collection:{collection_name}:includes", f"collection:{collection_name}:expansionRule",
+                      f"material:binding:collection:{collection_name}"):
+        prim.RemoveProperty(prop_name)
+
+
+def usd_material_custom_data(stage: Usd.Stage, mtl: UsdShade.Material, key: str, value):
+    """
+    Set a custom data entry on the material prim
+    """
+    mtl.GetPrim().SetCustomDataByKey(key, value)
+
+
+def usd_material(stage: Usd.Stage, mtl_path: str) -> UsdShade.Material:
+    """
+    The material at the path, eg: one merged in from a looks shard
+    """
+    return UsdShade.Material(stage.GetPrimAtPath(mtl_path))
+
+
+def merge_looks_shard(shard_layer: Sdf.Layer, layer: Sdf.Layer, prim_path: str = "/Looks"):
+    """
+    Copy the prim specs under prim_path from a looks shard into the looks layer. Prims the layer doesn't
+    have yet are copied whole; the ones it has are descended into, so a scope several shards author
+    into (eg: /Looks/SharedTextures) ends up with the children of all of them.
+
+    :param shard_layer:   type Sdf.Layer:  The shard written by compose_looks_shard
+    :param layer:         type Sdf.Layer:  The looks layer to merge into; prim_path has to exist in it
+    :param prim_path:     type str:        The scope to merge
+    """
+    for child in shard_layer.GetPrimAtPath(prim_path).nameChildren:
+        if layer.GetPrimAtPath(child.path):
+            merge_looks_shard(shard_layer, layer, child.path)
+        else:
+            Sdf.CopySpec(shard_layer, child.path, layer, child.path)
+
+
+def standin_mesh_paths(asset_alembic_path: str, asset_base_prim_path: str, asset_name: str) -> List[str]:
+    """
+    The prim paths the meshes of the asset alembic (or its stand-in) land at in the GEO layer, ie: every
+    mesh under asset_base_prim_path, moved under the asset root prim the payload layer references it at.
+    
+    :param asset_alembic_path     : type str : The asset alembic, or a usd stand-in with the same hierarchy
+    :param asset_base_prim_path   : type str : The prim of the alembic the payload layer references
+    :param asset_name             : type str : Name of the asset
+    
+    :return: type List[str]
+    """
+    stage = Usd.Stage.Open(asset_alembic_path, Usd.Stage.LoadAll)
+    base_path, root_path = Sdf.Path(asset_base_prim_path), Sdf.Path(f"/{asset_name}")
+    base_prim = stage.GetPrimAtPath(base_path)
+    if not base_prim:
+        raise ValueError(f"{asset_alembic_path} has no prim {asset_base_prim_path}")
+    return [prim.GetPath().ReplacePrefix(base_path, root_path).pathString
+            for prim in Usd.PrimRange(base_prim) if prim.IsA(UsdGeom.Mesh)]
+
+
+def prune_shared_textures(layer: Sdf.Layer, scope_path: str = "/Looks/SharedTextures") -> int:
+    """
+    Remove the shared texture and texcoord nodes no material connects to anymore, eg: after an incremental
+    recompose removed or changed the materials that read them. A scope left empty goes too, like it's never
+    defined by a compose that shares no textures.
+
+    :param layer:         type Sdf.Layer:  The looks layer
+    :param scope_path:    type str:        The scope of the shared nodes, see SharedTextures
+
+    :return: type int : The number of nodes removed
+    """
+    scope_path = Sdf.Path(scope_path)
+    scope_spec = layer.GetPrimAtPath(scope_path)
+    if not scope_spec:
+        return 0
+
+    # Which prims every prim connects to; the shared nodes a material connects to are live, and so is what they connect to
+    sources: Dict[Sdf.Path, set] = {}
+
+    def collect(path: Sdf.Path):
+        if path.IsPrimPropertyPath():
+            attr_spec = layer.GetAttributeAtPath(path)
+            if attr_spec and attr_spec.HasInfo("connectionPaths"):
+                sources.setdefault(path.GetPrimPath(), set()).update(
+                    item.GetPrimPath() for item in attr_spec.connectionPathList.GetAddedOrExplicitItems())
+
+    layer.Traverse(scope_path.GetParentPath(), collect)
+    live = set()
+    pending = [target for owner, targets in sources.items() if not owner.HasPrefix(scope_path) for target in targets]
+    while pending:
+        node = pending.pop()
+        if node not in live and node.HasPrefix(scope_path):
+            live.add(node)
+            pending.extend(sources.get(node, ()))
+
+    orphans = [child.name for child in scope_spec.nameChildren if child.path not in live]
+    for name in orphans:
+        del scope_spec.nameChildren[name]
+    if not scope_spec.nameChildren:
+        if scope_path.GetParentPath() == Sdf.Path.absoluteRootPath:
+            del layer.rootPrims[scope_spec.name]
+        else:
+            del scope_spec.nameParent.nameChildren[scope_spec.name]
+    return len(orphans)
+
+
+class UsdComposeBackend:
+    """
+    Authoring backend for compose_pfx_usd that goes through the Usd/UsdShade API.
+    Every backend provides the same operations; the handles they return are only ever passed
+    back into the same backend.
+    """
+    name = "usd"
+    stage = staticmethod(usd_stage)
+    root_prim = staticmethod(usd_root_prim)
+    asset_info = staticmethod(root_asset_info)
+    set_kind = staticmethod(usd_set_kind)
+    material_custom_data = staticmethod(usd_material_custom_data)
+    reference = staticmethod(usd_reference)
+    scope = staticmethod(usd_scope)
+    mesh_payload = staticmethod(usd_mesh_payload)
+    group_payload = staticmethod(usd_group_payload)
+    create_mtlx = staticmethod(usd_create_mtlx)
+    apply_material = staticmethod(usd_apply_material)
+    remove_prim = staticmethod(usd_remove_prim)
+    remove_material_binding = staticmethod(usd_remove_material_binding)
+    material = staticmethod(usd_material)
+
+    @staticmethod
+    def root_layer(stage: Usd.Stage) -> Sdf.Layer:
+        return stage.GetRootLayer()
+
+    @staticmethod
+    def edit_block():
+        # Usd edits read back the composed stage, so they can't be batched in an Sdf.ChangeBlock
+        return nullcontext()
+
+    @staticmethod
+    def save(stage: Usd.Stage):
+        stage.Save()
+        pool = psp.active_pool()
+        if pool is not None:
+            # The saved layers are what the pool measures the stage by
+            pool.refresh(stage)
+
+
+def compose_backend(backend: str = "usd"):
+    """
+    Return the authoring backend by name.
+    "usd" authors through the Usd/UsdShade API; "sdf" writes the same specs straight into the
+    layers inside Sdf.ChangeBlocks, which is much faster for large looks.
+    
+    :param backend: type str : "usd" or "sdf"
+    """
+    if backend == "usd":
+        return UsdComposeBackend
+    if backend == "sdf":
+        from ptx_publish.app_modules.usd.composers.ptx_sdf_composer import SdfComposeBackend
+        return SdfComposeBackend
+    raise ValueError(f"Unknown compose backend {backend}; expected usd or sdf")
+
+
+def compose_looks_shard(shard_path: str, mat_list: List[dict], backend: str = "usd", share_textures: bool = False) -> str:
+    """
+    Author a shard of the looks layer: the /Looks materials of the given records, on their own in a new
+    layer. Runs in a worker process of compose_pfx_usd(concurrent_layers=True); the shards are merged
+    back into the looks layer with merge_looks_shard.
+
+    :param shard_path:        type str:   The path of the shard layer; it mustn't exist yet
+    :param mat_list:          type List:  The material records of this shard
+    :param backend:           type str:   The authoring backend, "usd" or "sdf"
+    :param share_textures:    type bool:  Share texture and texcoord nodes, see SharedTextures
+
+    :return: type str : The path of the shard layer
+    """
+    be = compose_backend(backend)
+    shard_stage = be.stage(shard_path)
+    looks_prim = be.scope(shard_stage, None, "Looks")
+    textures = SharedTextures("/Looks/SharedTextures") if share_textures else None
+    for mat_info in mat_list:
+        mat_struct = PhantomMatStruct(**mat_info)
+        with be.edit_block():
+            mat = be.create_mtlx(shard_stage, looks_prim, mat_struct.shader_name, mat_struct.parameters, textures=textures)
+            if mat_struct.merged_names:
+                be.material_custom_data(shard_stage, mat, "ptxMergedMaterials", mat_struct.merged_names)
+    be.save(shard_stage)
+    return shard_path
+
+
 def compose_pfx_usd(asset_info_path: str, asset_alembic_path: str, 
                     usd_base_location: str, asset_type: str,
-                    asset_name: str, asset_base_prim_path: str):
+                    asset_name: str, asset_base_prim_path: str,
+                    looks_reader: Callable[[str], Iterable[dict]] = None,
+                    backend: str = "usd", share_textures: bool = False, dedup_materials: bool = False,
+                    payload_granularity: str = "mesh", payload_group_depth: int = 1, incremental: bool = False,
+                    usd_format: str = "usda", concurrent_layers: bool = False, material_shards: int = 1,
+                    batch_size: int = 256, collapse_bindings: bool = False):
     """
     Main function for reading in the looks info to build the USD payload, asset and look files.
     This can be used as is, or can be used as a reference on how to use the methods in this module
@@ -335,55 +778,259 @@ def compose_pfx_usd(asset_info_path: str, asset_alembic_path: str,
     :param asset_type             : type str : The type of the asset
     :param asset_name             : type str : Name of the asset
     :param asset_base_prim_path   : type str : The base prim path of the asset, generally "/render_GRP"
+    :param looks_reader           : type Callable : Reads the looks info into material records. Defaults to parse_looks_info.
+                                                    A reader that yields the records, eg: ptx_looks_utils.iter_looks_info, is
+                                                    consumed as the materials are authored, unless dedup_materials, incremental or
+                                                    concurrent_layers need the whole list up front
+    :param backend                : type str : The authoring backend, "usd" or "sdf". Both write identical layers
+    :param share_textures         : type bool : Share texture and texcoord nodes between materials under /Looks/SharedTextures
+    :param dedup_materials        : type bool : Collapse materials with identical parameters and textures into one Material,
+                                                bound to all of their meshes. The merged names go in the ptxMergedMaterials custom data
+    :param payload_granularity    : type str : "mesh" for a payload per mesh, "group" for a payload per group
+                                               payload_group_depth levels below the asset root, or "asset" for a single payload
+    :param payload_group_depth    : type int : The depth of the groups that get a payload in "group" granularity
+    :param incremental            : type bool : Diff the looks against the manifest of the last compose and only add, update or remove
+                                                the materials, bindings and payload prims that changed
+    :param usd_format             : type str : The format of the layers: "usda" text, "usdc" crate, or "usd" with crate encoding.
+                                               References and payloads between the layers use the same extension
+    :param concurrent_layers      : type bool : Author the looks layer in worker processes while this process builds the
+                                                payload and GEO layers; the materials are bound once both are done
+    :param material_shards        : type int : With concurrent_layers, split the looks into this many shards, authored in
+                                               parallel and merged into the looks layer in order
+    :param batch_size             : type int : The materials are bound, and their records and mesh handles let go of, every
+                                               batch_size materials; with concurrent_layers they're all bound at the end
+    :param collapse_bindings      : type bool : Include a group in a binding collection once, instead of its meshes, when all
+                                                of the asset's meshes under it are bound to the material, see
+                                                ptx_looks_utils.BindingCompiler. The meshes are read from the asset alembic.
+                                                Only "group" and "asset" payload granularities have groups to collapse
     """
-    # Create the main payload file if it doesn't exist.
-    payload_usd_path = f"{usd_base_location}/Payload_{asset_type}_{asset_name}.usda"
-    usd_payload_stage: Usd.Stage = usd_stage(payload_usd_path)
-    ups_root_prim: Usd.Prim = usd_root_prim(usd_payload_stage, asset_name, False)
-    root_asset_info(ups_root_prim, asset_alembic_path, asset_name)
-    asset_ref: Sdf.Reference = usd_reference(ups_root_prim, asset_alembic_path, asset_base_prim_path)
-    usd_payload_stage.Save()
-
-    # Create the actual asset definition usd
-    asset_usd_path = f"{usd_base_location}/GEO_{asset_type}_{asset_name}.usda"
-    usd_asset_stage: Usd.Stage = usd_stage(asset_usd_path)
-    usd_asset_root_prim: UsdGeom.Xform = usd_root_prim(usd_asset_stage, asset_name)
-    model_api = Usd.ModelAPI(usd_asset_root_prim)
-    model_api.SetKind(Kind.Tokens.component)
-    root_asset_info(usd_asset_root_prim, asset_alembic_path, asset_name)
-    usd_asset_stage.Save()
-
-    # Create the Looks USD stage.
-    luk_usd_path = f"{usd_base_location}/LUK_{asset_type}_{asset_name}/LUK_{asset_type}_{asset_name}.usda"
-    usd_look_stage: Usd.Stage = usd_stage(luk_usd_path)
-
-    # Add the Looks scope
-    usd_look_root_prim: Usd.Prim = usd_scope(usd_look_stage, None, "Looks")
-
-    mat_list = ptusds.parse_looks_info(asset_info_path)
-    mat_dict = {}
-    for mat_info in mat_list:
-        mat_struct = PhantomMatStruct(**mat_info)
-        mat: UsdShade.Material = usd_create_mtlx(usd_look_stage, usd_look_root_prim, mat_struct.shader_name, mat_struct.parameters)
-        mat_dict[mat] = {"name": mat_struct.shader_name, "mesh_list":[]}    
-        for mesh in mat_struct.meshes:
-            payload_path = '/'.join(mesh.split('|')[2:-1])
-            mesh_payload_path = f'/{asset_name}/{payload_path}'
-            mesh_payload = usd_mesh_payload(usd_asset_stage, f'/{asset_name}/{mesh.split("|")[-1]}', f"./Payload_{asset_type}_{asset_name}.usda", mesh_payload_path)
-            mat_dict[mat]["mesh_list"].append(mesh_payload)
-    
-    # Save the Looks Stage File
-    usd_look_stage.Save()
+    if looks_reader is None:
+        looks_reader = ptusds.parse_looks_info
+    be = compose_backend(backend)
+    if payload_granularity not in plu.__PAYLOAD_GRANULARITIES__:
+        raise ValueError(f"Unknown payload granularity {payload_granularity}; expected one of {plu.__PAYLOAD_GRANULARITIES__}")
+    if usd_format not in __USD_FORMATS__:
+        raise ValueError(f"Unknown usd format {usd_format}; expected one of {__USD_FORMATS__}")
+    if material_shards < 1:
+        raise ValueError(f"material_shards has to be at least 1, got {material_shards}")
+    if batch_size < 1:
+        raise ValueError(f"batch_size has to be at least 1, got {batch_size}")
+
+    # Layer paths relative to usd_base_location
+    payload_layer = f"Payload_{asset_type}_{asset_name}.{usd_format}"
+    asset_layer = f"GEO_{asset_type}_{asset_name}.{usd_format}"
+    luk_layer = f"LUK_{asset_type}_{asset_name}/LUK_{asset_type}_{asset_name}.{usd_format}"
+
+    manifest_path = f"{usd_base_location}/compose_manifest_{asset_type}_{asset_name}.json"
+    layout_options = {"share_textures": share_textures, "dedup_materials": dedup_materials,
+                      "payload_granularity": payload_granularity, "payload_group_depth": payload_group_depth,
+                      "usd_format": usd_format}
+    # The last manifest only describes the layers if they're all still there
+    old_manifest = None
+    if incremental and all(Path(f"{usd_base_location}/{layer}").exists() for layer in (payload_layer, asset_layer, luk_layer)):
+        old_manifest = plu.read_manifest(manifest_path)
+
+    with span("compose_pfx_usd", asset_name, asset_type=asset_type, backend=be.name):
+        # Create the main payload file if it doesn't exist.
+        with span("payload_stage", asset_name):
+            payload_usd_path = f"{usd_base_location}/{payload_layer}"
+            usd_payload_stage = be.stage(payload_usd_path)
+            with be.edit_block():
+                ups_root_prim = be.root_prim(usd_payload_stage, asset_name, False)
+                be.asset_info(ups_root_prim, asset_alembic_path, asset_name)
+                asset_ref: Sdf.Reference = be.reference(ups_root_prim, asset_alembic_path, asset_base_prim_path)
+            with span("Save", asset_name, layer=payload_usd_path):
+                be.save(usd_payload_stage)
+
+        # Create the actual asset definition usd
+        with span("asset_stage", asset_name):
+            asset_usd_path = f"{usd_base_location}/{asset_layer}"
+            usd_asset_stage = be.stage(asset_usd_path)
+            with be.edit_block():
+                usd_asset_root_prim = be.root_prim(usd_asset_stage, asset_name)
+                be.set_kind(usd_asset_root_prim, Kind.Tokens.component)
+                be.asset_info(usd_asset_root_prim, asset_alembic_path, asset_name)
+            with span("Save", asset_name, layer=asset_usd_path):
+                be.save(usd_asset_stage)
+
+        # Create the Looks USD stage.
+        luk_usd_path = f"{usd_base_location}/{luk_layer}"
+        usd_look_stage = be.stage(luk_usd_path)
+
+        # Add the Looks scope
+        usd_look_root_prim = be.scope(usd_look_stage, None, "Looks")
+
+        textures = SharedTextures("/Looks/SharedTextures") if share_textures else None
+
+        with span("parse_looks_info", asset_name):
+            mat_list = looks_reader(asset_info_path)
+            if dedup_materials:
+                mat_list = plu.merge_identical_materials(mat_list, __MATERIALX_PARAM_WHITELIST__.keys())
+
+        # The collections can only be collapsed knowing every mesh of the asset, not just the ones the looks info
+        # lists, or a group would pass its material on to the meshes that aren't listed
+        compiler = None
+        if collapse_bindings and payload_granularity == "mesh":
+            logging.warning(f"{asset_name}: mesh payloads are flat under the asset root, so there are no groups to "
+                            f"collapse the bindings into; use a group or asset payload granularity")
+        elif collapse_bindings:
+            with span("standin_meshes", asset_name):
+                mesh_prim_path = partial(plu.mesh_prim_path, asset_name=asset_name, granularity=payload_granularity,
+                                         group_depth=payload_group_depth)
+                compiler = plu.BindingCompiler(standin_mesh_paths(asset_alembic_path, asset_base_prim_path, asset_name))
+            # New or removed meshes change what the collapsed includes cover, so they recompose everything
+            layout_options["collapse_bindings"] = compiler.digest()
 
-    # Reference the newly created looks usda into the asset usda
-    usd_asset_looks_scope = usd_scope(usd_asset_stage, None, "Looks")
-    looks_ref: Sdf.Reference = usd_reference(usd_asset_looks_scope, f"./LUK_{asset_type}_{asset_name}/LUK_{asset_type}_{asset_name}.usda", "/Looks")
+        changes = None
+        if incremental:
+            mat_list = list(mat_list)
+            new_manifest = plu.compose_manifest(mat_list, asset_name, layout_options, __MATERIALX_PARAM_WHITELIST__.keys())
+            changes = plu.diff_manifests(old_manifest, new_manifest)
+            logging.info(f"{asset_name}: {len(changes['changed'])} materials to author, {len(changes['removed'])} to remove, "
+                         f"{len(changes['stale_payloads'])} stale payload prims")
 
-    # Apply the materials in the Look file
-    for each_mat in mat_dict:
-        usd_apply_material(usd_asset_root_prim, mat_dict[each_mat]["name"], each_mat, mat_dict[each_mat]["mesh_list"])
+            # Materials that changed are authored again from scratch, the removed ones just go
+            with span("incremental_cleanup", asset_name):
+                with be.edit_block():
+                    for name in (changes["changed"] | changes["removed"]) if old_manifest else ():
+                        be.remove_prim(usd_look_stage, f"/Looks/{name}")
+                        be.remove_material_binding(usd_asset_root_prim, name)
+                    for prim_path in changes["stale_payloads"]:
+                        be.remove_prim(usd_asset_stage, prim_path)
 
-    usd_asset_stage.Save()
+        if concurrent_layers:
+            mat_list = [mat_info for mat_info in mat_list if changes is None or mat_info["shader_name"] in changes["changed"]]
+            shards = plu.split_shards(mat_list, material_shards)
+
+        # Bindings only need the material and mesh paths, so they're authored a batch at a time and let go of
+        mat_dict = {}
+        payload_groups = set()
+
+        def apply_materials():
+            with span("usd_apply_material", asset_name, materials=len(mat_dict)):
+                with be.edit_block():
+                    for mtl_name, entry in mat_dict.items():
+                        mesh_list = entry["mesh_list"]
+                        if compiler is not None:
+                            mesh_list = [Sdf.Path(prim_path) for prim_path in compiler.compile(map(mesh_prim_path, entry["meshes"]))]
+                        be.apply_material(usd_asset_root_prim, mtl_name, entry["mtl"], mesh_list)
+            mat_dict.clear()
+
+        with (tempfile.TemporaryDirectory(prefix=f"ptx_luk_shards_{asset_name}_") if concurrent_layers else nullcontext()) as shard_dir, \
+             (ProcessPoolExecutor(max_workers=max(1, len(shards)), mp_context=multiprocessing.get_context("spawn"))
+              if concurrent_layers else nullcontext()) as pool:
+            # The looks shards only need the records, so they're authored while the GEO layer is built below
+            shard_futures = [pool.submit(compose_looks_shard, f"{shard_dir}/LUK_shard_{index}.usdc", shard, be.name, share_textures)
+                             for index, shard in enumerate(shards)] if concurrent_layers else []
+
+            for mat_info in mat_list:
+                mat_struct = PhantomMatStruct(**mat_info)
+                if changes is not None and mat_struct.shader_name not in changes["changed"]:
+                    continue
+                mat = None
+                if not concurrent_layers:
+                    with span("usd_create_mtlx", asset_name, material=mat_struct.shader_name):
+                        with be.edit_block():
+                            mat = be.create_mtlx(usd_look_stage, usd_look_root_prim, mat_struct.shader_name, mat_struct.parameters,
+                                                 textures=textures)
+                            if mat_struct.merged_names:
+                                be.material_custom_data(usd_look_stage, mat, "ptxMergedMaterials", mat_struct.merged_names)
+                mat_dict[mat_struct.shader_name] = {"mtl": mat, "mesh_list": [], "meshes": mat_struct.meshes}
+                with span("usd_mesh_payload", asset_name, material=mat_struct.shader_name, meshes=len(mat_struct.meshes)):
+                    with be.edit_block():
+                        for mesh in mat_struct.meshes:
+                            if payload_granularity == "mesh":
+                                payload_path = '/'.join(mesh.split('|')[2:-1])
+                                mesh_payload_path = f'/{asset_name}/{payload_path}'
+                                mesh_payload = be.mesh_payload(usd_asset_stage, f'/{asset_name}/{mesh.split("|")[-1]}', f"./{payload_layer}", mesh_payload_path)
+                                mat_dict[mat_struct.shader_name]["mesh_list"].append(mesh_payload)
+                                continue
+
+                            # The meshes come in through their group's payload, so bind them where they land
+                            group_path, group_payload_path, mesh_path = plu.payload_layout(mesh, asset_name, payload_granularity, payload_group_depth)
+                            if group_path not in payload_groups:
+                                be.group_payload(usd_asset_stage, group_path, f"./{payload_layer}", group_payload_path)
+                                payload_groups.add(group_path)
+                            mat_dict[mat_struct.shader_name]["mesh_list"].append(Sdf.Path(mesh_path))
+
+                # The merged shards have to exist before anything is bound to them
+                if not concurrent_layers and len(mat_dict) >= batch_size:
+                    apply_materials()
+
+            if concurrent_layers:
+                # Merged in shard order, so /Looks comes out in the same order as a serial compose
+                with span("merge_looks_shards", asset_name, shards=len(shard_futures)):
+                    with Sdf.ChangeBlock():
+                        for future in shard_futures:
+                            merge_looks_shard(Sdf.Layer.FindOrOpen(future.result()), be.root_layer(usd_look_stage))
+                    for name, entry in mat_dict.items():
+                        entry["mtl"] = be.material(usd_look_stage, f"/Looks/{name}")
+
+        # A recompose can leave shared textures behind that only the removed or changed materials read
+        if share_textures and old_manifest:
+            with span("prune_shared_textures", asset_name):
+                with Sdf.ChangeBlock():
+                    pruned = prune_shared_textures(be.root_layer(usd_look_stage), "/Looks/SharedTextures")
+            logging.info(f"{asset_name}: pruned {pruned} shared texture nodes")
+
+        # Save the Looks Stage File
+        with span("Save", asset_name, layer=luk_usd_path):
+            be.save(usd_look_stage)
+
+        # Reference the newly created looks usda into the asset usda
+        with be.edit_block():
+            usd_asset_looks_scope = be.scope(usd_asset_stage, None, "Looks")
+            looks_ref: Sdf.Reference = be.reference(usd_asset_looks_scope, f"./{luk_layer}", "/Looks")
+
+        # Apply what's left of the materials in the Look file
+        apply_materials()
+
+        with span("Save", asset_name, layer=asset_usd_path):
+            be.save(usd_asset_stage)
+
+        if incremental:
+            plu.write_manifest(manifest_path, new_manifest)
+
+
+async def compose_pfx_usd_async(asset_info_path: str, asset_alembic_path: str, 
+                                usd_base_location: str, asset_type: str,
+                                asset_name: str, asset_base_prim_path: str, python: str = sys.executable,
+                                backend: str = "usd", usd_format: str = "usda", service: str = None) -> int:
+    """
+    Awaitable counterpart of compose_pfx_usd. The compose runs in a child interpreter, or on the
+    resident compose service, so several composes, texture conversions and file transfers can
+    overlap in one event loop without threads or the GIL getting in the way.
+    
+    :param python                 : type str : The interpreter to run the compose with
+    :param backend                : type str : The authoring backend, "usd" or "sdf"
+    :param usd_format             : type str : The format of the layers, "usda", "usdc" or "usd"
+    :param service                : type str : The address of a ptx_compose_service to submit to instead of starting an
+                                               interpreter. Defaults to the PTX_COMPOSE_SERVICE environment variable, if set
+    
+    :return: type int : The publish state of the compose; 2 on success, 0 on failure
+    """
+    from ptx_publish.app_modules.usd.composers import ptx_compose_service as pcs
+    service = service or os.environ.get(pcs.__SERVICE_ENV__)
+    if service:
+        job = {"asset_info_path": asset_info_path, "asset_alembic_path": asset_alembic_path, "usd_base_location": usd_base_location,
+               "asset_type": asset_type, "asset_name": asset_name, "asset_base_prim_path": asset_base_prim_path,
+               "backend": backend, "usd_format": usd_format}
+        try:
+            result = await pcs.submit_compose_async(service, job)
+        except (OSError, RuntimeError) as err:
+            logging.error(f"Compose of {asset_name} failed on the compose service {service}: {err}")
+            return 0
+        if result["publish_state"] != 2:
+            logging.error(f"Compose of {asset_name} failed: {result.get('error')}")
+        return result["publish_state"]
+
+    cmd = [python, "-m", "ptx_publish.app_modules.usd.composers.ptx_base_composer",
+           asset_info_path, asset_alembic_path, usd_base_location, asset_type, asset_name, asset_base_prim_path,
+           "--backend", backend, "--usd-format", usd_format]
+    out, err, return_code = await run_subprocess_async(cmd, shell=False)
+    if return_code != 0:
+        logging.error(f"Compose of {asset_name} failed: {err.decode(errors='replace')}")
+    return 2 if return_code == 0 else 0
 
 
 if __name__ == "__main__":
@@ -395,9 +1042,35 @@ if __name__ == "__main__":
     parser.add_argument('asset_type', metavar='-at', type=str, help='The path to the asset usd file')
     parser.add_argument('asset_name', metavar='-an', type=str, help='The asset name')
     parser.add_argument('asset_base_prim_path', metavar='-abpp', type=str, help='The default prim path of the asset')
+    parser.add_argument('--trace', type=str, default='', help='Write a Chrome trace of the compose to this path')
+    parser.add_argument('--backend', choices=['usd', 'sdf'], default='usd', help='Author through the Usd API or straight into Sdf specs')
+    parser.add_argument('--share-textures', action='store_true', help='Share texture and texcoord nodes between materials')
+    parser.add_argument('--dedup-materials', action='store_true', help='Collapse materials with identical looks into one')
+    parser.add_argument('--payload-granularity', choices=['mesh', 'group', 'asset'], default='mesh', help='A payload per mesh, per group or for the whole asset')
+    parser.add_argument('--payload-group-depth', type=int, default=1, help='The depth of the groups that get a payload with --payload-granularity group')
+    parser.add_argument('--incremental', action='store_true', help='Only recompose what changed since the last compose')
+    parser.add_argument('--usd-format', choices=['usda', 'usdc', 'usd'], default='usda', help='The format of the layers')
+    parser.add_argument('--concurrent-layers', action='store_true', help='Author the looks layer in worker processes alongside the GEO layer')
+    parser.add_argument('--material-shards', type=int, default=1, help='How many looks shards to author in parallel with --concurrent-layers')
+    parser.add_argument('--json-looks', action='store_true', help='The asset info is a json (or json lines) looks info, streamed record by record')
+    parser.add_argument('--batch-size', type=int, default=256, help='How many materials to bind at a time')
+    parser.add_argument('--collapse-bindings', action='store_true', help='Include fully covered groups in the binding collections instead of their meshes')
 
     args = parser.parse_args()
-    compose_pfx_usd(args.asset_info_path, args.asset_alembic_path, args.usd_base_location, args.asset_type, args.asset_name, args.asset_base_prim_path)
+    if args.trace:
+        from ptx_publish.core import ptx_trace
+        ptx_trace.enable_tracing()
+
+    compose_pfx_usd(args.asset_info_path, args.asset_alembic_path, args.usd_base_location, args.asset_type, args.asset_name, args.asset_base_prim_path,
+                    backend=args.backend, share_textures=args.share_textures, dedup_materials=args.dedup_materials,
+                    payload_granularity=args.payload_granularity, payload_group_depth=args.payload_group_depth,
+                    incremental=args.incremental, usd_format=args.usd_format,
+                    concurrent_layers=args.concurrent_layers, material_shards=args.material_shards,
+                    looks_reader=plu.iter_looks_info if args.json_looks else None, batch_size=args.batch_size,
+                    collapse_bindings=args.collapse_bindings)
+
+    if args.trace:
+        ptx_trace.export_chrome_trace(args.trace)
 
     #mat_list = ptusds.parse_looks_info("C:/Users/Mukund Dhananjay/Downloads/.LUK_Character_Alien.ma")
     #for mat in mat_list:
@@ -0,0 +1,220 @@
+"""
+Batch mode for compose_pfx_usd: composes a manifest of assets on a pool of warm worker processes.
+Every worker imports pxr and the composers once, and can keep a stage pool (see ptx_stage_pool)
+across the assets it composes. Every asset reports its own state and timing; a failing asset is
+reported as failed and the rest of the batch carries on.
+
+    {
+        "workers": 8,
+        "stage_pool": {"max_stages": 16, "load": "none"},
+        "defaults": {"backend": "sdf", "usd_format": "usdc", "asset_base_prim_path": "/render_GRP"},
+        "assets": [
+            {"asset_info_path": ".../.LUK_Character_Alien.ma", "asset_alembic_path": ".../GEO_Character_Alien.abc",
+             "usd_base_location": ".../usd", "asset_type": "Character", "asset_name": "Alien", "share_textures": true}
+        ]
+    }
+
+The asset entries take the arguments of compose_pfx_usd; looks_reader is given as a "module:function" string.
+An entry can also carry the "id" of the job and the "version" it's journaled under.
+
+python -m ptx_publish.app_modules.usd.composers.ptx_batch_compose assets.json --workers 8 --summary summary.json
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Dict, List
+import importlib
+import inspect
+import json
+import logging
+import multiprocessing
+import os
+import time
+import traceback
+
+from ptx_publish.core.ptx_batch_publish import summarize
+from ptx_publish.core.ptx_publish_journal import PublishJournal
+from ptx_publish.app_modules.usd.composers import ptx_base_composer as pbc
+from ptx_publish.app_modules.usd.composers import ptx_stage_pool as psp
+
+
+# The pub_type compose results are reported (and journaled) under
+__PUB_TYPE__ = "usd_compose"
+
+
+@dataclass
+class ComposeJob:
+    """
+    A single asset to compose: the keyword arguments of compose_pfx_usd, and the version it's journaled under
+    """
+    job_id: str
+    kwargs: Dict = field(default_factory=dict)
+    version: str = None
+
+
+def _resolve(dotted: str):
+    """
+    The function of a "module:function" string
+    """
+    mod_name, _, func_name = dotted.partition(":")
+    return getattr(importlib.import_module(mod_name), func_name)
+
+
+def read_compose_manifest(manifest_path: str) -> Dict:
+    """
+    Read a json or yaml compose manifest from disk
+    """
+    with open(manifest_path) as file:
+        if manifest_path.lower().endswith(('.yaml', '.yml')):
+            try:
+                import yaml
+            except ImportError as err:
+                raise ImportError("PyYAML is required to read yaml manifests; use a json manifest instead") from err
+            return yaml.safe_load(file)
+        return json.load(file)
+
+
+def load_compose_manifest(manifest) -> List[ComposeJob]:
+    """
+    Expand a compose manifest into compose jobs; the asset entries are merged over the defaults.
+    Entries with unknown or missing compose arguments are rejected before anything runs.
+
+    :param manifest:  type str | dict : The path of a json/yaml manifest, or the loaded manifest
+
+    :return: type List[ComposeJob]
+    """
+    if not isinstance(manifest, dict):
+        manifest = read_compose_manifest(manifest)
+
+    parameters = inspect.signature(pbc.compose_pfx_usd).parameters
+    required = [name for name, param in parameters.items() if param.default is inspect.Parameter.empty]
+    defaults = manifest.get("defaults", {})
+    jobs = []
+    for asset in manifest.get("assets", []):
+        kwargs = {**defaults, **asset}
+        job_id = kwargs.pop("id", None) or f"{kwargs.get('asset_type')}_{kwargs.get('asset_name')}"
+        version = kwargs.pop("version", None)
+        unknown = sorted(set(kwargs) - set(parameters))
+        missing = [name for name in required if name not in kwargs]
+        if unknown or missing:
+            raise ValueError(f"Compose job {job_id}: unknown arguments {unknown}, missing arguments {missing}")
+        jobs.append(ComposeJob(job_id, kwargs, version))
+    return jobs
+
+
+def init_compose_worker(stage_pool: Dict = None):
+    """
+    Runs once in every worker: import pxr and the composers so the first asset doesn't pay for it,
+    and install the worker's stage pool
+    """
+    try:
+        importlib.import_module("pxr.Usd")
+        importlib.import_module("pxr.UsdShade")
+        importlib.import_module("ptx_publish.app_modules.usd.composers.ptx_sdf_composer")
+    except ImportError:
+        # A broken initializer takes the whole pool down; let the jobs report the import error instead
+        logging.exception("Could not warm up the compose worker")
+        return
+    if stage_pool:
+        psp.set_active_pool(psp.StagePool(**stage_pool))
+
+
+def run_compose_job(job: ComposeJob) -> Dict:
+    """
+    Compose one asset and return its result. Never raises; a failed compose is reported as a failed (0) state.
+
+    :return: type dict
+    """
+    kwargs = dict(job.kwargs)
+    result = {"job_id": job.job_id, "pub_type": __PUB_TYPE__,
+              "asset": [kwargs.get("asset_name"), kwargs.get("asset_type"), "compose"], "version": job.version,
+              "publish_state": -1, "publish_info": {}, "out_file": "", "error": "", "pid": os.getpid()}
+    result["started_at"] = time.time()
+    start = time.perf_counter()
+    try:
+        if isinstance(kwargs.get("looks_reader"), str):
+            kwargs["looks_reader"] = _resolve(kwargs["looks_reader"])
+        pbc.compose_pfx_usd(**kwargs)
+        usd_format = kwargs.get("usd_format", "usda")
+        result["out_file"] = f"{kwargs['usd_base_location']}/GEO_{kwargs['asset_type']}_{kwargs['asset_name']}.{usd_format}"
+        result["publish_state"] = 2
+    except Exception:
+        result["publish_state"] = 0
+        result["error"] = traceback.format_exc()
+        logging.error(f"Compose {job.job_id} failed")
+
+    result["duration"] = time.perf_counter() - start
+    result["finished_at"] = time.time()
+    pool = psp.active_pool()
+    if pool is not None:
+        result["publish_info"]["stage_pool"] = pool.stats()
+    return result
+
+
+def run_compose_batch(jobs: List[ComposeJob], max_workers: int = None, stage_pool: Dict = None,
+                      journal: PublishJournal = None) -> Dict:
+    """
+    Compose the jobs on a pool of warm worker processes and return the summary, see ptx_batch_publish.summarize
+
+    :param jobs:          type List[ComposeJob]:  The assets to compose
+    :param max_workers:   type int:               Number of worker processes; defaults to the number of cores
+    :param stage_pool:    type dict:              StagePool keyword arguments for a pool in every worker; none by default
+    :param journal:       type PublishJournal:    Optional journal every result is recorded to
+
+    :return: type dict
+    """
+    start = time.perf_counter()
+    results = []
+    if not jobs:
+        return summarize(results, 0.0)
+
+    max_workers = max(1, min(max_workers or os.cpu_count() or 1, len(jobs)))
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=ctx, initializer=init_compose_worker,
+                             initargs=(stage_pool,)) as pool:
+        futures = {pool.submit(run_compose_job, job): job for job in jobs}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                res = future.result()
+            except Exception:
+                # The worker itself died, eg: a crash inside USD
+                res = {"job_id": job.job_id, "pub_type": __PUB_TYPE__,
+                       "asset": [job.kwargs.get("asset_name"), job.kwargs.get("asset_type"), "compose"], "version": job.version,
+                       "publish_state": 0, "publish_info": {}, "out_file": "", "error": traceback.format_exc(), "duration": 0.0}
+            logging.info(f"{res['job_id']}: state {res['publish_state']} in {res.get('duration', 0.0):.2f}s")
+            if journal is not None:
+                journal.record_result(res)
+            results.append(res)
+
+    # Report in manifest order regardless of completion order
+    order = {job.job_id: idx for idx, job in enumerate(jobs)}
+    results.sort(key=lambda res: order.get(res["job_id"], len(order)))
+    return summarize(results, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description='Compose a manifest of assets on a pool of warm worker processes.')
+    parser.add_argument('manifest', type=str, help='The json/yaml compose manifest')
+    parser.add_argument('--workers', type=int, default=None, help='Number of worker processes')
+    parser.add_argument('--stage-pool', type=json.loads, default=None,
+                        help='StagePool keyword arguments for every worker, as json, eg: \'{"max_stages": 16}\'')
+    parser.add_argument('--summary', type=str, default='', help='Path to write the json summary to')
+    parser.add_argument('--journal', type=str, default='', help='Publish journal database to record the results in')
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    manifest = read_compose_manifest(args.manifest)
+    journal = PublishJournal(args.journal) if args.journal else None
+    summary = run_compose_batch(load_compose_manifest(manifest), args.workers or manifest.get("workers"),
+                                args.stage_pool or manifest.get("stage_pool"), journal)
+    if journal is not None:
+        journal.close()
+
+    print(f"{summary['succeeded']} succeeded, {summary['failed']} failed out of {summary['total']} "
+          f"in {summary['wall_time']:.1f}s")
+
+    if args.summary:
+        with open(args.summary, 'w') as file:
+            json.dump(summary, file, indent=4)
@@ -0,0 +1,357 @@
+"""
+Resident compose service: a long running daemon that takes compose_pfx_usd jobs over a local socket,
+so the publish tools don't pay for a Python start, the pxr import and a cold plugin registry per asset.
+Jobs run on a pool of warm worker processes (see ptx_batch_compose), each of which can keep a stage
+pool of shared layers; at most max_jobs run at once, the rest queue.
+
+The protocol is one json request per line, answered with one json line:
+
+    {"op": "compose", "job": {<compose_pfx_usd arguments>}, "id": "Character_Alien", "wait": true}
+    {"op": "result", "id": "Character_Alien"}       the result of a job submitted with "wait": false
+    {"op": "stats"}                                 queue depth, counters and latencies
+    {"op": "ping"}
+    {"op": "shutdown"}
+
+The address is "unix:<socket path>" or "<host>:<port>" on the loopback interface. The loopback interface
+isn't a trust boundary on a shared farm host, so a job can only name one of the service's looks readers
+(__LOOKS_READERS__ and the ones it was started with), never an arbitrary "module:function".
+
+python -m ptx_publish.app_modules.usd.composers.ptx_compose_service --address unix:/tmp/ptx_compose.sock --max-jobs 4
+"""
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import socketserver
+import statistics
+import tempfile
+import threading
+import time
+import traceback
+
+from ptx_publish.app_modules.usd.composers import ptx_batch_compose as pbcm
+
+
+# Where publish tools find the service, eg: unix:/tmp/ptx_compose.sock
+__SERVICE_ENV__ = "PTX_COMPOSE_SERVICE"
+
+__LOOPBACK_HOSTS__ = ("127.0.0.1", "localhost", "::1")
+
+# How many finished jobs to keep the results and latencies of
+__HISTORY__ = 1000
+
+# The looks_reader functions a job may name
+__LOOKS_READERS__ = (
+    "chitragupta.ptx_data_structs.ptx_usd_structs:parse_looks_info",
+    "ptx_publish.app_modules.usd.composers.ptx_looks_utils:iter_looks_info",
+    "ptx_publish.benchmarks.synthetic_assets:read_looks_info",
+)
+
+
+def default_address() -> str:
+    """
+    A unix socket in the temp folder, or a loopback port where there are no unix sockets
+    """
+    if hasattr(socket, "AF_UNIX") and os.name != "nt":
+        return f"unix:{tempfile.gettempdir()}/ptx_compose_{os.getuid()}.sock"
+    return "127.0.0.1:47801"
+
+
+def parse_address(address: str) -> tuple:
+    """
+    ("unix", socket path) or ("tcp", (host, port)) for an address string
+    """
+    if address.startswith("unix:"):
+        return ("unix", address[len("unix:"):])
+    host, _, port = address.rpartition(":")
+    host = host.strip("[]")
+    if host not in __LOOPBACK_HOSTS__:
+        raise ValueError(f"The compose service only listens on the loopback interface, not {host}")
+    return ("tcp", (host, int(port)))
+
+
+def _latency_stats(values) -> Dict:
+    values = sorted(values)
+    if not values:
+        return {"count": 0}
+    return {"count": len(values), "mean": statistics.fmean(values), "p50": values[len(values) // 2],
+            "p95": values[min(len(values) - 1, int(len(values) * 0.95))], "max": values[-1]}
+
+
+class ComposeService:
+    """
+    Runs compose jobs on warm worker processes and keeps their results and latencies.
+
+    :param max_jobs:      type int:   How many composes run at once
+    :param stage_pool:    type dict:  StagePool keyword arguments for a pool in every worker; none by default
+    :param looks_readers: type list:  "module:function" looks readers jobs may name, on top of __LOOKS_READERS__
+    """
+    def __init__(self, max_jobs: int = 2, stage_pool: Dict = None, looks_readers: List[str] = None) -> None:
+        self.max_jobs = max(1, max_jobs)
+        self.stage_pool = stage_pool
+        self.looks_readers = frozenset(__LOOKS_READERS__) | frozenset(looks_readers or ())
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._executor = self._new_executor()
+        self._futures: Dict[str, object] = {}
+        self._submitted_at: Dict[str, float] = {}
+        self._done: Dict[str, threading.Event] = {}
+        self._results: OrderedDict = OrderedDict()
+        self._latencies = {key: deque(maxlen=__HISTORY__) for key in ("queue_wait", "run", "total")}
+        self.counters = {"submitted": 0, "completed": 0, "failed": 0, "rejected": 0, "worker_restarts": 0}
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=self.max_jobs, mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=pbcm.init_compose_worker, initargs=(self.stage_pool,))
+
+    def submit(self, job_kwargs: Dict, job_id: str = None) -> str:
+        """
+        Queue a compose job; the arguments are checked before it's queued. A looks_reader that
+        isn't one of the service's looks readers is rejected, as the worker would import and call it.
+
+        :return: type str : The job id
+        """
+        try:
+            reader = job_kwargs.get("looks_reader")
+            if reader is not None and (not isinstance(reader, str) or reader not in self.looks_readers):
+                raise ValueError(f"looks_reader {reader} is not one of the service's looks readers: "
+                                 f"{sorted(self.looks_readers)}")
+            job = pbcm.load_compose_manifest({"assets": [dict(job_kwargs, id=job_id) if job_id else job_kwargs]})[0]
+        except Exception:
+            with self._lock:
+                self.counters["rejected"] += 1
+            raise
+        with self._lock:
+            if job.job_id in self._futures:
+                self.counters["rejected"] += 1
+                raise ValueError(f"Compose job {job.job_id} is already queued or running")
+            try:
+                future = self._executor.submit(pbcm.run_compose_job, job)
+            except BrokenProcessPool:
+                # A worker died and took the pool with it
+                self.counters["worker_restarts"] += 1
+                self._executor = self._new_executor()
+                future = self._executor.submit(pbcm.run_compose_job, job)
+            self._futures[job.job_id] = future
+            self._done[job.job_id] = threading.Event()
+            self._submitted_at[job.job_id] = time.time()
+            self.counters["submitted"] += 1
+        future.add_done_callback(lambda done, job=job: self._finish(job, done))
+        return job.job_id
+
+    def _finish(self, job: pbcm.ComposeJob, future):
+        try:
+            result = future.result()
+        except Exception:
+            result = {"job_id": job.job_id, "pub_type": pbcm.__PUB_TYPE__, "version": job.version,
+                      "asset": [job.kwargs.get("asset_name"), job.kwargs.get("asset_type"), "compose"],
+                      "publish_state": 0, "publish_info": {}, "out_file": "", "error": traceback.format_exc(), "duration": 0.0}
+        with self._lock:
+            submitted = self._submitted_at.pop(job.job_id, None)
+            self._futures.pop(job.job_id, None)
+            finished = result.get("finished_at") or time.time()
+            if submitted is not None:
+                result["queue_wait"] = max(0.0, (result.get("started_at") or finished) - submitted)
+                self._latencies["queue_wait"].append(result["queue_wait"])
+                self._latencies["total"].append(finished - submitted)
+            self._latencies["run"].append(result.get("duration", 0.0))
+            self.counters["completed"] += 1
+            if result["publish_state"] != 2:
+                self.counters["failed"] += 1
+            self._results[job.job_id] = result
+            while len(self._results) > __HISTORY__:
+                self._results.popitem(last=False)
+            self._done.pop(job.job_id).set()
+        logging.info(f"{job.job_id}: state {result['publish_state']} in {result.get('duration', 0.0):.2f}s")
+
+    def result(self, job_id: str, timeout: float = None) -> Dict:
+        """
+        The result of a job, waiting for it if it's still queued or running; None for an unknown job
+        """
+        with self._lock:
+            done = self._done.get(job_id)
+        if done is not None:
+            done.wait(timeout)
+        with self._lock:
+            return self._results.get(job_id)
+
+    def stats(self) -> Dict:
+        """
+        Queue depth, counters and latencies (seconds) of the service
+
+        :return: type dict
+        """
+        with self._lock:
+            in_flight = len(self._futures)
+            return {"uptime": time.time() - self.started, "pid": os.getpid(), "max_jobs": self.max_jobs,
+                    "in_flight": in_flight, "queue_depth": max(0, in_flight - self.max_jobs), **self.counters,
+                    "latency": {key: _latency_stats(values) for key, values in self._latencies.items()}}
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """
+    Answers the json lines of one connection
+    """
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                reply = self.server.dispatch(request)
+            except Exception as err:
+                reply = {"ok": False, "error": f"{type(err).__name__}: {err}"}
+            self.wfile.write((json.dumps(reply, default=str) + "\n").encode())
+            self.wfile.flush()
+            if reply.get("shutdown"):
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+                return
+
+
+class _ServiceMixin:
+    service: ComposeService = None
+
+    def dispatch(self, request: Dict) -> Dict:
+        op = request.get("op")
+        if op == "compose":
+            job_id = self.service.submit(request["job"], request.get("id"))
+            if not request.get("wait", True):
+                return {"ok": True, "id": job_id}
+            return {"ok": True, "id": job_id, "result": self.service.result(job_id, request.get("timeout"))}
+        if op == "result":
+            return {"ok": True, "id": request["id"], "result": self.service.result(request["id"], request.get("timeout"))}
+        if op == "stats":
+            return {"ok": True, "stats": self.service.stats()}
+        if op == "ping":
+            return {"ok": True}
+        if op == "shutdown":
+            return {"ok": True, "shutdown": True}
+        raise ValueError(f"Unknown op {op}")
+
+
+class _TcpServer(_ServiceMixin, socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+if hasattr(socketserver, "ThreadingUnixStreamServer"):
+    class _UnixServer(_ServiceMixin, socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+
+
+def make_server(address: str, service: ComposeService) -> socketserver.BaseServer:
+    """
+    The socket server of the service at the address; call serve_forever() on it
+
+    :param address:   type str:               "unix:<socket path>" or "<host>:<port>" on the loopback interface
+    :param service:   type ComposeService:    The service the requests go to
+    """
+    kind, location = parse_address(address)
+    if kind == "unix":
+        if os.path.exists(location):
+            # Left behind by a service that didn't shut down cleanly
+            os.remove(location)
+        # Only this user can submit jobs; the umask closes the gap between bind and chmod
+        umask = os.umask(0o177)
+        try:
+            server = _UnixServer(location, _RequestHandler)
+        finally:
+            os.umask(umask)
+        os.chmod(location, 0o600)
+    else:
+        server = _TcpServer(location, _RequestHandler)
+    server.service = service
+    return server
+
+
+def _connect(address: str, timeout: float = None) -> socket.socket:
+    kind, location = parse_address(address)
+    if kind == "unix":
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        sock.connect(location)
+        return sock
+    return socket.create_connection(location, timeout)
+
+
+def request(address: str, payload: Dict, timeout: float = None) -> Dict:
+    """
+    Send one request to the service and return its reply
+
+    :param address:   type str:   The address of the service
+    :param payload:   type dict:  The request, eg: {"op": "stats"}
+    :param timeout:   type float: Socket timeout in seconds; none by default, a compose can take a while
+    """
+    with _connect(address, timeout) as sock, sock.makefile("rwb") as stream:
+        stream.write((json.dumps(payload) + "\n").encode())
+        stream.flush()
+        return json.loads(stream.readline())
+
+
+def submit_compose(address: str, job_kwargs: Dict, job_id: str = None, timeout: float = None) -> Dict:
+    """
+    Compose an asset on the service and wait for its result, see ptx_batch_compose.run_compose_job
+
+    :return: type dict
+    """
+    reply = request(address, {"op": "compose", "job": job_kwargs, "id": job_id, "wait": True}, timeout)
+    if not reply.get("ok"):
+        raise RuntimeError(f"The compose service refused the job: {reply.get('error')}")
+    return reply["result"]
+
+
+async def submit_compose_async(address: str, job_kwargs: Dict, job_id: str = None) -> Dict:
+    """
+    Awaitable counterpart of submit_compose, for the asyncio publish tools
+    """
+    kind, location = parse_address(address)
+    if kind == "unix":
+        reader, writer = await asyncio.open_unix_connection(location, limit=1 << 24)
+    else:
+        reader, writer = await asyncio.open_connection(*location, limit=1 << 24)
+    try:
+        writer.write((json.dumps({"op": "compose", "job": job_kwargs, "id": job_id, "wait": True}) + "\n").encode())
+        await writer.drain()
+        reply = json.loads(await reader.readline())
+    finally:
+        writer.close()
+    if not reply.get("ok"):
+        raise RuntimeError(f"The compose service refused the job: {reply.get('error')}")
+    return reply["result"]
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description='Run the resident compose service.')
+    parser.add_argument('--address', type=str, default=os.environ.get(__SERVICE_ENV__) or default_address(),
+                        help='unix:<socket path> or <host>:<port> on the loopback interface')
+    parser.add_argument('--max-jobs', type=int, default=2, help='How many composes run at once')
+    parser.add_argument('--stage-pool', type=json.loads, default=None,
+                        help='StagePool keyword arguments for every worker, as json, eg: \'{"max_stages": 16}\'')
+    parser.add_argument('--looks-reader', dest='looks_readers', action='append', default=[],
+                        help='A "module:function" looks reader jobs may name, on top of the built in ones; repeatable')
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    service = ComposeService(args.max_jobs, args.stage_pool, args.looks_readers)
+    server = make_server(args.address, service)
+    logging.info(f"Compose service listening on {args.address} with {service.max_jobs} workers")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+        if args.address.startswith("unix:") and os.path.exists(args.address[len("unix:"):]):
+            os.remove(args.address[len("unix:"):])
@@ -0,0 +1,309 @@
+"""
+Fast validation of a composed asset on its raw Sdf layers, without composing a stage or loading payloads.
+
+- Bindings: every mat_bind_* collection include, and every bound material, resolves to a prim
+- Payloads: every payload prim path exists in the layer the payload points at
+- Textures: every asset valued attribute of the looks layer points at a file on disk (UDIM paths
+  at least at one tile); the files are checked with one directory listing per folder
+
+A path "resolves" when a prim spec exists for it, or when its nearest ancestor spec carries a
+reference or payload, in which case the path is followed into the layer of the arc (up to
+max_arc_depth layers deep). Paths that can't be followed any further, eg: into a layer that can't be
+opened, are counted as unverified rather than reported as errors.
+The checks run in parallel on a thread pool; the layers they open are shared between them.
+
+python -m ptx_publish.app_modules.usd.composers.ptx_compose_validator /show/asset/usd Character Alien --usd-format usdc
+"""
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List
+import fnmatch
+import logging
+import os
+import threading
+import time
+
+from ptx_publish.core.ptx_lazy_import import lazy_import
+from ptx_publish.core.ptx_trace import span
+
+Sdf = lazy_import("pxr.Sdf")
+
+
+class _LayerCache:
+    """
+    The layers the checks open, shared between the threads; a layer that can't be opened is None
+    """
+    def __init__(self) -> None:
+        self._layers: Dict[str, Sdf.Layer] = {}
+        self._lock = threading.Lock()
+
+    def open(self, layer_path: str) -> Sdf.Layer:
+        with self._lock:
+            if layer_path in self._layers:
+                return self._layers[layer_path]
+        try:
+            layer = Sdf.Layer.FindOrOpen(layer_path)
+        except Exception:
+            layer = None
+        with self._lock:
+            return self._layers.setdefault(layer_path, layer)
+
+
+def _anchored_path(layer: Sdf.Layer, asset_path: str) -> str:
+    """
+    The file an asset path of the layer points at. ComputeAbsolutePath leaves search relative paths,
+    eg: textures/x.exr, as they are; they're looked up next to the layer first, so they're anchored to it.
+    """
+    file_path = layer.ComputeAbsolutePath(asset_path)
+    if not os.path.isabs(file_path) and layer.realPath:
+        file_path = os.path.normpath(os.path.join(os.path.dirname(layer.realPath), file_path))
+    return file_path
+
+
+def _arcs(prim_spec: Sdf.PrimSpec) -> List:
+    return list(prim_spec.referenceList.GetAddedOrExplicitItems()) + list(prim_spec.payloadList.GetAddedOrExplicitItems())
+
+
+def resolve_prim(layers: _LayerCache, layer: Sdf.Layer, prim_path: Sdf.Path, max_arc_depth: int = 3):
+    """
+    Whether the prim path exists in the layer, following the references and payloads of its ancestors.
+
+    :return: type bool | None : True if it resolves, False if it doesn't, None if it can't be told
+    """
+    if layer.GetPrimAtPath(prim_path):
+        return True
+
+    ancestor = prim_path.GetParentPath()
+    while ancestor != Sdf.Path.absoluteRootPath and not layer.GetPrimAtPath(ancestor):
+        ancestor = ancestor.GetParentPath()
+    if ancestor == Sdf.Path.absoluteRootPath:
+        return False
+
+    arcs = _arcs(layer.GetPrimAtPath(ancestor))
+    if not arcs:
+        return False
+    if max_arc_depth <= 0:
+        return None
+
+    verdict = False
+    for arc in arcs:
+        arc_layer = layers.open(_anchored_path(layer, arc.assetPath)) if arc.assetPath else layer
+        if arc_layer is None:
+            verdict = None
+            continue
+        arc_prim_path = arc.primPath if not arc.primPath.isEmpty else (
+            Sdf.Path.absoluteRootPath.AppendChild(arc_layer.defaultPrim) if arc_layer.defaultPrim else None)
+        if arc_prim_path is None:
+            verdict = None
+            continue
+        resolved = resolve_prim(layers, arc_layer, prim_path.ReplacePrefix(ancestor, arc_prim_path), max_arc_depth - 1)
+        if resolved:
+            return True
+        if resolved is None:
+            verdict = None
+    return verdict
+
+
+def _prim_specs(layer: Sdf.Layer) -> Iterator[Sdf.PrimSpec]:
+    stack = list(layer.rootPrims)
+    while stack:
+        prim_spec = stack.pop()
+        yield prim_spec
+        stack.extend(prim_spec.nameChildren)
+
+
+def _result(check: str) -> Dict:
+    return {"check": check, "checked": 0, "unverified": 0, "errors": [], "duration": 0.0}
+
+
+def check_bindings(layers: _LayerCache, geo_layer: Sdf.Layer, max_arc_depth: int = 3) -> Dict:
+    """
+    Every mat_bind_* collection include and every bound material of the GEO layer resolves to a prim
+
+    :return: type dict
+    """
+    result = _result("bindings")
+    for prim_spec in _prim_specs(geo_layer):
+        for rel_spec in prim_spec.relationships:
+            if rel_spec.name.startswith("collection:mat_bind_") and rel_spec.name.endswith(":includes"):
+                targets = rel_spec.targetPathList.GetAddedOrExplicitItems()
+            elif rel_spec.name.startswith("material:binding:collection:mat_bind_"):
+                # The collection path, then the material
+                targets = [path for path in rel_spec.targetPathList.GetAddedOrExplicitItems() if path.IsPrimPath()]
+            else:
+                continue
+            for target in targets:
+                result["checked"] += 1
+                resolved = resolve_prim(layers, geo_layer, target, max_arc_depth)
+                if resolved is None:
+                    result["unverified"] += 1
+                elif not resolved:
+                    result["errors"].append({"path": str(rel_spec.path), "target": str(target),
+                                             "message": "Binding target doesn't resolve to a prim"})
+    return result
+
+
+def check_payloads(layers: _LayerCache, geo_layer: Sdf.Layer, max_arc_depth: int = 3) -> Dict:
+    """
+    Every payload of the GEO layer points at a prim that exists in its payload layer
+
+    :return: type dict
+    """
+    result = _result("payloads")
+    for prim_spec in _prim_specs(geo_layer):
+        for payload in prim_spec.payloadList.GetAddedOrExplicitItems():
+            result["checked"] += 1
+            payload_layer = layers.open(_anchored_path(geo_layer, payload.assetPath)) if payload.assetPath else geo_layer
+            if payload_layer is None:
+                result["errors"].append({"path": str(prim_spec.path), "target": payload.assetPath,
+                                         "message": "Payload layer can't be opened"})
+                continue
+            payload_path = payload.primPath if not payload.primPath.isEmpty else (
+                Sdf.Path.absoluteRootPath.AppendChild(payload_layer.defaultPrim) if payload_layer.defaultPrim else None)
+            resolved = resolve_prim(layers, payload_layer, payload_path, max_arc_depth) if payload_path else False
+            if resolved is None:
+                result["unverified"] += 1
+            elif not resolved:
+                result["errors"].append({"path": str(prim_spec.path), "target": f"{payload.assetPath}{payload_path or ''}",
+                                         "message": "Payload prim doesn't exist in the payload layer"})
+    return result
+
+
+def _texture_exists(file_path: str, listings: Dict[str, set]) -> bool:
+    folder, name = os.path.split(file_path)
+    names = listings.get(folder) or set()
+    if "<UDIM>" in name:
+        return bool(fnmatch.filter(names, name.replace("<UDIM>", "[0-9][0-9][0-9][0-9]")))
+    return name in names
+
+
+def _list_folder(folder: str) -> set:
+    try:
+        with os.scandir(folder) as entries:
+            return {entry.name for entry in entries if entry.is_file()}
+    except OSError:
+        return set()
+
+
+def check_textures(luk_layer: Sdf.Layer, workers: int = 8) -> Dict:
+    """
+    Every asset valued attribute of the looks layer points at a file on disk. The files are grouped
+    by folder, and every folder is listed once, in parallel, instead of a stat per file.
+
+    :return: type dict
+    """
+    result = _result("textures")
+    files: Dict[str, List[str]] = {}
+    for prim_spec in _prim_specs(luk_layer):
+        for attr_spec in prim_spec.attributes:
+            if attr_spec.typeName != Sdf.ValueTypeNames.Asset or not attr_spec.HasDefaultValue():
+                continue
+            asset_path = attr_spec.default.path if attr_spec.default else ""
+            if asset_path:
+                files.setdefault(_anchored_path(luk_layer, asset_path), []).append(str(attr_spec.path))
+
+    folders = sorted({os.path.dirname(file_path) for file_path in files})
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        listings = dict(zip(folders, pool.map(_list_folder, folders)))
+
+    for file_path, attr_paths in files.items():
+        result["checked"] += 1
+        if not _texture_exists(file_path, listings):
+            result["errors"].append({"path": attr_paths[0], "target": file_path, "users": len(attr_paths),
+                                     "message": "Texture file doesn't exist"})
+    return result
+
+
+def composed_layer_paths(usd_base_location: str, asset_type: str, asset_name: str, usd_format: str = "usda") -> Dict[str, str]:
+    """
+    The payload, GEO and looks layers compose_pfx_usd writes for an asset
+    """
+    return {"payload": f"{usd_base_location}/Payload_{asset_type}_{asset_name}.{usd_format}",
+            "geo": f"{usd_base_location}/GEO_{asset_type}_{asset_name}.{usd_format}",
+            "luk": f"{usd_base_location}/LUK_{asset_type}_{asset_name}/LUK_{asset_type}_{asset_name}.{usd_format}"}
+
+
+def validate_layers(geo_path: str, luk_path: str = "", max_arc_depth: int = 3, workers: int = 8) -> Dict:
+    """
+    Validate the layers of a composed asset; the checks run in parallel.
+
+    :param geo_path:          type str:   The GEO layer, with the bindings and payloads
+    :param luk_path:          type str:   The looks layer, with the textures; the textures aren't checked without it
+    :param max_arc_depth:     type int:   How many layers deep references and payloads are followed
+    :param workers:           type int:   Threads for the checks and for listing the texture folders
+
+    :return: type dict : {"ok": bool, "errors": count, "checks": {name: {"checked", "unverified", "errors", "duration"}}}
+    """
+    layers = _LayerCache()
+    start = time.perf_counter()
+    with span("validate_open_layers", Path(geo_path).stem):
+        geo_layer = layers.open(geo_path)
+        luk_layer = layers.open(luk_path) if luk_path else None
+    if geo_layer is None or (luk_path and luk_layer is None):
+        missing = geo_path if geo_layer is None else luk_path
+        return {"ok": False, "errors": 1, "layers_open_time": time.perf_counter() - start,
+                "checks": {"layers": {"check": "layers", "checked": 1, "unverified": 0, "duration": 0.0,
+                                      "errors": [{"path": missing, "target": missing, "message": "Layer can't be opened"}]}}}
+    open_time = time.perf_counter() - start
+
+    def timed(check, *args):
+        check_start = time.perf_counter()
+        with span(f"validate_{check.__name__}", Path(geo_path).stem):
+            result = check(*args)
+        result["duration"] = time.perf_counter() - check_start
+        return result
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        futures = [pool.submit(timed, check_bindings, layers, geo_layer, max_arc_depth),
+                   pool.submit(timed, check_payloads, layers, geo_layer, max_arc_depth)]
+        if luk_layer is not None:
+            futures.append(pool.submit(timed, check_textures, luk_layer, workers))
+        checks = {result["check"]: result for result in (future.result() for future in futures)}
+
+    errors = sum(len(result["errors"]) for result in checks.values())
+    return {"ok": errors == 0, "errors": errors, "layers_open_time": open_time, "checks": checks}
+
+
+def validate_composed_asset(usd_base_location: str, asset_type: str, asset_name: str, usd_format: str = "usda",
+                            max_arc_depth: int = 3, workers: int = 8) -> Dict:
+    """
+    Validate the layers compose_pfx_usd wrote for an asset, see validate_layers
+
+    :return: type dict
+    """
+    paths = composed_layer_paths(usd_base_location, asset_type, asset_name, usd_format)
+    report = validate_layers(paths["geo"], paths["luk"], max_arc_depth, workers)
+    report["layers"] = paths
+    for result in report["checks"].values():
+        logging.info(f"{asset_name} {result['check']}: {result['checked']} checked, {result['unverified']} unverified, "
+                     f"{len(result['errors'])} errors in {result['duration']:.2f}s")
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    import sys
+    parser = argparse.ArgumentParser(description='Validate a composed asset on its Sdf layers, without composing it.')
+    parser.add_argument('usd_base_location', type=str, help='The folder compose_pfx_usd wrote the layers to')
+    parser.add_argument('asset_type', type=str, help='The asset type')
+    parser.add_argument('asset_name', type=str, help='The asset name')
+    parser.add_argument('--usd-format', choices=['usda', 'usdc', 'usd'], default='usda', help='The format of the layers')
+    parser.add_argument('--max-arc-depth', type=int, default=3, help='How many layers deep references and payloads are followed')
+    parser.add_argument('--workers', type=int, default=8, help='Threads for listing the texture folders')
+    parser.add_argument('--json', dest='json_path', default='', help='Optional path to write the report to')
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    report = validate_composed_asset(args.usd_base_location, args.asset_type, args.asset_name, args.usd_format,
+                                     args.max_arc_depth, args.workers)
+    for result in report["checks"].values():
+        for error in result["errors"][:20]:
+            print(f"{result['check']}: {error['message']}: {error['path']} -> {error['target']}")
+
+    if args.json_path:
+        with open(args.json_path, 'w') as file:
+            json.dump(report, file, indent=4)
+    sys.exit(0 if report["ok"] else 1)
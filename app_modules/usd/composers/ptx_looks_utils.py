@@ -0,0 +1,313 @@
+"""
+Helpers that work on the material records of a looks info file, before anything is authored.
+A record is a dictionary with the PhantomMatStruct fields: material_type, shader_name, meshes,
+parameters and sg_node.
+"""
+from typing import Dict, Iterable, Iterator, List
+import hashlib
+import json
+import logging
+import os
+
+
+# A payload per mesh, per group below the asset root, or one for the whole asset
+__PAYLOAD_GRANULARITIES__ = ("mesh", "group", "asset")
+
+# Bump when the layout of the composed layers changes, so older manifests trigger a full recompose
+__MANIFEST_VERSION__ = 1
+
+
+def _normalize(value):
+    """
+    Normalize a parameter value so equal values hash equally, eg: 1 and 1.0000000001
+    """
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)):
+        return round(float(value), 6)
+    if isinstance(value, (list, tuple)):
+        return [_normalize(val) for val in value]
+    if isinstance(value, dict):
+        return {key: _normalize(val) for key, val in sorted(value.items())}
+    return str(value)
+
+
+def iter_looks_info(looks_path: str, chunk_size: int = 1 << 20) -> Iterator[dict]:
+    """
+    Stream the material records of a json looks info one at a time, without loading the whole file.
+    Reads a json array of records, or json lines with a record per line. Only the current chunk and
+    the record being decoded are held in memory.
+
+    :param looks_path:    type str:   The looks info json
+    :param chunk_size:    type int:   How many characters to read at a time
+
+    :return: type Iterator[dict]
+    """
+    decoder = json.JSONDecoder()
+    with open(looks_path) as file:
+        buffer, pos = "", 0
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,[":
+                pos += 1
+            if pos < len(buffer) and buffer[pos] == "]":
+                return
+            try:
+                record, end = decoder.raw_decode(buffer, pos) if pos < len(buffer) else (None, pos)
+            except ValueError:
+                record = None
+            if record is None:
+                # The record isn't complete yet
+                chunk = file.read(chunk_size)
+                if not chunk:
+                    if pos < len(buffer):
+                        decoder.raw_decode(buffer, pos)
+                    return
+                buffer, pos = buffer[pos:] + chunk, 0
+                continue
+            yield record
+            pos = end
+
+
+def material_digest(mat_info: dict, param_names: Iterable[str] = None) -> str:
+    """
+    Hash the look of a material: its type and its normalized parameter values and textures.
+    Names, meshes and shading groups don't take part.
+
+    :param mat_info:      type dict:      The material record
+    :param param_names:   type Iterable:  Only these parameters take part, eg: the ones that get exported. All by default
+
+    :return: type str
+    """
+    param_names = None if param_names is None else set(param_names)
+    params = sorted([param["name"], _normalize(param.get("value")), _normalize(param.get("texture"))]
+                    for param in mat_info.get("parameters", [])
+                    if param_names is None or param["name"] in param_names)
+    payload = json.dumps({"material_type": mat_info.get("material_type"), "parameters": params}, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def merge_identical_materials(mat_list: Iterable[dict], param_names: Iterable[str] = None) -> List[dict]:
+    """
+    Collapse materials with identical looks into the first one of them. The merged record keeps
+    its name, gets the meshes of all of them, and lists the names of the materials merged into it
+    in merged_names.
+
+    :param mat_list:      type Iterable:  The material records
+    :param param_names:   type Iterable:  The parameters that make up the look, see material_digest
+
+    :return: type List[dict]
+    """
+    param_names = None if param_names is None else set(param_names)
+    merged: Dict[str, dict] = {}
+    known_meshes: Dict[str, set] = {}
+    total = 0
+    for mat_info in mat_list:
+        total += 1
+        digest = material_digest(mat_info, param_names)
+        first = merged.get(digest)
+        if first is None:
+            merged[digest] = dict(mat_info, meshes=list(mat_info.get("meshes", [])))
+            known_meshes[digest] = set(merged[digest]["meshes"])
+            continue
+
+        first.setdefault("merged_names", [first["shader_name"]]).append(mat_info["shader_name"])
+        known = known_meshes[digest]
+        for mesh in mat_info.get("meshes", []):
+            if mesh not in known:
+                known.add(mesh)
+                first["meshes"].append(mesh)
+
+    logging.info(f"Merged {total} materials into {len(merged)}")
+    return list(merged.values())
+
+
+def split_shards(mat_list: List[dict], shard_count: int) -> List[List[dict]]:
+    """
+    Split the material records into at most shard_count contiguous shards of about the same size.
+    The shards keep the order of the records, so merging them in order gives the same /Looks order.
+
+    :param mat_list:      type List:  The material records
+    :param shard_count:   type int:   How many shards to split into
+
+    :return: type List[List[dict]]
+    """
+    shard_count = max(1, min(shard_count, len(mat_list)))
+    size, extra = divmod(len(mat_list), shard_count)
+    shards, start = [], 0
+    for index in range(shard_count):
+        end = start + size + (1 if index < extra else 0)
+        shards.append(mat_list[start:end])
+        start = end
+    return [shard for shard in shards if shard]
+
+
+def payload_layout(mesh: str, asset_name: str, granularity: str = "group", group_depth: int = 1) -> tuple:
+    """
+    Where a mesh comes in for the "group" and "asset" payload granularities.
+    The first component of the Maya long name is the asset base prim, which the payload layer
+    references in as /<asset_name>, eg: |render_GRP|body_GRP|arm|armShape is /<asset_name>/body_GRP/arm.
+
+    :param mesh:          type str:   The Maya long name of the mesh shape
+    :param asset_name:    type str:   The asset name, the root prim of the layers
+    :param granularity:   type str:   "group" or "asset"
+    :param group_depth:   type int:   How many levels below the asset root the payload groups are
+
+    :return: type tuple(str, str, str) : (payload prim path in the GEO layer, prim path in the payload layer, mesh prim path)
+    """
+    mesh_parts = mesh.split('|')[2:-1]
+    mesh_path = '/'.join([f'/{asset_name}'] + mesh_parts)
+    if granularity == "asset":
+        return (f'/{asset_name}', f'/{asset_name}', mesh_path)
+
+    group_path = '/'.join([f'/{asset_name}'] + mesh_parts[:max(1, group_depth)])
+    return (group_path, group_path, mesh_path)
+
+
+def payload_prim_path(mesh: str, asset_name: str, granularity: str = "mesh", group_depth: int = 1) -> str:
+    """
+    The prim in the GEO layer that carries the payload the mesh comes in through
+
+    :return: type str
+    """
+    if granularity == "mesh":
+        return f'/{asset_name}/{mesh.split("|")[-1]}'
+    return payload_layout(mesh, asset_name, granularity, group_depth)[0]
+
+
+def mesh_prim_path(mesh: str, asset_name: str, granularity: str = "mesh", group_depth: int = 1) -> str:
+    """
+    The prim in the GEO layer a mesh is bound at, ie: the mesh payload prim, or the mesh under its group's payload
+
+    :return: type str
+    """
+    if granularity == "mesh":
+        return f'/{asset_name}/{mesh.split("|")[-1]}'
+    return payload_layout(mesh, asset_name, granularity, group_depth)[2]
+
+
+def _path_prefixes(prim_path: str) -> List[str]:
+    """
+    The ancestors of a prim path, from the root prim down, and the path itself, eg: /a/b -> [/a, /a/b]
+    """
+    parts = prim_path.split('/')[1:]
+    return ['/' + '/'.join(parts[:index]) for index in range(1, len(parts) + 1)]
+
+
+class BindingCompiler:
+    """
+    Compiles the meshes a material is bound to into the includes of its binding collection.
+    Every prim below the asset root whose meshes are all bound to the material is included once,
+    instead of its meshes; the expandPrims expansion rule brings the meshes back in. The hierarchy is
+    only known from the meshes it's built with, so they have to be all the meshes of the asset, eg: read
+    from its alembic, not the ones the looks info lists: a prim that also holds other meshes would pass
+    the material on to them. The asset root is never included, it also holds whatever isn't a mesh.
+    Mesh payloads are flat under the asset root, so only group and asset payloads have prims to collapse.
+    """
+    def __init__(self, mesh_paths: Iterable[str]) -> None:
+        self.meshes = set(mesh_paths)
+        # Prim path -> number of meshes at or below it
+        self.mesh_counts: Dict[str, int] = {}
+        for prim_path in self.meshes:
+            for prefix in _path_prefixes(prim_path):
+                self.mesh_counts[prefix] = self.mesh_counts.get(prefix, 0) + 1
+
+    def digest(self) -> str:
+        """
+        Hash of the meshes; collapsed includes only stay valid as long as they don't change
+        """
+        return hashlib.sha1("\n".join(sorted(self.meshes)).encode()).hexdigest()
+
+    def compile(self, mesh_paths: Iterable[str]) -> List[str]:
+        """
+        The smallest list of prims below the asset root that covers exactly the given meshes, in the
+        order of the meshes. Meshes outside the hierarchy are included as they are.
+
+        :param mesh_paths:    type Iterable:  The prim paths of the meshes bound to the material
+
+        :return: type List[str]
+        """
+        mesh_paths = list(dict.fromkeys(mesh_paths))
+        covered: Dict[str, int] = {}
+        for prim_path in mesh_paths:
+            if prim_path in self.meshes:
+                for prefix in _path_prefixes(prim_path):
+                    covered[prefix] = covered.get(prefix, 0) + 1
+
+        includes = {}
+        for prim_path in mesh_paths:
+            include = prim_path
+            if prim_path in self.meshes:
+                # The topmost prim below the asset root whose meshes are all covered
+                include = next(prefix for prefix in _path_prefixes(prim_path)[1:]
+                               if covered[prefix] == self.mesh_counts[prefix])
+            includes[include] = None
+        return list(includes)
+
+
+def compose_manifest(mat_list: Iterable[dict], asset_name: str, options: dict, param_names: Iterable[str] = None) -> dict:
+    """
+    Describe a compose for the next incremental run: a digest of every material's look and of its
+    mesh list, and the payload prims of the GEO layer.
+
+    :param mat_list:      type Iterable:  The material records as they're authored, ie: after any merging
+    :param asset_name:    type str:       The asset name
+    :param options:       type dict:      The compose options that change the layout of the layers
+
+    :return: type dict
+    """
+    materials = {}
+    payload_prims = set()
+    for mat_info in mat_list:
+        meshes = mat_info.get("meshes", [])
+        materials[mat_info["shader_name"]] = {
+            "digest": material_digest(mat_info, param_names),
+            "meshes": hashlib.sha1("\n".join(meshes).encode()).hexdigest(),
+            "merged_names": mat_info.get("merged_names", []),
+        }
+        payload_prims.update(payload_prim_path(mesh, asset_name, options.get("payload_granularity", "mesh"),
+                                               options.get("payload_group_depth", 1)) for mesh in meshes)
+
+    return {"version": __MANIFEST_VERSION__, "options": options, "materials": materials,
+            "payload_prims": sorted(payload_prims)}
+
+
+def diff_manifests(old: dict, new: dict) -> dict:
+    """
+    What an incremental compose has to touch to go from the old manifest to the new one.
+    When there's no old manifest, or it was written by another version or with other options,
+    every material counts as changed.
+
+    :return: type dict : {"full": bool, "changed": set of names to (re)author and bind, "removed": set of names,
+                          "stale_payloads": payload prims no mesh comes in through anymore}
+    """
+    old = old or {}
+    old_materials = old.get("materials", {})
+    full = old.get("version") != new["version"] or old.get("options") != new["options"]
+    if full:
+        changed = set(new["materials"])
+    else:
+        changed = {name for name, entry in new["materials"].items() if old_materials.get(name) != entry}
+
+    return {"full": full, "changed": changed, "removed": set(old_materials) - set(new["materials"]),
+            "stale_payloads": sorted(set(old.get("payload_prims", [])) - set(new["payload_prims"]))}
+
+
+def read_manifest(manifest_path: str) -> dict:
+    """
+    The manifest of the last compose, or None when there's none (or it can't be read)
+    """
+    try:
+        with open(manifest_path) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def write_manifest(manifest_path: str, manifest: dict):
+    """
+    Write the manifest next to the layers; written then renamed so a failed write leaves the old one
+    """
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, 'w') as file:
+        json.dump(manifest, file)
+    os.replace(tmp_path, manifest_path)
@@ -0,0 +1,452 @@
+"""
+Sdf level authoring backend for compose_pfx_usd.
+Writes the same payload, GEO and LUK specs as the Usd/UsdShade helpers in ptx_base_composer, but
+directly into Sdf.Layer specs inside Sdf.ChangeBlocks, so there's no change notification or
+recomposition per call. Prim handles are Sdf.PrimSpecs, materials are returned as their Sdf.Path.
+"""
+from __future__ import annotations
+from functools import lru_cache, partial
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from ptx_publish.core.ptx_lazy_import import lazy_import
+from ptx_publish.app_modules.usd.composers import ptx_base_composer as pbc
+
+Sdf = lazy_import("pxr.Sdf")
+Gf = lazy_import("pxr.Gf")
+ptusds = lazy_import("chitragupta.ptx_data_structs.ptx_usd_structs")
+
+
+def sdf_stage(pfx_stage_path: str, stage_up_axis: str = "Y") -> Sdf.Layer:
+    """
+    Open the layer at the path if it exists, else create a new one with the given up axis.
+
+    :param pfx_stage_path:    type str:   The path of the USD layer on disk
+    :param stage_up_axis:     type str:   The Up-Axis to use for a new layer. By default, it's Y-Axis
+
+    :return: type Sdf.Layer
+    """
+    if Path(pfx_stage_path).exists():
+        return Sdf.Layer.FindOrOpen(pfx_stage_path)
+
+    # .usd layers are always written with crate encoding, same as usd_stage
+    args = {"format": "usdc"} if Path(pfx_stage_path).suffix == ".usd" else {}
+    layer = Sdf.Layer.CreateNew(pfx_stage_path, args=args)
+    layer.pseudoRoot.SetInfo("upAxis", stage_up_axis)
+    return layer
+
+
+def sdf_define(layer: Sdf.Layer, prim_path: Sdf.Path, type_name: str = "") -> Sdf.PrimSpec:
+    """
+    The Sdf equivalent of Usd.Stage.DefinePrim; the parent spec has to exist already.
+
+    :param layer:         type Sdf.Layer: The layer to author the prim in
+    :param prim_path:     type Sdf.Path:  The path of the prim
+    :param type_name:     type str:       The prim type, eg: Scope, Mesh, Shader
+
+    :return: type Sdf.PrimSpec
+    """
+    prim_path = Sdf.Path(prim_path)
+    prim_spec = layer.GetPrimAtPath(prim_path)
+    if prim_spec:
+        prim_spec.specifier = Sdf.SpecifierDef
+        if type_name:
+            prim_spec.typeName = type_name
+        return prim_spec
+
+    parent_path = prim_path.GetParentPath()
+    parent_spec = layer.pseudoRoot if parent_path == Sdf.Path.absoluteRootPath else layer.GetPrimAtPath(parent_path)
+    return Sdf.PrimSpec(parent_spec, prim_path.name, Sdf.SpecifierDef, type_name)
+
+
+def sdf_attribute(prim_spec: Sdf.PrimSpec, attr_name: str, value_type: Sdf.ValueTypeName, value=None,
+                  variability: Sdf.Variability = None) -> Sdf.AttributeSpec:
+    """
+    Get or create a (non custom) attribute spec, and set its default value if one is given.
+
+    :return: type Sdf.AttributeSpec
+    """
+    attr_spec = prim_spec.layer.GetAttributeAtPath(prim_spec.path.AppendProperty(attr_name))
+    if not attr_spec:
+        attr_spec = Sdf.AttributeSpec(prim_spec, attr_name, value_type,
+                                      Sdf.VariabilityVarying if variability is None else variability, False)
+    if value is not None:
+        attr_spec.default = value
+    return attr_spec
+
+
+def sdf_relationship(prim_spec: Sdf.PrimSpec, rel_name: str) -> Sdf.RelationshipSpec:
+    """
+    Get or create a (non custom) relationship spec
+
+    :return: type Sdf.RelationshipSpec
+    """
+    rel_spec = prim_spec.layer.GetRelationshipAtPath(prim_spec.path.AppendProperty(rel_name))
+    if not rel_spec:
+        rel_spec = Sdf.RelationshipSpec(prim_spec, rel_name, False)
+    return rel_spec
+
+
+def sdf_connect(attr_spec: Sdf.AttributeSpec, source_spec: Sdf.PrimSpec, source_name: str, source_type: Sdf.ValueTypeName = None):
+    """
+    The Sdf equivalent of UsdShade ConnectToSource; creates the source output when it doesn't
+    exist yet, typed like the consuming attribute.
+    """
+    out_spec = sdf_attribute(source_spec, f"outputs:{source_name}", source_type or attr_spec.typeName)
+    attr_spec.connectionPathList.explicitItems = [out_spec.path]
+
+
+def sdf_apply_schema(prim_spec: Sdf.PrimSpec, schema: str):
+    """
+    The Sdf equivalent of applying an API schema; prepends it to the apiSchemas list op.
+    """
+    list_op = prim_spec.GetInfo("apiSchemas") if prim_spec.HasInfo("apiSchemas") else Sdf.TokenListOp()
+    items = list(list_op.prependedItems)
+    if schema not in items:
+        list_op.prependedItems = items + [schema]
+        prim_spec.SetInfo("apiSchemas", list_op)
+
+
+def sdf_root_prim(layer: Sdf.Layer, root_prim_name: str, create_xform: bool = True) -> Sdf.PrimSpec:
+    """
+    See if the layer has the root prim and return it, else create it and set it as the default prim.
+
+    :return: type Sdf.PrimSpec
+    """
+    root_spec = layer.GetPrimAtPath(f'/{root_prim_name}')
+    if root_spec:
+        return root_spec
+
+    root_spec = sdf_define(layer, f'/{root_prim_name}', "Xform" if create_xform else "")
+    layer.defaultPrim = root_prim_name
+    return root_spec
+
+
+def sdf_root_asset_info(root_spec: Sdf.PrimSpec, asset_path: str, asset_name: str):
+    """
+    Adds in the asset info on the given prim spec
+    """
+    root_spec.SetInfo("assetInfo", {'identifier': Sdf.AssetPath(asset_path), 'name': asset_name})
+
+
+def sdf_set_kind(prim_spec: Sdf.PrimSpec, kind: str):
+    prim_spec.kind = kind
+
+
+def sdf_material_custom_data(layer: Sdf.Layer, mtl_path: Sdf.Path, key: str, value):
+    """
+    Set a custom data entry on the material prim spec
+    """
+    layer.GetPrimAtPath(mtl_path).SetInfoDictionaryValue("customData", key, value)
+
+
+def sdf_reference(prim_spec: Sdf.PrimSpec, asset_path: str, asset_prim_path: str) -> Sdf.Reference:
+    """
+    Return the prepended reference with the asset path and prim path, adding it in front if it doesn't exist
+
+    :return: type Sdf.Reference
+    """
+    for ref in prim_spec.referenceList.prependedItems:
+        if (ref.assetPath == asset_path) and (ref.primPath == asset_prim_path):
+            return ref
+
+    usd_ref = Sdf.Reference(asset_path, asset_prim_path)
+    prim_spec.referenceList.prependedItems.insert(0, usd_ref)
+    return usd_ref
+
+
+def sdf_scope(layer: Sdf.Layer, parent_spec: Sdf.PrimSpec = None, scope_name: str = "Scope") -> Sdf.PrimSpec:
+    """
+    Define a scope under the parent prim spec, or at the root
+
+    :return: type Sdf.PrimSpec
+    """
+    parent_path = parent_spec.path if parent_spec else Sdf.Path.absoluteRootPath
+    return sdf_define(layer, parent_path.AppendChild(scope_name), "Scope")
+
+
+def sdf_mesh_payload(layer: Sdf.Layer, prim_path: str, extern_payload_path: str, payload_prim_path: str) -> Sdf.PrimSpec:
+    """
+    Get the mesh prim spec with a payload, if it exists. If it doesn't exist, create one.
+
+    :return: type Sdf.PrimSpec
+    """
+    mesh_spec = layer.GetPrimAtPath(prim_path)
+    if mesh_spec:
+        return mesh_spec
+
+    mesh_spec = sdf_define(layer, prim_path, "Mesh")
+    mesh_spec.payloadList.prependedItems.append(Sdf.Payload(extern_payload_path, payload_prim_path))
+    sdf_apply_schema(mesh_spec, "MaterialBindingAPI")
+    return mesh_spec
+
+
+def sdf_group_payload(layer: Sdf.Layer, prim_path: str, extern_payload_path: str, payload_prim_path: str) -> Sdf.PrimSpec:
+    """
+    The Sdf equivalent of usd_group_payload
+
+    :return: type Sdf.PrimSpec
+    """
+    prim_path = Sdf.Path(prim_path)
+    for prefix in prim_path.GetPrefixes():
+        if not layer.GetPrimAtPath(prefix):
+            sdf_define(layer, prefix, "Xform")
+
+    group_spec = layer.GetPrimAtPath(prim_path)
+    payload = Sdf.Payload(extern_payload_path, Sdf.Path(payload_prim_path))
+    if payload in group_spec.payloadList.prependedItems:
+        return group_spec
+
+    group_spec.payloadList.prependedItems.append(payload)
+    sdf_apply_schema(group_spec, "MaterialBindingAPI")
+    return group_spec
+
+
+def sdf_create_texture(layer: Sdf.Layer, parent_spec: Sdf.PrimSpec, texture_path: str, param_name: str,
+                       uv_tile: ptusds.Float2 = None, mtl_name: str = "MtlX") -> tuple[Sdf.PrimSpec, Sdf.PrimSpec]:
+    """
+    The Sdf equivalent of usd_create_texture: a UsdUVTexture node and its uv coordinate node
+
+    :return: type tuple(Sdf.PrimSpec, Sdf.PrimSpec)
+    """
+    vtn = Sdf.ValueTypeNames
+    tex_scope = sdf_define(layer, parent_spec.path.AppendChild(f"{mtl_name}Textures"), "Scope")
+
+    tex_node = sdf_define(layer, tex_scope.path.AppendChild(f"{param_name}_UsdUVTex"), "Shader")
+    sdf_attribute(tex_node, "info:id", vtn.Token, "ND_UsdUVTexture", Sdf.VariabilityUniform)
+    sdf_attribute(tex_node, "inputs:file", vtn.Asset, Sdf.AssetPath(texture_path))
+    sdf_attribute(tex_node, "inputs:wrapS", vtn.Token, "repeat")
+    sdf_attribute(tex_node, "inputs:wrapT", vtn.Token, "repeat")
+    sdf_attribute(tex_node, "outputs:a", vtn.Float)
+
+    if "normal" in param_name or "tangent" in param_name:
+        sdf_attribute(tex_node, "inputs:color_space", vtn.String, "raw")
+        sdf_attribute(tex_node, "inputs:scale", vtn.Float4, Gf.Vec4f(2.0, 2.0, 2.0, 1.0))
+        sdf_attribute(tex_node, "inputs:bias", vtn.Float4, Gf.Vec4f(-1.0, -1.0, -1.0, 0.0))
+        sdf_attribute(tex_node, "outputs:rgb", vtn.Normal3f)
+    else:
+        sdf_attribute(tex_node, "inputs:color_space", vtn.String, "sRGB")
+        sdf_attribute(tex_node, "inputs:scale", vtn.Float4, Gf.Vec4f(1.0, 1.0, 1.0, 1.0))
+        sdf_attribute(tex_node, "outputs:r", vtn.Float)
+        sdf_attribute(tex_node, "outputs:g", vtn.Float)
+        sdf_attribute(tex_node, "outputs:b", vtn.Float)
+        sdf_attribute(tex_node, "outputs:rgb", vtn.Color3f)
+
+    uv_node = sdf_define(layer, tex_scope.path.AppendChild(f"{param_name}_UsdUVNode"), "Shader")
+    sdf_attribute(uv_node, "info:id", vtn.Token, "ND_texcoord_vector2", Sdf.VariabilityUniform)
+    sdf_attribute(uv_node, "inputs:index", vtn.Int, 0)
+    sdf_attribute(uv_node, "outputs:out", vtn.Float2)
+
+    sdf_connect(sdf_attribute(tex_node, "inputs:st", vtn.Token), uv_node, "out")
+    return (tex_node, uv_node)
+
+
+def sdf_shared_texture(layer: Sdf.Layer, textures: pbc.SharedTextures, texture_path: str, param_name: str, uv_index: int = 0) -> Sdf.PrimSpec:
+    """
+    The Sdf equivalent of usd_shared_texture
+
+    :return: type Sdf.PrimSpec
+    """
+    key = textures.key(texture_path, param_name, uv_index)
+    tex_node = textures.tex_nodes.get(key)
+    if tex_node is not None:
+        return tex_node
+
+    vtn = Sdf.ValueTypeNames
+    sdf_define(layer, textures.scope_path, "Scope")
+
+    uv_node = textures.uv_nodes.get(uv_index)
+    if uv_node is None:
+        uv_node = sdf_define(layer, textures.scope_path.AppendChild(textures.uv_prim_name(uv_index)), "Shader")
+        sdf_attribute(uv_node, "info:id", vtn.Token, "ND_texcoord_vector2", Sdf.VariabilityUniform)
+        sdf_attribute(uv_node, "inputs:index", vtn.Int, uv_index)
+        sdf_attribute(uv_node, "outputs:out", vtn.Float2)
+        textures.uv_nodes[uv_index] = uv_node
+
+    color_space, scale, bias = pbc.texture_settings(param_name)
+    tex_node = sdf_define(layer, textures.scope_path.AppendChild(textures.prim_name(key)), "Shader")
+    sdf_attribute(tex_node, "info:id", vtn.Token, "ND_UsdUVTexture", Sdf.VariabilityUniform)
+    sdf_attribute(tex_node, "inputs:file", vtn.Asset, Sdf.AssetPath(texture_path))
+    sdf_attribute(tex_node, "inputs:wrapS", vtn.Token, "repeat")
+    sdf_attribute(tex_node, "inputs:wrapT", vtn.Token, "repeat")
+    sdf_attribute(tex_node, "outputs:a", vtn.Float)
+    sdf_attribute(tex_node, "inputs:color_space", vtn.String, color_space)
+    sdf_attribute(tex_node, "inputs:scale", vtn.Float4, Gf.Vec4f(*scale))
+    if bias is not None:
+        sdf_attribute(tex_node, "inputs:bias", vtn.Float4, Gf.Vec4f(*bias))
+        sdf_attribute(tex_node, "outputs:rgb", vtn.Normal3f)
+    else:
+        sdf_attribute(tex_node, "outputs:r", vtn.Float)
+        sdf_attribute(tex_node, "outputs:g", vtn.Float)
+        sdf_attribute(tex_node, "outputs:b", vtn.Float)
+        sdf_attribute(tex_node, "outputs:rgb", vtn.Color3f)
+    sdf_connect(sdf_attribute(tex_node, "inputs:st", vtn.Token), uv_node, "out")
+
+    textures.tex_nodes[key] = tex_node
+    return tex_node
+
+
+def _author_bool(input_name: str, value_type, layer: Sdf.Layer, mat_spec: Sdf.PrimSpec, shader: Sdf.PrimSpec, param: dict, mtl_name: str,
+                 textures: pbc.SharedTextures = None):
+    sdf_attribute(shader, f"inputs:{input_name}", value_type, param["value"] == "true")
+
+
+def _author_float(input_name: str, value_type, layer: Sdf.Layer, mat_spec: Sdf.PrimSpec, shader: Sdf.PrimSpec, param: dict, mtl_name: str,
+                  textures: pbc.SharedTextures = None):
+    sdf_attribute(shader, f"inputs:{input_name}", value_type, param["value"])
+
+
+def _author_vec3(input_name: str, value_type, layer: Sdf.Layer, mat_spec: Sdf.PrimSpec, shader: Sdf.PrimSpec, param: dict, mtl_name: str,
+                 textures: pbc.SharedTextures = None):
+    if "texture" in param and textures is not None:
+        tex_node = sdf_shared_texture(layer, textures, param["texture"]["path"], input_name)
+        sdf_connect(sdf_attribute(shader, f"inputs:{input_name}", value_type), tex_node, "rgb")
+    elif "texture" in param:
+        tex_node, coord_node = sdf_create_texture(layer, mat_spec, param["texture"]["path"], input_name, None, mtl_name)
+        sdf_connect(sdf_attribute(shader, f"inputs:{input_name}", value_type), tex_node, "rgb")
+    else:
+        val_arr = param["value"]
+        sdf_attribute(shader, f"inputs:{input_name}", value_type, Gf.Vec3f(val_arr[0], val_arr[1], val_arr[2]))
+
+
+@lru_cache(maxsize=None)
+def mtlx_param_dispatch(shader_prim: str = "aiStandardSurface") -> Dict[str, Callable]:
+    """
+    The Sdf counterpart of ptx_base_composer.mtlx_param_dispatch, compiled from the same field types.
+    Every routine takes (layer, material spec, surface shader spec, parameter record, material name, shared textures).
+
+    :return: type dict : Maya parameter name -> authoring routine
+    """
+    routines = {
+        ptusds.UsdAttributeType.bool: (_author_bool, Sdf.ValueTypeNames.Bool),
+        ptusds.UsdAttributeType.float: (_author_float, Sdf.ValueTypeNames.Float),
+        ptusds.UsdAttributeType.vector3: (_author_vec3, Sdf.ValueTypeNames.Normal3f),
+    }
+    dispatch = {}
+    for maya_name, (input_name, param_type) in pbc.mtlx_param_types(shader_prim).items():
+        routine, value_type = routines.get(param_type, (_author_vec3, Sdf.ValueTypeNames.Color3f))
+        dispatch[maya_name] = partial(routine, input_name, value_type)
+    return dispatch
+
+
+def sdf_create_mtlx(layer: Sdf.Layer, parent_spec: Sdf.PrimSpec = None, mtl_name: str = "MtlX", mtl_param_list: list = [],
+                    mtlx_type: str = "/__class_mtl__/mtlxmaterial", shader_type: str = "ND_standard_surface_surfaceshader",
+                    textures: pbc.SharedTextures = None) -> Sdf.Path:
+    """
+    The Sdf equivalent of usd_create_mtlx
+
+    :return: type Sdf.Path : The path of the material
+    """
+    vtn = Sdf.ValueTypeNames
+    dispatch = mtlx_param_dispatch()
+
+    mat_path = parent_spec.path.AppendChild(f"{mtl_name}")
+    mat_spec = sdf_define(layer, mat_path, "Material")
+    if Sdf.Path(mtlx_type) not in mat_spec.inheritPathList.prependedItems:
+        mat_spec.inheritPathList.prependedItems.append(Sdf.Path(mtlx_type))
+
+    shd_std_srf = sdf_define(layer, mat_path.AppendChild(f"{mtl_name}_standard_surface"), "Shader")
+    sdf_attribute(shd_std_srf, "info:id", vtn.Token, shader_type, Sdf.VariabilityUniform)
+
+    for param in mtl_param_list:
+        author = dispatch.get(param["name"])
+        if author is not None:
+            author(layer, mat_spec, shd_std_srf, param, mtl_name, textures)
+
+    shd_displ = sdf_define(layer, mat_path.AppendChild("Displacement"), "Shader")
+    sdf_attribute(shd_displ, "info:id", vtn.Token, "ND_displacement_float", Sdf.VariabilityUniform)
+
+    sdf_connect(sdf_attribute(mat_spec, "outputs:mtlx:surface", vtn.Token), shd_std_srf, "surface")
+    sdf_connect(sdf_attribute(mat_spec, "outputs:mtlx:displacement", vtn.Token), shd_displ, "out")
+    return mat_path
+
+
+def sdf_apply_material(prim_spec: Sdf.PrimSpec, mtl_name: str, mtl_path: Sdf.Path, mesh_list: List[Sdf.PrimSpec]):
+    """
+    The Sdf equivalent of usd_apply_material; the collection targets are written in one bulk set.
+    """
+    sdf_apply_schema(prim_spec, "MaterialBindingAPI")
+    collection_name = f"mat_bind_{mtl_name}"
+    sdf_apply_schema(prim_spec, f"CollectionAPI:{collection_name}")
+
+    if mesh_list:
+        includes = sdf_relationship(prim_spec, f"collection:{collection_name}:includes")
+        targets = list(includes.targetPathList.prependedItems)
+        known = set(targets)
+        for each_mesh in mesh_list:
+            mesh_path = each_mesh if isinstance(each_mesh, Sdf.Path) else each_mesh.path
+            if mesh_path not in known:
+                known.add(mesh_path)
+                targets.append(mesh_path)
+        includes.targetPathList.prependedItems = targets
+
+    sdf_attribute(prim_spec, f"collection:{collection_name}:expansionRule", Sdf.ValueTypeNames.Token, "expandPrims",
+                  Sdf.VariabilityUniform)
+    binding = sdf_relationship(prim_spec, f"material:binding:collection:{collection_name}")
+    binding.targetPathList.explicitItems = [prim_spec.path.AppendProperty(f"collection:{collection_name}"), mtl_path]
+
+
+def sdf_remove_prim(layer: Sdf.Layer, prim_path: str):
+    """
+    Remove the prim spec, if it exists, from the layer
+    """
+    prim_spec = layer.GetPrimAtPath(prim_path)
+    if not prim_spec:
+        return
+    if prim_spec.path.GetParentPath() == Sdf.Path.absoluteRootPath:
+        del layer.rootPrims[prim_spec.name]
+    else:
+        del prim_spec.nameParent.nameChildren[prim_spec.name]
+
+
+def sdf_remove_material_binding(prim_spec: Sdf.PrimSpec, mtl_name: str):
+    """
+    The Sdf equivalent of usd_remove_material_binding
+    """
+    collection_name = f"mat_bind_{mtl_name}"
+    if prim_spec.HasInfo("apiSchemas"):
+        list_op = prim_spec.GetInfo("apiSchemas")
+        list_op.prependedItems = [item for item in list_op.prependedItems if item != f"CollectionAPI:{collection_name}"]
+        prim_spec.SetInfo("apiSchemas", list_op)
+
+    for prop_name in (f"collection:{collection_name}:includes", f"collection:{collection_name}:expansionRule",
+                      f"material:binding:collection:{collection_name}"):
+        prop_spec = prim_spec.layer.GetPropertyAtPath(prim_spec.path.AppendProperty(prop_name))
+        if prop_spec:
+            prim_spec.RemoveProperty(prop_spec)
+
+
+class SdfComposeBackend:
+    """
+    Authoring backend for compose_pfx_usd that writes Sdf specs directly
+    """
+    name = "sdf"
+    stage = staticmethod(sdf_stage)
+    root_prim = staticmethod(sdf_root_prim)
+    asset_info = staticmethod(sdf_root_asset_info)
+    set_kind = staticmethod(sdf_set_kind)
+    material_custom_data = staticmethod(sdf_material_custom_data)
+    reference = staticmethod(sdf_reference)
+    scope = staticmethod(sdf_scope)
+    mesh_payload = staticmethod(sdf_mesh_payload)
+    group_payload = staticmethod(sdf_group_payload)
+    create_mtlx = staticmethod(sdf_create_mtlx)
+    apply_material = staticmethod(sdf_apply_material)
+    remove_prim = staticmethod(sdf_remove_prim)
+    remove_material_binding = staticmethod(sdf_remove_material_binding)
+
+    @staticmethod
+    def material(layer: Sdf.Layer, mtl_path: str) -> Sdf.Path:
+        return Sdf.Path(mtl_path)
+
+    @staticmethod
+    def root_layer(layer: Sdf.Layer) -> Sdf.Layer:
+        return layer
+
+    @staticmethod
+    def edit_block():
+        return Sdf.ChangeBlock()
+
+    @staticmethod
+    def save(layer: Sdf.Layer):
+        layer.Save()
@@ -0,0 +1,267 @@
+"""
+A pool of open Usd stages for long running compose processes, backed by a Usd.StageCache.
+Stages are kept in least recently used order and evicted once the pool holds more than
+max_stages of them, or more than max_memory_mb by the approximate memory of their layers.
+
+    pool = StagePool(max_stages=32, max_memory_mb=4096)
+    set_active_pool(pool)       # usd_stage() now opens through the pool
+    ...
+    print(pool.stats())
+
+The pool only holds Usd stages, so it's used by the "usd" compose backend; the "sdf" backend
+works on layers, which the Sdf layer registry already shares.
+"""
+from __future__ import annotations
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict
+import logging
+import os
+import threading
+
+from ptx_publish.core.ptx_lazy_import import lazy_import
+
+Usd = lazy_import("pxr.Usd")
+
+
+# Load policies by name, see StagePool.open
+__LOAD_POLICIES__ = ("all", "none")
+
+
+def load_policy(name: str) -> Usd.Stage.InitialLoadSet:
+    """
+    The Usd load policy for a name: "all" loads every payload, "none" opens with payloads unloaded,
+    eg: for stages that are only referenced or inspected
+    """
+    if name not in __LOAD_POLICIES__:
+        raise ValueError(f"Unknown load policy {name}; expected one of {__LOAD_POLICIES__}")
+    return Usd.Stage.LoadAll if name == "all" else Usd.Stage.LoadNone
+
+
+def stage_memory_bytes(stage: Usd.Stage) -> int:
+    """
+    Approximate memory of a stage: the size on disk of the layers it uses. Layers shared between
+    stages are counted for each of them, and layers that aren't saved yet count for nothing.
+
+    :return: type int
+    """
+    total = 0
+    for layer in stage.GetUsedLayers():
+        try:
+            total += os.path.getsize(layer.realPath) if layer.realPath else 0
+        except OSError:
+            pass
+    return total
+
+
+def layer_stamps(stage: Usd.Stage) -> Dict[str, tuple]:
+    """
+    The modification time and size on disk of every layer the stage uses, by real path, to tell
+    when another process rewrote one of them
+
+    :return: type dict : real path -> (mtime in ns, size in bytes)
+    """
+    stamps = {}
+    for layer in stage.GetUsedLayers():
+        if layer.realPath:
+            try:
+                stat = os.stat(layer.realPath)
+            except OSError:
+                continue
+            stamps[Path(layer.realPath).resolve().as_posix()] = (stat.st_mtime_ns, stat.st_size)
+    return stamps
+
+
+class StagePool:
+    """
+    Least recently used pool of open stages, keyed by the stage path and its load policy.
+
+    :param max_stages:        type int:   How many stages to keep open at most
+    :param max_memory_mb:     type float: How much approximate memory the stages can take; 0 for no limit
+    :param load:              type str:   The default load policy, "all" or "none"
+    """
+    def __init__(self, max_stages: int = 32, max_memory_mb: float = 0.0, load: str = "all") -> None:
+        if max_stages < 1:
+            raise ValueError(f"max_stages has to be at least 1, got {max_stages}")
+        load_policy(load)
+        self.max_stages = max_stages
+        self.max_memory_mb = max_memory_mb
+        self.load = load
+        self.cache = Usd.StageCache()
+        # (stage path, load) -> [Usd.StageCache.Id, approximate bytes, layer_stamps], least recently used first
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _key(stage_path: str, load: str) -> tuple:
+        return (Path(stage_path).resolve().as_posix(), load)
+
+    def open(self, stage_path: str, load: str = None, opener: Callable = None) -> Usd.Stage:
+        """
+        The pooled stage of the path, opened on a miss.
+
+        :param stage_path:    type str:       The path of the stage on disk
+        :param load:          type str:       The load policy, "all" or "none"; the pool's default if not given
+        :param opener:        type Callable:  Opens the stage on a miss, called with the path and the
+                                              Usd load policy. Usd.Stage.Open by default
+
+        :return: type Usd.Stage
+        """
+        load = load or self.load
+        key = self._key(stage_path, load)
+        with self._lock:
+            entry = self._entries.get(key)
+            stage = self.cache.Find(entry[0]) if entry else None
+            if stage and self._reload_stale(stage, entry):
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return stage
+            if entry:
+                # A layer of the stage is gone from disk; open it again from scratch
+                self._drop(key)
+            self.misses += 1
+
+        # Opened outside the lock, other threads can use the pool meanwhile
+        stage = (opener or Usd.Stage.Open)(stage_path, load_policy(load))
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and self.cache.Find(entry[0]):
+                # Another thread opened it first
+                self._entries.move_to_end(key)
+                return self.cache.Find(entry[0])
+            self._entries[key] = [self.cache.Insert(stage), stage_memory_bytes(stage), layer_stamps(stage)]
+            self._evict()
+        return stage
+
+    @staticmethod
+    def _reload_stale(stage: Usd.Stage, entry: list) -> bool:
+        """
+        Reload the layers of a pooled stage that changed on disk since they were opened or saved, and the root
+        layer if a compose that failed half way left it unsaved. False when one of the layers is gone from disk.
+        """
+        root_layer = stage.GetRootLayer()
+        if root_layer.dirty:
+            root_layer.Reload()
+        stamps = entry[2]
+        for layer in stage.GetUsedLayers():
+            real_path = Path(layer.realPath).resolve().as_posix() if layer.realPath else None
+            if real_path not in stamps:
+                continue
+            try:
+                stat = os.stat(real_path)
+            except OSError:
+                return False
+            if (stat.st_mtime_ns, stat.st_size) != stamps[real_path]:
+                logging.debug(f"Reloading {real_path}, it changed on disk since the stage pool opened it")
+                layer.Reload(True)
+        entry[2] = layer_stamps(stage)
+        entry[1] = stage_memory_bytes(stage)
+        return True
+
+    def refresh(self, stage: Usd.Stage):
+        """
+        Measure the memory of a pooled stage again and take note of its layers as they're on disk now,
+        eg: once a compose has saved them, so they aren't taken for stale by this or any other pooled stage
+        """
+        with self._lock:
+            stage_id = self.cache.GetId(stage)
+            stamps = layer_stamps(stage)
+            for entry in self._entries.values():
+                if entry[0] == stage_id:
+                    entry[1] = stage_memory_bytes(stage)
+                    entry[2] = stamps
+                else:
+                    entry[2].update((path, stamp) for path, stamp in stamps.items() if path in entry[2])
+            self._evict()
+
+    def _memory_bytes(self) -> int:
+        return sum(entry[1] for entry in self._entries.values())
+
+    def _evict(self):
+        # The most recently used stage always stays, however large it is
+        while len(self._entries) > 1 and (len(self._entries) > self.max_stages or
+                                          (self.max_memory_mb and self._memory_bytes() > self.max_memory_mb * 1024 * 1024)):
+            (stage_path, load), (stage_id, _, _) = self._entries.popitem(last=False)
+            self.cache.Erase(stage_id)
+            self.evictions += 1
+            logging.debug(f"Evicted {stage_path} ({load}) from the stage pool")
+
+    def evict(self, stage_path: str, load: str = None):
+        """
+        Drop a stage from the pool, eg: after its layers were rewritten by another process
+        """
+        with self._lock:
+            self._drop(self._key(stage_path, load or self.load))
+
+    def evict_layer(self, layer_path: str) -> int:
+        """
+        Drop every stage that uses the layer, eg: before the layer is created again after it was deleted
+        from disk. Evicting only the stage of the layer isn't enough: any pooled stage referencing it
+        keeps it in the Sdf layer registry, and it can't be created anew while it's there.
+
+        :return: type int : The number of stages dropped
+        """
+        real_path = Path(layer_path).resolve().as_posix()
+        with self._lock:
+            keys = [key for key, entry in self._entries.items()
+                    if key[0] == real_path or real_path in entry[2] or self._uses_layer(entry[0], real_path)]
+            for key in keys:
+                self._drop(key)
+        return len(keys)
+
+    def _uses_layer(self, stage_id, real_path: str) -> bool:
+        stage = self.cache.Find(stage_id)
+        return bool(stage) and any(layer.realPath and Path(layer.realPath).resolve().as_posix() == real_path
+                                   for layer in stage.GetUsedLayers())
+
+    def _drop(self, key: tuple):
+        entry = self._entries.pop(key, None)
+        if entry:
+            self.cache.Erase(entry[0])
+            self.evictions += 1
+
+    def clear(self):
+        """
+        Drop every stage; the counters are kept
+        """
+        with self._lock:
+            self._entries.clear()
+            self.cache.Clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict:
+        """
+        The counters of the pool, for tuning its size
+
+        :return: type dict
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "hit_rate": self.hits / lookups if lookups else 0.0, "stages": len(self._entries),
+                    "max_stages": self.max_stages, "memory_mb": self._memory_bytes() / (1024.0 * 1024.0),
+                    "max_memory_mb": self.max_memory_mb}
+
+
+class _PoolState:
+    """
+    The pool usd_stage opens through, if any
+    """
+    pool: StagePool = None
+
+
+def set_active_pool(pool: StagePool = None):
+    """
+    Make usd_stage open its stages through the pool; None goes back to opening them fresh
+    """
+    _PoolState.pool = pool
+
+
+def active_pool() -> StagePool:
+    return _PoolState.pool
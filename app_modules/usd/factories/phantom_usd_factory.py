@@ -1,11 +1,10 @@
 # copyright PhantomFX 2024
 from abc import ABC, abstractmethod
-import importlib.util
 import logging
-import json
 from pathlib import Path
 
-logging.basicConfig(level=logging.WARNING)
+from ....core.ptx_module_registry import registry
+from ....core.ptx_trace import call_asset, span
 
 
 class PhantomBaseUsdProcess(ABC):
@@ -39,9 +38,8 @@ class PhantomUsdFactory:
     * The "Factory" class to return an initialized object of the particular type of UsdType
     """
     def __init__(self) -> None:
-        self._usd = dict()
-        with open(f"{Path(__file__).parent}/phantom_usd_defs.conf") as file:
-            self._usd = json.load(file)
+        # The conf is parsed once per process and shared between factory instances
+        self._usd = registry.config(f"{Path(__file__).parent}/phantom_usd_defs.conf")
 
     def register_usd_type(self, usd_type, prim):
         """
@@ -53,7 +51,7 @@ class PhantomUsdFactory:
         if prim not in self._usd[usd_type].keys():
             raise ValueError("Given USD prim isn't registered with the system")
                 
-        return importlib.util.find_spec(".".join(['ptx_publish', 'app_modules', 'usd', usd_type, self._usd[usd_type][prim]]))
+        return registry.find_spec(".".join(['ptx_publish', 'app_modules', 'usd', usd_type, self._usd[usd_type][prim]]))
 
     def create(self, mod_spec, *args, **kwargs):
         """
@@ -62,12 +60,14 @@ class PhantomUsdFactory:
         if mod_spec == None:
             raise ValueError("Invalid module specified")
         
-        mod = mod_spec.loader.load_module()
-        NodeBuilder = mod.PhantomUsdNodeBuilder()
-        return NodeBuilder(*args, **kwargs)
+        # The first argument is the prim's own name, eg: a material's; the asset comes from the compose span
+        with span("PhantomUsdFactory.create", call_asset(args, kwargs, positional=False), module=mod_spec.name):
+            NodeBuilder = registry.builder(mod_spec, "PhantomUsdNodeBuilder")()
+            return NodeBuilder(*args, **kwargs)
     
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
     usdf = PhantomUsdFactory()
     mat_mod_spec = usdf.register_usd_type("shaders", "aiStandardSurface")
     mat = usdf.create(mat_mod_spec, "MtlX", [])
@@ -1,42 +1,37 @@
 from chitragupta.ptx_data_structs import ptx_usd_structs as pusds
 
-from dataclasses import dataclass, field
+from dataclasses import InitVar, dataclass, field
 
+from . import shader_inputs as si
 
+
+@si.shader_inputs
 @dataclass
 class PhantomUsdMaterialPreview(pusds.PhantomUsdMaterialBase):
     """
     * Defines all properties in a USD Preview Surface Material
     """
-    clearcoat: pusds.PhantomUsdFloatAttribute = field(default_factory=pusds.PhantomUsdFloatAttribute)
-    clearcoatRoughness: pusds.PhantomUsdFloatAttribute = field(default_factory=pusds.PhantomUsdFloatAttribute)
-    diffuseColor: pusds.PhantomUsdColor3Attribute = field(default_factory=pusds.PhantomUsdColor3Attribute)
-    emissiveColor: pusds.PhantomUsdColor3Attribute = field(default_factory=pusds.PhantomUsdColor3Attribute)
-    opacity: pusds.PhantomUsdFloatAttribute = field(default_factory=pusds.PhantomUsdFloatAttribute)
-    ior: pusds.PhantomUsdFloatAttribute = field(default_factory=pusds.PhantomUsdFloatAttribute)
-    metallic: pusds.PhantomUsdFloatAttribute = field(default_factory=pusds.PhantomUsdFloatAttribute)
-    normal: pusds.PhantomUsdVector3Attribute = field(default_factory=pusds.PhantomUsdVector3Attribute)
-    roughness: pusds.PhantomUsdFloatAttribute = field(default_factory=pusds.PhantomUsdFloatAttribute)
-    specularColor: pusds.PhantomUsdColor3Attribute = field(default_factory=pusds.PhantomUsdColor3Attribute)
-    displacement: pusds.PhantomUsdFloatAttribute = field(default_factory=pusds.PhantomUsdFloatAttribute)
-    occlusion: pusds.PhantomUsdFloatAttribute = field(default_factory=pusds.PhantomUsdFloatAttribute)
-
-    def __post_init__(self):
+    clearcoat: InitVar[pusds.PhantomUsdFloatAttribute] = None
+    clearcoatRoughness: InitVar[pusds.PhantomUsdFloatAttribute] = None
+    diffuseColor: InitVar[pusds.PhantomUsdColor3Attribute] = None
+    emissiveColor: InitVar[pusds.PhantomUsdColor3Attribute] = None
+    opacity: InitVar[pusds.PhantomUsdFloatAttribute] = None
+    ior: InitVar[pusds.PhantomUsdFloatAttribute] = None
+    metallic: InitVar[pusds.PhantomUsdFloatAttribute] = None
+    normal: InitVar[pusds.PhantomUsdVector3Attribute] = None
+    roughness: InitVar[pusds.PhantomUsdFloatAttribute] = None
+    specularColor: InitVar[pusds.PhantomUsdColor3Attribute] = None
+    displacement: InitVar[pusds.PhantomUsdFloatAttribute] = None
+    occlusion: InitVar[pusds.PhantomUsdFloatAttribute] = None
+
+    # Only the inputs that were set, see shader_inputs
+    _inputs: dict = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self, *inputs):
         """
-        * Initialize the attribute names if they are empty
+        * Keep the inputs that were passed in
         """
-        if self.clearcoat.name == '': self.clearcoat.name = 'clearcoat'
-        if self.clearcoatRoughness.name == '': self.clearcoatRoughness.name = 'clearcoatRoughness'
-        if self.diffuseColor.name == '': self.diffuseColor.name = 'diffuseColor'
-        if self.emissiveColor.name == '': self.emissiveColor.name = 'emissiveColor'
-        if self.opacity.name == '': self.opacity.name = 'opacity'
-        if self.ior.name == '': self.ior.name = 'ior'
-        if self.metallic.name == '': self.metallic.name = 'metallic'
-        if self.normal.name == '': self.normal.name = 'normal'
-        if self.roughness.name == '': self.roughness.name = 'roughness'
-        if self.specularColor.name == '': self.specularColor.name = 'specularColor'
-        if self.displacement.name == '': self.displacement.name = 'displacement'
-        if self.occlusion.name == '': self.occlusion.name = 'occlusion'
+        si.set_inputs(self, inputs)
 
 
 class PhantomUsdMaterialBuilder:
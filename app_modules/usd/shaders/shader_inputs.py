@@ -0,0 +1,134 @@
+from dataclasses import FrozenInstanceError, InitVar, astuple, fields
+from functools import lru_cache
+import reprlib
+
+
+@lru_cache(maxsize=None)
+def _frozen_type(attr_type: type) -> type:
+    """
+    * A read-only variant of an attribute class for the shared defaults; it compares, hashes and
+    * prints like the attribute class itself
+    """
+    def __setattr__(self, name, value):
+        raise FrozenInstanceError(f"The default {attr_type.__name__} of a shader input can't be changed; "
+                                  f"set the input to a new attribute, or use shader_inputs.edit_input")
+
+    def __eq__(self, other):
+        if not isinstance(other, attr_type):
+            return NotImplemented
+        return astuple(self) == astuple(other)
+
+    return type(attr_type.__name__, (attr_type,), {"__setattr__": __setattr__, "__delattr__": __setattr__,
+                                                    "__eq__": __eq__, "__hash__": None,
+                                                    "__qualname__": attr_type.__qualname__,
+                                                    "__module__": attr_type.__module__})
+
+
+class ShaderInput:
+    """
+    * A shader input of a material class. The material only stores the inputs that were set; reading an
+    * input that wasn't set returns its default attribute object, which is read-only and shared by every
+    * material of the class, so an untouched input costs nothing.
+    """
+    __slots__ = ("name", "attr_type", "_default")
+
+    def __init__(self, name: str, attr_type: type) -> None:
+        self.name = name
+        self.attr_type = attr_type
+        self._default = None
+
+    def default(self):
+        """
+        * The shared, read-only default attribute object of the input
+        """
+        if self._default is None:
+            attr = self.attr_type()
+            attr.name = self.name
+            attr.__class__ = _frozen_type(self.attr_type)
+            self._default = attr
+        return self._default
+
+    def __get__(self, material, owner=None):
+        if material is None:
+            return self
+        attr = material._inputs.get(self.name) if material._inputs else None
+        return self.default() if attr is None else attr
+
+    def __set__(self, material, attr) -> None:
+        if attr is None:
+            if material._inputs:
+                material._inputs.pop(self.name, None)
+            return
+        if material._inputs is None:
+            material._inputs = {}
+        if attr.name == '':
+            attr.name = self.name
+        material._inputs[self.name] = attr
+
+
+def shader_inputs(cls):
+    """
+    * Class decorator for the material dataclasses: every InitVar annotation of the class becomes a
+    * ShaderInput. The class needs an _inputs field defaulting to None and a __post_init__(self, *inputs)
+    * that hands the InitVar values to set_inputs. __eq__ and __repr__ take the inputs into account, like
+    * they would if the inputs were fields.
+    """
+    names = []
+    for name, annotation in cls.__dict__.get('__annotations__', {}).items():
+        if isinstance(annotation, InitVar):
+            setattr(cls, name, ShaderInput(name, annotation.type))
+            names.append(name)
+    cls.__shader_inputs__ = tuple(names)
+
+    fields_eq = cls.__eq__
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return fields_eq(self, other) and all(getattr(self, name) == getattr(other, name) for name in names)
+
+    @reprlib.recursive_repr()
+    def __repr__(self):
+        values = [f"{fld.name}={getattr(self, fld.name)!r}" for fld in fields(self) if fld.repr]
+        values += [f"{name}={getattr(self, name)!r}" for name in names]
+        return f"{type(self).__qualname__}({', '.join(values)})"
+
+    cls.__eq__ = __eq__
+    cls.__repr__ = __repr__
+    return cls
+
+
+def set_inputs(material, inputs: tuple) -> None:
+    """
+    * Store the inputs passed to the constructor, in InitVar order; None leaves an input unset
+    """
+    for name, attr in zip(type(material).__shader_inputs__, inputs):
+        if attr is not None:
+            setattr(material, name, attr)
+
+
+def edit_input(material, name: str):
+    """
+    * The attribute object of an input to change in place; an input that wasn't set gets a fresh copy
+    * of its default
+    """
+    attr = material._inputs.get(name) if material._inputs else None
+    if attr is None:
+        shader_input = getattr(type(material), name)
+        attr = shader_input.attr_type()
+        shader_input.__set__(material, attr)
+    return attr
+
+
+def input_types(material_class) -> dict:
+    """
+    * The attribute type of every shader input of a material class, by name, in declaration order
+    """
+    return {name: getattr(material_class, name).attr_type for name in material_class.__shader_inputs__}
+
+
+def authored_inputs(material) -> dict:
+    """
+    * The inputs that were set on a material, by name
+    """
+    return dict(material._inputs or {})
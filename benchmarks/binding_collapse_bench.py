@@ -0,0 +1,74 @@
+# copyright PhantomFX 2024
+"""
+* Measures compose_pfx_usd(collapse_bindings=True) against leaf mesh includes. The synthetic asset
+* gets a group per material, so every group collapses into a single include. For both composes,
+* a fresh worker opens the GEO layer fully loaded, then times the binding resolution of every mesh
+* (UsdShade.MaterialBindingAPI.ComputeBoundMaterials) and counts the collection includes.
+*
+* python -m ptx_publish.benchmarks.binding_collapse_bench --meshes 100000 --materials 1000
+"""
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import json
+import multiprocessing
+import tempfile
+import time
+
+from . import compose_scale_bench as csb
+from . import synthetic_assets as sa
+
+
+def time_binding_resolution(geo_path: str) -> dict:
+    """
+    * Time to resolve the bound material of every mesh; runs in its own worker
+    """
+    from pxr import Usd, UsdGeom, UsdShade
+
+    stage = Usd.Stage.Open(geo_path, Usd.Stage.LoadAll)
+    meshes = [prim for prim in stage.Traverse() if prim.IsA(UsdGeom.Mesh)]
+    includes = sum(len(rel.GetTargets()) for prim in stage.GetPseudoRoot().GetChildren()
+                   for rel in prim.GetRelationships() if rel.GetName().endswith(":includes"))
+
+    start = time.perf_counter()
+    materials, _ = UsdShade.MaterialBindingAPI.ComputeBoundMaterials(meshes)
+    resolve_time = time.perf_counter() - start
+    return {"resolve_time": resolve_time, "meshes": len(meshes), "collection_includes": includes,
+            "bound_meshes": sum(1 for mtl in materials if mtl)}
+
+
+def run(work_dir: str, num_meshes: int, num_materials: int, backend: str) -> dict:
+    """
+    * Composes the synthetic asset with and without collapsed bindings and measures both
+    """
+    case_id = f"m{num_meshes}_mat{num_materials}"
+    compose_args = sa.generate_asset(f"{work_dir}/{case_id}", num_meshes, num_materials, num_groups=num_materials,
+                                     asset_name=f"Synth_{case_id}")
+    case = {"case": case_id, "meshes": num_meshes, "materials": num_materials, "compose_args": compose_args}
+
+    results = {}
+    ctx = multiprocessing.get_context("spawn")
+    for collapse in (False, True):
+        compose = csb.run([case], {"backend": backend, "payload_granularity": "group", "collapse_bindings": collapse})[0]
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+            timings = pool.submit(time_binding_resolution, csb.layer_paths(compose_args)["geo"]).result()
+        key = "collapsed" if collapse else "leaves"
+        results[key] = {"compose_time": compose["wall_time"], "geo_bytes": compose["file_size_bytes"]["geo"], **timings}
+        print(f"{key:9s} compose {compose['wall_time']:8.2f}s  includes {timings['collection_includes']:8d}  "
+              f"resolve {timings['resolve_time']:8.3f}s  bound {timings['bound_meshes']}/{timings['meshes']}")
+    return {"case": case_id, "backend": backend, "results": results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Measure collapsed binding collections against leaf mesh includes.')
+    parser.add_argument('--meshes', type=int, default=100000, help='Number of meshes')
+    parser.add_argument('--materials', type=int, default=1000, help='Number of materials, and of groups')
+    parser.add_argument('--backend', choices=['usd', 'sdf'], default='sdf', help='The compose backend')
+    parser.add_argument('--work-dir', type=str, default='', help='Where to generate the inputs; a temp folder by default')
+    parser.add_argument('--json', dest='json_path', default='', help='Optional path to write the results to')
+
+    args = parser.parse_args()
+    report = run(args.work_dir or tempfile.mkdtemp(prefix="ptx_binding_bench_"), args.meshes, args.materials, args.backend)
+
+    if args.json_path:
+        with open(args.json_path, 'w') as file:
+            json.dump(report, file, indent=4)
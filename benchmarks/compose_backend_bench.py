@@ -0,0 +1,63 @@
+# copyright PhantomFX 2024
+"""
+* Compares the Usd and Sdf authoring backends of compose_pfx_usd on one synthetic asset
+* (10k materials over 100k meshes by default). Every backend composes in its own fresh worker
+* process; the digests of the written layers are compared to check the output is identical.
+*
+* python -m ptx_publish.benchmarks.compose_backend_bench --meshes 100000 --materials 10000
+"""
+import argparse
+import json
+import sys
+import tempfile
+
+from . import compose_scale_bench as csb
+from . import synthetic_assets as sa
+
+
+def run(work_dir: str, num_meshes: int, num_materials: int, texture_density: float, backends: list) -> dict:
+    """
+    * Composes the same synthetic asset with every backend and returns the timings per backend
+    """
+    case_id = f"m{num_meshes}_mat{num_materials}_tex{int(texture_density * 100)}"
+    compose_args = sa.generate_asset(f"{work_dir}/{case_id}", num_meshes, num_materials, texture_density,
+                                     asset_name=f"Synth_{case_id}")
+    case = {"case": case_id, "meshes": num_meshes, "materials": num_materials,
+            "texture_density": texture_density, "compose_args": compose_args}
+
+    results = {}
+    for backend in backends:
+        print(f"{backend}:")
+        results[backend] = csb.run([case], {"backend": backend})[0]
+
+    digests = [res["file_digest"] for res in results.values()]
+    base_time = results[backends[0]]["wall_time"]
+    return {
+        "case": case_id,
+        "results": results,
+        "speedup": {backend: base_time / res["wall_time"] for backend, res in results.items() if res["wall_time"]},
+        "identical_output": all(digest == digests[0] for digest in digests),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compare the Usd and Sdf compose backends on a synthetic asset.')
+    parser.add_argument('--meshes', type=int, default=100000, help='Number of meshes')
+    parser.add_argument('--materials', type=int, default=10000, help='Number of materials')
+    parser.add_argument('--texture-density', type=float, default=0.5, help='Textured fraction of color parameters')
+    parser.add_argument('--backends', nargs='+', default=['usd', 'sdf'], help='Backends to compare; the first is the reference')
+    parser.add_argument('--work-dir', type=str, default='', help='Where to generate the inputs; a temp folder by default')
+    parser.add_argument('--json', dest='json_path', default='', help='Optional path to write the results to')
+
+    args = parser.parse_args()
+    report = run(args.work_dir or tempfile.mkdtemp(prefix="ptx_backend_bench_"), args.meshes, args.materials,
+                 args.texture_density, args.backends)
+
+    for backend, speedup in report["speedup"].items():
+        print(f"  {backend:5s} {report['results'][backend]['wall_time']:9.2f}s  {speedup:6.2f}x")
+    print(f"  identical output: {report['identical_output']}")
+
+    if args.json_path:
+        with open(args.json_path, 'w') as file:
+            json.dump(report, file, indent=4)
+    sys.exit(0 if report["identical_output"] else 1)
@@ -0,0 +1,194 @@
+# copyright PhantomFX 2024
+"""
+* Synthetic-scale benchmark for ptx_base_composer.compose_pfx_usd.
+* Generates looks info and payload stand-ins for a matrix of mesh counts, material counts and
+* texture densities, composes every case in a fresh worker process and records wall time, peak
+* memory (tracemalloc and the process high-water mark), prim counts and output file sizes.
+* Results are written as json; pass --baseline to fail on regressions beyond the thresholds.
+*
+* python -m ptx_publish.benchmarks.compose_scale_bench --meshes 10 1000 10000 --out compose_scale.json
+"""
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List
+import argparse
+import hashlib
+import itertools
+import json
+import multiprocessing
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from . import synthetic_assets as sa
+
+
+__MESH_COUNTS__ = [10, 1000, 10000, 100000]
+
+# Materials per mesh and textured fraction of color parameters
+__MATERIAL_RATIOS__ = [0.01, 0.1]
+__TEXTURE_DENSITIES__ = [0.0, 0.5]
+
+
+def _peak_rss_mb():
+    """
+    * The process high-water mark in MB, or None where the resource module isn't available
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes on linux
+    return peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0
+
+
+def layer_paths(compose_args: Dict, ext: str = "usda") -> Dict[str, str]:
+    """
+    * The layers compose_pfx_usd writes for the given compose arguments
+    """
+    base = compose_args["usd_base_location"]
+    name = f"{compose_args['asset_type']}_{compose_args['asset_name']}"
+    return {"payload": f"{base}/Payload_{name}.{ext}",
+            "geo": f"{base}/GEO_{name}.{ext}",
+            "luk": f"{base}/LUK_{name}/LUK_{name}.{ext}"}
+
+
+def count_prims(layer_path: str) -> int:
+    """
+    * Counts the prim specs in a layer without composing it
+    """
+    from pxr import Sdf
+    layer = Sdf.Layer.FindOrOpen(layer_path)
+    count = [0]
+
+    def _visit(path):
+        if path.IsPrimPath():
+            count[0] += 1
+
+    layer.Traverse(Sdf.Path.absoluteRootPath, _visit)
+    return count[0]
+
+
+def run_case(case: Dict, compose_kwargs: Dict = None, stream_looks: bool = False) -> Dict:
+    """
+    * Composes one synthetic asset; runs in its own worker process so the memory numbers
+    * belong to this case only. With stream_looks the looks info is streamed with iter_looks_info
+    * instead of loaded whole.
+    """
+    from ..app_modules.usd.composers import ptx_base_composer as pbc
+    from ..app_modules.usd.composers import ptx_looks_utils as plu
+
+    compose_args = case["compose_args"]
+    shutil.rmtree(compose_args["usd_base_location"], ignore_errors=True)
+    Path(compose_args["usd_base_location"]).mkdir(parents=True, exist_ok=True)
+
+    # Import pxr up front so the import isn't part of the measurement
+    import pxr.Usd
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    pbc.compose_pfx_usd(**compose_args, looks_reader=plu.iter_looks_info if stream_looks else sa.read_looks_info,
+                        **(compose_kwargs or {}))
+    wall_time = time.perf_counter() - start
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    layers = layer_paths(compose_args, (compose_kwargs or {}).get("usd_format", "usda"))
+    return {
+        **{key: val for key, val in case.items() if key != "compose_args"},
+        "wall_time": wall_time,
+        "tracemalloc_peak_mb": traced_peak / (1024.0 * 1024.0),
+        "peak_rss_mb": _peak_rss_mb(),
+        "prim_count": {key: count_prims(path) for key, path in layers.items()},
+        "file_size_bytes": {key: Path(path).stat().st_size for key, path in layers.items()},
+        "file_digest": {key: hashlib.sha256(Path(path).read_bytes()).hexdigest() for key, path in layers.items()},
+    }
+
+
+def build_cases(out_dir: str, mesh_counts: List[int], material_ratios: List[float], texture_densities: List[float]) -> List[Dict]:
+    """
+    * Generates the synthetic inputs for every combination in the matrix
+    """
+    cases = []
+    for num_meshes, ratio, density in itertools.product(mesh_counts, material_ratios, texture_densities):
+        num_materials = max(1, int(num_meshes * ratio))
+        case_id = f"m{num_meshes}_mat{num_materials}_tex{int(density * 100)}"
+        compose_args = sa.generate_asset(f"{out_dir}/{case_id}", num_meshes, num_materials, density,
+                                         asset_name=f"Synth_{case_id}")
+        cases.append({"case": case_id, "meshes": num_meshes, "materials": num_materials,
+                      "texture_density": density, "compose_args": compose_args})
+    return cases
+
+
+def run(cases: List[Dict], compose_kwargs: Dict = None, stream_looks: bool = False) -> List[Dict]:
+    """
+    * Runs every case in a fresh spawned worker
+    """
+    results = []
+    ctx = multiprocessing.get_context("spawn")
+    for case in cases:
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+            res = pool.submit(run_case, case, compose_kwargs, stream_looks).result()
+        print(f"{res['case']:28s} {res['wall_time']:9.2f}s  rss {res['peak_rss_mb'] or 0.0:9.1f}MB  "
+              f"py {res['tracemalloc_peak_mb']:8.1f}MB  prims {sum(res['prim_count'].values()):8d}  "
+              f"bytes {sum(res['file_size_bytes'].values()):12d}")
+        results.append(res)
+    return results
+
+
+def compare(results: List[Dict], baseline: Dict, time_threshold: float, memory_threshold: float) -> List[str]:
+    """
+    * Returns the regressions against a baseline results file. A case regresses when its wall time
+    * or peak memory grew by more than the thresholds (fractions).
+    """
+    regressions = []
+    base_map = {res["case"]: res for res in baseline.get("results", [])}
+    for res in results:
+        base = base_map.get(res["case"])
+        if not base:
+            continue
+
+        if res["wall_time"] > base["wall_time"] * (1.0 + time_threshold):
+            regressions.append(f"{res['case']}: wall time {base['wall_time']:.2f}s -> {res['wall_time']:.2f}s")
+
+        for key in ("peak_rss_mb", "tracemalloc_peak_mb"):
+            if res.get(key) and base.get(key) and res[key] > base[key] * (1.0 + memory_threshold):
+                regressions.append(f"{res['case']}: {key} {base[key]:.1f} -> {res[key]:.1f}")
+
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark compose_pfx_usd on synthetic assets.')
+    parser.add_argument('--meshes', type=int, nargs='+', default=__MESH_COUNTS__, help='Mesh counts to benchmark')
+    parser.add_argument('--material-ratios', type=float, nargs='+', default=__MATERIAL_RATIOS__, help='Materials per mesh')
+    parser.add_argument('--texture-densities', type=float, nargs='+', default=__TEXTURE_DENSITIES__, help='Textured fraction of color parameters')
+    parser.add_argument('--work-dir', type=str, default='', help='Where to generate the inputs; a temp folder by default')
+    parser.add_argument('--out', type=str, default='compose_scale_bench.json', help='Path to write the results to')
+    parser.add_argument('--baseline', type=str, default='', help='Results json to compare against')
+    parser.add_argument('--compose-kwargs', type=json.loads, default={},
+                        help='Extra compose_pfx_usd keyword arguments as json, eg: \'{"backend": "sdf", "share_textures": true}\'')
+    parser.add_argument('--stream-looks', action='store_true', help='Stream the looks info record by record instead of loading it whole')
+    parser.add_argument('--time-threshold', type=float, default=0.15, help='Allowed wall time growth against the baseline')
+    parser.add_argument('--memory-threshold', type=float, default=0.15, help='Allowed peak memory growth against the baseline')
+
+    args = parser.parse_args()
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="ptx_compose_bench_")
+
+    results = run(build_cases(work_dir, args.meshes, args.material_ratios, args.texture_densities), args.compose_kwargs,
+                  args.stream_looks)
+    report = {"python": sys.version, "thresholds": {"time": args.time_threshold, "memory": args.memory_threshold},
+              "compose_kwargs": args.compose_kwargs, "stream_looks": args.stream_looks, "results": results}
+    with open(args.out, 'w') as file:
+        json.dump(report, file, indent=4)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file), args.time_threshold, args.memory_threshold)
+        for reg in regressions:
+            print(f"REGRESSION {reg}")
+        sys.exit(1 if regressions else 0)
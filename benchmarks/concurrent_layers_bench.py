@@ -0,0 +1,65 @@
+# copyright PhantomFX 2024
+"""
+* Compares the serial compose with compose_pfx_usd(concurrent_layers=True), where the looks layer
+* is authored in worker processes (split in 1..N material shards) while the GEO layer is built.
+* The digests of the written layers are compared against the serial compose.
+*
+* python -m ptx_publish.benchmarks.concurrent_layers_bench --meshes 100000 --materials 10000 --shards 1 2 4 8
+"""
+import argparse
+import json
+import sys
+import tempfile
+
+from . import compose_scale_bench as csb
+from . import synthetic_assets as sa
+
+
+def run(work_dir: str, num_meshes: int, num_materials: int, texture_density: float, shard_counts: list,
+        compose_kwargs: dict) -> dict:
+    """
+    * Composes the synthetic asset serially, then concurrently with every shard count
+    """
+    case_id = f"m{num_meshes}_mat{num_materials}_tex{int(texture_density * 100)}"
+    compose_args = sa.generate_asset(f"{work_dir}/{case_id}", num_meshes, num_materials, texture_density,
+                                     asset_name=f"Synth_{case_id}")
+    case = {"case": case_id, "meshes": num_meshes, "materials": num_materials,
+            "texture_density": texture_density, "compose_args": compose_args}
+
+    results = {"serial": csb.run([case], compose_kwargs)[0]}
+    for shards in shard_counts:
+        results[f"shards_{shards}"] = csb.run([case], {**compose_kwargs, "concurrent_layers": True,
+                                                       "material_shards": shards})[0]
+
+    serial = results["serial"]
+    return {
+        "case": case_id,
+        "compose_kwargs": compose_kwargs,
+        "results": results,
+        "speedup": {key: serial["wall_time"] / res["wall_time"] for key, res in results.items() if res["wall_time"]},
+        "identical_output": {key: res["file_digest"] == serial["file_digest"] for key, res in results.items()},
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compare the serial and the concurrent-layers compose on a synthetic asset.')
+    parser.add_argument('--meshes', type=int, default=100000, help='Number of meshes')
+    parser.add_argument('--materials', type=int, default=10000, help='Number of materials')
+    parser.add_argument('--texture-density', type=float, default=0.5, help='Textured fraction of color parameters')
+    parser.add_argument('--shards', nargs='+', type=int, default=[1, 2, 4, 8], help='The material shard counts to measure')
+    parser.add_argument('--compose-kwargs', type=json.loads, default={}, help='Extra compose_pfx_usd keyword arguments, as json')
+    parser.add_argument('--work-dir', type=str, default='', help='Where to generate the inputs; a temp folder by default')
+    parser.add_argument('--json', dest='json_path', default='', help='Optional path to write the results to')
+
+    args = parser.parse_args()
+    report = run(args.work_dir or tempfile.mkdtemp(prefix="ptx_concurrent_bench_"), args.meshes, args.materials,
+                 args.texture_density, args.shards, args.compose_kwargs)
+
+    for key, speedup in report["speedup"].items():
+        print(f"  {key:10s} {report['results'][key]['wall_time']:9.2f}s  {speedup:6.2f}x  "
+              f"identical: {report['identical_output'][key]}")
+
+    if args.json_path:
+        with open(args.json_path, 'w') as file:
+            json.dump(report, file, indent=4)
+    sys.exit(0 if all(report["identical_output"].values()) else 1)
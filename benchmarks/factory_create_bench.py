@@ -0,0 +1,113 @@
+# copyright PhantomFX 2024
+"""
+* Micro-benchmark for the factory create() path.
+* Compares the legacy path (parse the conf, find the spec and re-execute the module with
+* mod_spec.loader.load_module() on every call) against the shared module registry.
+*
+* python -m ptx_publish.benchmarks.factory_create_bench --factory usd --group shaders --key aiStandardSurface
+"""
+from pathlib import Path
+import argparse
+import importlib.util
+import json
+import timeit
+
+from ..core import ptx_publish_factory as ppf
+from ..core.ptx_module_registry import registry
+
+
+def _factory(name: str):
+    """
+    * Returns (conf path, module path builder, builder name, factory class, register method name)
+    * for the given factory. Imports are deferred so that benchmarking one factory doesn't need
+    * the dependencies of the others.
+    """
+    if name == "core":
+        return (f"{Path(ppf.__file__).parent}/ptx_publish.conf",
+                lambda group, mod: ['ptx_publish', 'app_modules', group.lower(), mod],
+                "PtxNodeBuilder", ppf.PtxPublishFactory, "register_app")
+
+    if name == "maya":
+        from ..app_modules.maya.factories import maya_process_factory as mpf
+        return (f"{Path(mpf.__file__).parent}/maya_processes.conf",
+                lambda group, mod: ['ptx_publish', 'app_modules', 'maya', 'interchange', mod],
+                "ProcessNodeBuilder", mpf.MayaProcessFactory, "register_process")
+
+    from ..app_modules.usd.factories import phantom_usd_factory as puf
+    return (f"{Path(puf.__file__).parent}/phantom_usd_defs.conf",
+            lambda group, mod: ['ptx_publish', 'app_modules', 'usd', group, mod],
+            "PhantomUsdNodeBuilder", puf.PhantomUsdFactory, "register_usd_type")
+
+
+def legacy_create(conf_path: str, mod_path, builder_name: str, group: str, key: str, *args, **kwargs):
+    """
+    * The create() path as it was before the registry: a json parse, a spec lookup and a module
+    * re-execution for every single object.
+    """
+    with open(conf_path) as file:
+        conf = json.load(file)
+
+    mod_spec = importlib.util.find_spec(".".join(mod_path(group, conf[group][key])))
+    mod = mod_spec.loader.load_module()
+    NodeBuilder = getattr(mod, builder_name)()
+    return NodeBuilder(*args, **kwargs)
+
+
+def registry_create(factory_cls, register_name: str, group: str, key: str, *args, **kwargs):
+    """
+    * The current create() path; a new factory per object, the same way usd_create_mtlx uses it.
+    """
+    factory = factory_cls()
+    mod_spec = getattr(factory, register_name)(group, key)
+    return factory.create(mod_spec, *args, **kwargs)
+
+
+def run(factory: str, group: str, key: str, number: int, repeat: int, args: list) -> dict:
+    """
+    * Times both create() paths and returns the per-call cost in microseconds.
+    """
+    conf_path, mod_path, builder_name, factory_cls, register_name = _factory(factory)
+
+    legacy = timeit.repeat(lambda: legacy_create(conf_path, mod_path, builder_name, group, key, *args),
+                           number=number, repeat=repeat)
+
+    # Start from a cold registry so the first import is part of the measurement
+    registry.invalidate()
+    cached = timeit.repeat(lambda: registry_create(factory_cls, register_name, group, key, *args),
+                           number=number, repeat=repeat)
+
+    legacy_us = min(legacy) / number * 1e6
+    cached_us = min(cached) / number * 1e6
+    return {
+        "factory": factory,
+        "group": group,
+        "key": key,
+        "number": number,
+        "repeat": repeat,
+        "legacy_us_per_create": legacy_us,
+        "registry_us_per_create": cached_us,
+        "speedup": legacy_us / cached_us if cached_us else None,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compare the factory create() cost with and without the module registry.')
+    parser.add_argument('--factory', choices=['core', 'maya', 'usd'], default='usd', help='The factory to benchmark')
+    parser.add_argument('--group', default='shaders', help='The app / process type / usd type to register')
+    parser.add_argument('--key', default='aiStandardSurface', help='The publish type / process / prim to register')
+    parser.add_argument('--number', type=int, default=1000, help='Number of create() calls per timing run')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of timing runs; the best one is reported')
+    parser.add_argument('--json', dest='json_path', default='', help='Optional path to write the results to')
+    parser.add_argument('args', nargs='*', default=['MtlX', []], help='Positional arguments passed to the builder')
+
+    cli_args = parser.parse_args()
+    result = run(cli_args.factory, cli_args.group, cli_args.key, cli_args.number, cli_args.repeat, cli_args.args)
+
+    print(f"{result['factory']}:{result['group']}:{result['key']}")
+    print(f"  legacy   : {result['legacy_us_per_create']:10.2f} us/create")
+    print(f"  registry : {result['registry_us_per_create']:10.2f} us/create")
+    print(f"  speedup  : {result['speedup']:10.1f}x")
+
+    if cli_args.json_path:
+        with open(cli_args.json_path, 'w') as file:
+            json.dump(result, file, indent=4)
@@ -0,0 +1,143 @@
+# copyright PhantomFX 2024
+"""
+* Cold-import benchmark for the package entry points.
+* Every entry point is imported in a fresh interpreter with `python -X importtime`, the
+* cumulative import time of the entry point module is parsed out of stderr and the median
+* over a number of runs is reported. Heavy modules (pymel, pxr, chitragupta, maya) that got
+* pulled in by the import are listed as well, so a regression in laziness is visible.
+*
+* python -m ptx_publish.benchmarks.import_time_bench --runs 7 --json import_times.json
+"""
+from pathlib import Path
+from typing import Dict, List
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+
+__ENTRY_POINTS__ = ["ptx_publish.core.ptx_publish_factory",
+                    "ptx_publish.core.ptx_module_registry",
+                    "ptx_publish.app_modules.maya.factories.maya_process_factory",
+                    "ptx_publish.app_modules.usd.factories.phantom_usd_factory",
+                    "ptx_publish.app_modules.usd.composers.ptx_base_composer",
+                    "ptx_publish.app_modules.maya.ptx_maya_publish",
+                    "ptx_publish.app_modules.maya.ptx_mesh_cache",
+                    "ptx_publish.app_modules.maya.ptx_create_proxy",
+                    "ptx_publish.app_modules.maya.ptx_export_work_scene",
+                    "ptx_publish.app_modules.maya.ptx_import_proxy"]
+
+__HEAVY_MODULES__ = ("pymel", "pxr", "chitragupta", "maya")
+
+
+def parse_importtime(stderr: str, module: str) -> Dict:
+    """
+    * Parses the `-X importtime` report. Returns the cumulative time of the given module in
+    * microseconds and the heavy top level packages that were imported along the way.
+    """
+    cumulative_us = None
+    heavy = set()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+
+        cols = line[len("import time:"):].split("|")
+        if len(cols) != 3 or not cols[0].strip().isdigit():
+            continue
+
+        name = cols[2].strip()
+        if name.split(".")[0] in __HEAVY_MODULES__:
+            heavy.add(name.split(".")[0])
+        if name == module:
+            cumulative_us = int(cols[1].strip())
+
+    return {"cumulative_us": cumulative_us, "heavy_imports": sorted(heavy)}
+
+
+def time_import(module: str, runs: int, python: str = sys.executable, env: Dict = None) -> Dict:
+    """
+    * Imports the module in `runs` fresh interpreters and returns the timing statistics
+    """
+    samples: List[int] = []
+    heavy = set()
+    error = ""
+    for _ in range(runs):
+        result = subprocess.run([python, "-X", "importtime", "-c", f"import {module}"],
+                                capture_output=True, text=True, env=env)
+        if result.returncode != 0:
+            error = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else f"exit code {result.returncode}"
+            break
+
+        parsed = parse_importtime(result.stderr, module)
+        if parsed["cumulative_us"] is not None:
+            samples.append(parsed["cumulative_us"])
+        heavy.update(parsed["heavy_imports"])
+
+    return {
+        "module": module,
+        "runs": len(samples),
+        "median_ms": statistics.median(samples) / 1000.0 if samples else None,
+        "min_ms": min(samples) / 1000.0 if samples else None,
+        "max_ms": max(samples) / 1000.0 if samples else None,
+        "heavy_imports": sorted(heavy),
+        "error": error,
+    }
+
+
+def compare(results: List[Dict], baseline: List[Dict], threshold: float) -> List[str]:
+    """
+    * Returns a list of regressions; an entry point regresses when its median grew by more
+    * than `threshold` (a fraction) or when it newly pulls in a heavy module.
+    """
+    regressions = []
+    base_map = {res["module"]: res for res in baseline}
+    for res in results:
+        base = base_map.get(res["module"])
+        if not base or res["median_ms"] is None or base["median_ms"] is None:
+            continue
+
+        if res["median_ms"] > base["median_ms"] * (1.0 + threshold):
+            regressions.append(f"{res['module']}: {base['median_ms']:.1f}ms -> {res['median_ms']:.1f}ms")
+
+        new_heavy = set(res["heavy_imports"]) - set(base["heavy_imports"])
+        if new_heavy:
+            regressions.append(f"{res['module']}: now imports {', '.join(sorted(new_heavy))}")
+
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Measure the cold-import time of the ptx_publish entry points.')
+    parser.add_argument('modules', nargs='*', default=__ENTRY_POINTS__, help='Modules to import; defaults to every entry point')
+    parser.add_argument('--runs', type=int, default=5, help='Number of fresh interpreters per module')
+    parser.add_argument('--python', default=sys.executable, help='Interpreter to benchmark, eg: mayapy')
+    parser.add_argument('--json', dest='json_path', default='', help='Optional path to write the results to')
+    parser.add_argument('--baseline', default='', help='Optional results json to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Allowed median growth against the baseline')
+
+    args = parser.parse_args()
+
+    # Make sure the interpreter under test can see the package we're benchmarking
+    env = dict(os.environ)
+    package_root = Path(__file__).absolute().parents[2].as_posix()
+    env["PYTHONPATH"] = os.pathsep.join([package_root] + ([env["PYTHONPATH"]] if env.get("PYTHONPATH") else []))
+
+    results = [time_import(module, args.runs, args.python, env) for module in args.modules]
+    for res in results:
+        if res["error"]:
+            print(f"{res['module']:70s} ERROR {res['error']}")
+        else:
+            print(f"{res['module']:70s} {res['median_ms']:8.1f} ms  heavy: {', '.join(res['heavy_imports']) or '-'}")
+
+    if args.json_path:
+        with open(args.json_path, 'w') as file:
+            json.dump(results, file, indent=4)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file), args.threshold)
+        for reg in regressions:
+            print(f"REGRESSION {reg}")
+        sys.exit(1 if regressions else 0)
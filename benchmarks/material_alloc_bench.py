@@ -0,0 +1,94 @@
+# copyright PhantomFX 2024
+"""
+* Memory and throughput benchmark for the material dataclasses in app_modules/usd/shaders.
+* Builds 100k PhantomUsdMaterialX instances (by default) twice: once with the original layout, a
+* default_factory attribute object per input and a name check per input in __post_init__, and once
+* with the compact layout, which only holds the inputs that were overridden. Every material
+* overrides --overrides of its inputs, like a look that only sets what differs from the defaults.
+*
+* python -m ptx_publish.benchmarks.material_alloc_bench --materials 100000 --overrides 4
+"""
+from dataclasses import field, make_dataclass
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+from ..app_modules.usd.shaders import phantom_standard_matx as psm
+from ..app_modules.usd.shaders import shader_inputs as si
+
+
+def legacy_material_class():
+    """
+    * PhantomUsdMaterialX as it was before the compact layout, built from the same inputs
+    """
+    pusds = psm.pusds
+    input_types = si.input_types(psm.PhantomUsdMaterialX)
+
+    def __post_init__(self):
+        self.material_type = pusds.UsdMaterialType.StandardSurface
+        for name in input_types:
+            attr = getattr(self, name)
+            if attr.name == '': attr.name = name
+
+    return make_dataclass("LegacyPhantomUsdMaterialX",
+                          [(name, attr_type, field(default_factory=attr_type)) for name, attr_type in input_types.items()],
+                          bases=(pusds.PhantomUsdMaterialBase,), namespace={"__post_init__": __post_init__})
+
+
+def build(material_class, num_materials: int, overrides: list) -> dict:
+    """
+    * Builds the materials, keeping them all alive like a parsed look does, and measures the time,
+    * the memory still held once they're built and the garbage collections it took
+    """
+    gc.collect()
+    collections = sum(stat["collections"] for stat in gc.get_stats())
+    tracemalloc.start()
+    start = time.perf_counter()
+    materials = [material_class(name=f"mtl_{idx}", meshes=[], **{name: attr_type() for name, attr_type in overrides})
+                 for idx in range(num_materials)]
+    build_time = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    result = {"build_time": build_time, "us_per_material": build_time / num_materials * 1e6,
+              "held_mb": current / (1 << 20), "peak_mb": peak / (1 << 20), "bytes_per_material": current / num_materials,
+              "gc_collections": sum(stat["collections"] for stat in gc.get_stats()) - collections}
+    del materials
+    return result
+
+
+def run(num_materials: int, num_overrides: int) -> dict:
+    """
+    * Builds the materials in both layouts and compares them
+    """
+    input_types = si.input_types(psm.PhantomUsdMaterialX)
+    overrides = list(input_types.items())[:num_overrides]
+
+    legacy = build(legacy_material_class(), num_materials, overrides)
+    compact = build(psm.PhantomUsdMaterialX, num_materials, overrides)
+    return {"materials": num_materials, "inputs": len(input_types), "overrides": len(overrides),
+            "legacy": legacy, "compact": compact,
+            "speedup": legacy["build_time"] / compact["build_time"] if compact["build_time"] else None,
+            "memory_ratio": legacy["held_mb"] / compact["held_mb"] if compact["held_mb"] else None}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compare the original and the compact material layouts over many materials.')
+    parser.add_argument('--materials', type=int, default=100000, help='Number of materials to build')
+    parser.add_argument('--overrides', type=int, default=4, help='Inputs every material overrides')
+    parser.add_argument('--json', dest='json_path', default='', help='Optional path to write the results to')
+
+    cli_args = parser.parse_args()
+    result = run(cli_args.materials, cli_args.overrides)
+
+    print(f"{result['materials']} materials, {result['overrides']} of {result['inputs']} inputs overridden")
+    for layout in ("legacy", "compact"):
+        stats = result[layout]
+        print(f"  {layout:8}: {stats['build_time']:8.2f}s  {stats['us_per_material']:8.2f} us/material  "
+              f"{stats['held_mb']:8.1f} MB held  {stats['peak_mb']:8.1f} MB peak  {stats['gc_collections']} collections")
+    print(f"  speedup : {result['speedup']:8.2f}x  memory: {result['memory_ratio']:8.2f}x less")
+
+    if cli_args.json_path:
+        with open(cli_args.json_path, 'w') as file:
+            json.dump(result, file, indent=4)
@@ -0,0 +1,124 @@
+# copyright PhantomFX 2024
+"""
+* Benchmark for the MaterialX parameter authoring in usd_create_mtlx.
+* Authors a synthetic look (10k materials by default) into an in-memory stage twice: once with the
+* original per-parameter field scan and type branching, once with the precompiled dispatch table.
+*
+* python -m ptx_publish.benchmarks.mtlx_dispatch_bench --materials 10000 --texture-density 0.5
+"""
+import argparse
+import json
+import tempfile
+import time
+
+from . import synthetic_assets as sa
+from ..app_modules.usd.composers import ptx_base_composer as pbc
+
+
+def legacy_usd_create_mtlx(stage, parent_prim, mtl_name, mtl_param_list,
+                           mtlx_type="/__class_mtl__/mtlxmaterial", shader_type="ND_standard_surface_surfaceshader"):
+    """
+    * usd_create_mtlx as it was before the dispatch table: a factory create per material, a linear
+    * shader input scan and repeated whitelist lookups per parameter, and type branching in Python.
+    """
+    from pxr import Sdf, Gf, UsdShade
+    ptusds = pbc.ptusds
+
+    p_fac = pbc.puf.PhantomUsdFactory()
+    mtl_spec = p_fac.register_usd_type("shaders", "aiStandardSurface")
+    mtlx_node = p_fac.create(mtl_spec, mtl_name, [])
+
+    mat_path = Sdf.Path(parent_prim.GetPath()).AppendChild(f"{mtl_name}")
+    mat_def = UsdShade.Material.Define(stage, mat_path)
+    stage.GetPrimAtPath(mat_path).GetInherits().AddInherit(Sdf.Path(mtlx_type))
+
+    shd_std_srf = UsdShade.Shader.Define(stage, mat_path.AppendChild(f"{mtl_name}_standard_surface"))
+    shd_std_srf.CreateIdAttr(shader_type)
+
+    whitelist = pbc.__MATERIALX_PARAM_WHITELIST__
+    # The shader inputs aren't dataclass fields anymore, so the linear scan runs over the node's inputs
+    find_field = lambda usd_node, field_name: next((name for name in type(usd_node).__shader_inputs__ if name == field_name), None)
+    for param in mtl_param_list:
+        if param["name"] in whitelist.keys():
+            fld_name = find_field(mtlx_node, whitelist[param["name"]])
+            param_type = getattr(mtlx_node, fld_name).type
+            if param_type == ptusds.UsdAttributeType.bool:
+                shd_std_srf.CreateInput(fld_name, Sdf.ValueTypeNames.Bool).Set(True if param["value"] == "true" else False)
+            elif param_type == ptusds.UsdAttributeType.float:
+                shd_std_srf.CreateInput(fld_name, Sdf.ValueTypeNames.Float).Set(param["value"])
+            else:
+                value_type = Sdf.ValueTypeNames.Normal3f if param_type == ptusds.UsdAttributeType.vector3 else Sdf.ValueTypeNames.Color3f
+                val_arr = param["value"]
+                if "texture" in param.keys():
+                    tex_node, coord_node = pbc.usd_create_texture(stage, stage.GetPrimAtPath(mat_path), param["texture"]["path"],
+                                                                  whitelist[param["name"]], ptusds.Float2(1.0, 1.0), mtl_name)
+                    shd_std_srf.CreateInput(fld_name, value_type).ConnectToSource(tex_node.ConnectableAPI(), "rgb")
+                else:
+                    shd_std_srf.CreateInput(fld_name, value_type).Set(Gf.Vec3f(val_arr[0], val_arr[1], val_arr[2]))
+
+    shd_displ = UsdShade.Shader.Define(stage, mat_path.AppendChild("Displacement"))
+    shd_displ.CreateIdAttr("ND_displacement_float")
+    mat_def.CreateSurfaceOutput("mtlx").ConnectToSource(shd_std_srf.ConnectableAPI(), "surface")
+    mat_def.CreateDisplacementOutput("mtlx").ConnectToSource(shd_displ.ConnectableAPI(), "out")
+    return mat_def
+
+
+def author_look(create_mtlx, records) -> tuple:
+    """
+    * Authors every material record into a fresh in-memory stage.
+    * Returns (seconds, the stage's root layer as text).
+    """
+    from pxr import Usd
+    stage = Usd.Stage.CreateInMemory()
+    looks = pbc.usd_scope(stage, None, "Looks")
+
+    start = time.perf_counter()
+    for rec in records:
+        create_mtlx(stage, looks, rec["shader_name"], rec["parameters"])
+    return time.perf_counter() - start, stage.GetRootLayer().ExportToString()
+
+
+def run(num_materials: int, texture_density: float, seed: int = 0) -> dict:
+    """
+    * Times both authoring paths on the same synthetic look and checks their output matches
+    """
+    with tempfile.TemporaryDirectory(prefix="ptx_mtlx_bench_") as tmp_dir:
+        records = sa.generate_looks_info(f"{tmp_dir}/looks.json", num_materials, num_materials, texture_density, seed=seed)
+
+    # Warm up the imports and the dispatch table outside of the measurement
+    author_look(pbc.usd_create_mtlx, records[:1])
+    author_look(legacy_usd_create_mtlx, records[:1])
+
+    legacy_time, legacy_layer = author_look(legacy_usd_create_mtlx, records)
+    dispatch_time, dispatch_layer = author_look(pbc.usd_create_mtlx, records)
+    num_params = sum(len(rec["parameters"]) for rec in records)
+    return {
+        "materials": num_materials,
+        "parameters": num_params,
+        "texture_density": texture_density,
+        "legacy_time": legacy_time,
+        "dispatch_time": dispatch_time,
+        "legacy_us_per_param": legacy_time / num_params * 1e6,
+        "dispatch_us_per_param": dispatch_time / num_params * 1e6,
+        "speedup": legacy_time / dispatch_time if dispatch_time else None,
+        "identical_output": legacy_layer == dispatch_layer,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compare MaterialX parameter authoring with and without the dispatch table.')
+    parser.add_argument('--materials', type=int, default=10000, help='Number of materials in the synthetic look')
+    parser.add_argument('--texture-density', type=float, default=0.0, help='Textured fraction of color parameters')
+    parser.add_argument('--json', dest='json_path', default='', help='Optional path to write the results to')
+
+    cli_args = parser.parse_args()
+    result = run(cli_args.materials, cli_args.texture_density)
+
+    print(f"{result['materials']} materials, {result['parameters']} parameters")
+    print(f"  legacy   : {result['legacy_time']:8.2f}s  {result['legacy_us_per_param']:8.2f} us/param")
+    print(f"  dispatch : {result['dispatch_time']:8.2f}s  {result['dispatch_us_per_param']:8.2f} us/param")
+    print(f"  speedup  : {result['speedup']:8.2f}x  identical output: {result['identical_output']}")
+
+    if cli_args.json_path:
+        with open(cli_args.json_path, 'w') as file:
+            json.dump(result, file, indent=4)
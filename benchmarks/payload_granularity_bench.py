@@ -0,0 +1,85 @@
+# copyright PhantomFX 2024
+"""
+* Measures what the payload granularity of compose_pfx_usd costs downstream.
+* Composes one synthetic asset per granularity (mesh, group, asset), then times in a fresh
+* worker process: Usd.Stage.Open with payloads unloaded, LoadAndUnload of the whole asset, and
+* Usd.Stage.Open with everything loaded.
+*
+* python -m ptx_publish.benchmarks.payload_granularity_bench --meshes 10000 --materials 100 --group-depth 2
+"""
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import json
+import multiprocessing
+import tempfile
+import time
+
+from . import compose_scale_bench as csb
+from . import synthetic_assets as sa
+
+
+__GRANULARITIES__ = ["mesh", "group", "asset"]
+
+
+def time_open_and_load(geo_path: str, root_prim: str) -> dict:
+    """
+    * Opening and loading times of the composed GEO layer; runs in its own worker so nothing is
+    * served from a warm layer registry.
+    """
+    from pxr import Usd, Sdf
+
+    start = time.perf_counter()
+    stage = Usd.Stage.Open(geo_path, Usd.Stage.LoadNone)
+    open_unloaded = time.perf_counter() - start
+
+    start = time.perf_counter()
+    stage.LoadAndUnload({Sdf.Path(root_prim)}, set())
+    load_and_unload = time.perf_counter() - start
+    prims = sum(1 for _ in stage.Traverse())
+    payloads = sum(1 for prim in Usd.PrimRange.Stage(stage, Usd.PrimAllPrimsPredicate) if prim.HasAuthoredPayloads())
+    del stage
+
+    start = time.perf_counter()
+    stage = Usd.Stage.Open(geo_path, Usd.Stage.LoadAll)
+    open_loaded = time.perf_counter() - start
+    return {"open_unloaded": open_unloaded, "load_and_unload": load_and_unload, "open_loaded": open_loaded,
+            "prims_loaded": prims, "payload_arcs": payloads}
+
+
+def run(work_dir: str, num_meshes: int, num_materials: int, group_depth: int, granularities: list) -> dict:
+    """
+    * Composes and measures the synthetic asset for every granularity
+    """
+    case_id = f"m{num_meshes}_mat{num_materials}"
+    compose_args = sa.generate_asset(f"{work_dir}/{case_id}", num_meshes, num_materials, asset_name=f"Synth_{case_id}")
+    case = {"case": case_id, "meshes": num_meshes, "materials": num_materials, "compose_args": compose_args}
+
+    results = {}
+    ctx = multiprocessing.get_context("spawn")
+    for granularity in granularities:
+        compose = csb.run([case], {"payload_granularity": granularity, "payload_group_depth": group_depth})[0]
+        geo_path = csb.layer_paths(compose_args)["geo"]
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+            timings = pool.submit(time_open_and_load, geo_path, f"/{compose_args['asset_name']}").result()
+        results[granularity] = {"compose_time": compose["wall_time"], "geo_bytes": compose["file_size_bytes"]["geo"], **timings}
+        print(f"{granularity:6s} open {timings['open_unloaded']:8.3f}s  load {timings['load_and_unload']:8.3f}s  "
+              f"open loaded {timings['open_loaded']:8.3f}s  payload arcs {timings['payload_arcs']:8d}")
+    return {"case": case_id, "group_depth": group_depth, "results": results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Measure stage open and payload load times per payload granularity.')
+    parser.add_argument('--meshes', type=int, default=10000, help='Number of meshes')
+    parser.add_argument('--materials', type=int, default=100, help='Number of materials')
+    parser.add_argument('--group-depth', type=int, default=2, help='payload_group_depth for the group granularity')
+    parser.add_argument('--granularities', nargs='+', default=__GRANULARITIES__, help='Granularities to measure')
+    parser.add_argument('--work-dir', type=str, default='', help='Where to generate the inputs; a temp folder by default')
+    parser.add_argument('--json', dest='json_path', default='', help='Optional path to write the results to')
+
+    args = parser.parse_args()
+    report = run(args.work_dir or tempfile.mkdtemp(prefix="ptx_payload_bench_"), args.meshes, args.materials,
+                 args.group_depth, args.granularities)
+
+    if args.json_path:
+        with open(args.json_path, 'w') as file:
+            json.dump(report, file, indent=4)
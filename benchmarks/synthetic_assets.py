@@ -0,0 +1,128 @@
+# copyright PhantomFX 2024
+"""
+* Generators for synthetic looks-info files and payload stand-ins, used by the compose benchmarks.
+* The looks info is written as json in the same record layout parse_looks_info returns, so it
+* can be fed to compose_pfx_usd through its looks_reader argument.
+"""
+from pathlib import Path
+from typing import Dict, List
+import json
+import math
+import random
+
+
+# Maya parameter name -> value kind, for a representative subset of the MaterialX whitelist
+__SYNTHETIC_PARAMS__ = {"base": "float", "baseColor": "color", "diffuseRoughness": "float", "normalColor": "vector",
+                        "metalness": "float", "specular": "float", "specularColor": "color", "specularRoughness": "float",
+                        "specularIOR": "float", "coat": "float", "coatColor": "color", "coatRoughness": "float",
+                        "subsurfaceColor": "color", "emissionColor": "color", "thinWalled": "bool"}
+
+
+def mesh_paths(num_meshes: int, num_groups: int = None, root: str = "root") -> List[str]:
+    """
+    * Returns Maya style long names of mesh shapes, spread over num_groups top level groups
+    * under render_GRP, eg: |root|render_GRP|grp_3|mesh_42|mesh_42Shape
+    """
+    num_groups = num_groups or max(1, int(math.sqrt(num_meshes)))
+    return [f"|{root}|render_GRP|grp_{idx % num_groups}|mesh_{idx}|mesh_{idx}Shape" for idx in range(num_meshes)]
+
+
+def _param(rnd: random.Random, name: str, kind: str, texture_density: float, texture_pool: int) -> Dict:
+    if kind == "bool":
+        return {"name": name, "value": "true" if rnd.random() < 0.5 else "false"}
+    if kind == "float":
+        return {"name": name, "value": round(rnd.random(), 4)}
+
+    param = {"name": name, "value": [round(rnd.random(), 4) for _ in range(3)]}
+    if texture_pool and rnd.random() < texture_density:
+        param["texture"] = {"path": f"textures/{name}_{rnd.randrange(texture_pool)}.exr"}
+    return param
+
+
+def generate_looks_info(out_path: str, num_meshes: int, num_materials: int, texture_density: float = 0.0,
+                        num_groups: int = None, seed: int = 0) -> List[Dict]:
+    """
+    * Writes a synthetic looks info json and returns its material records.
+    *   @param texture_density: type float: The fraction of color/vector parameters that are textured
+    """
+    rnd = random.Random(seed)
+    meshes = mesh_paths(num_meshes, num_groups)
+    num_materials = max(1, min(num_materials, num_meshes))
+    texture_pool = max(1, int(num_materials * texture_density)) if texture_density > 0.0 else 0
+
+    records = []
+    for mat_idx in range(num_materials):
+        records.append({
+            "material_type": "aiStandardSurface",
+            "shader_name": f"mat_{mat_idx}_MTL",
+            "meshes": meshes[mat_idx::num_materials],
+            "parameters": [_param(rnd, name, kind, texture_density, texture_pool) for name, kind in __SYNTHETIC_PARAMS__.items()],
+            "sg_node": f"mat_{mat_idx}_SG",
+        })
+
+    Path(out_path).parent.mkdir(parents=True, exist_ok=True)
+    with open(out_path, 'w') as file:
+        json.dump(records, file)
+    return records
+
+
+def read_looks_info(looks_path: str) -> List[Dict]:
+    """
+    * looks_reader for compose_pfx_usd that reads the synthetic json looks info
+    """
+    with open(looks_path) as file:
+        return json.load(file)
+
+
+def generate_payload_standin(out_path: str, meshes: List[str]) -> str:
+    """
+    * Writes a usda stand-in for the asset alembic with an (empty) Mesh prim for every mesh, under
+    * the same hierarchy the Maya long names describe. Written as text so no pxr is needed.
+    """
+    tree: Dict = {}
+    for mesh in meshes:
+        node = tree
+        for part in mesh.split('|')[1:-1]:
+            node = node.setdefault(part, {})
+
+    lines = ['#usda 1.0', '(', '    upAxis = "Y"', ')', '']
+
+    def _write(node: Dict, depth: int):
+        for name, children in node.items():
+            indent = "    " * depth
+            lines.append(f'{indent}def {"Xform" if children else "Mesh"} "{name}"')
+            lines.append(f'{indent}{{')
+            _write(children, depth + 1)
+            lines.append(f'{indent}}}')
+
+    _write(tree, 0)
+    Path(out_path).parent.mkdir(parents=True, exist_ok=True)
+    with open(out_path, 'w') as file:
+        file.write("\n".join(lines) + "\n")
+    return out_path
+
+
+def generate_asset(out_dir: str, num_meshes: int, num_materials: int, texture_density: float = 0.0,
+                   num_groups: int = None, asset_type: str = "Prop", asset_name: str = None, seed: int = 0) -> Dict:
+    """
+    * Generates the looks info and payload stand-in for one synthetic asset and returns the
+    * keyword arguments to compose it with compose_pfx_usd.
+    """
+    asset_name = asset_name or f"Synth{num_meshes}m{num_materials}"
+    out_dir = Path(out_dir)
+    looks_path = (out_dir / f"looks_{asset_name}.json").as_posix()
+    standin_path = (out_dir / f"standin_{asset_name}.usda").as_posix()
+
+    records = generate_looks_info(looks_path, num_meshes, num_materials, texture_density, num_groups, seed)
+    generate_payload_standin(standin_path, [mesh for rec in records for mesh in rec["meshes"]])
+
+    usd_dir = out_dir / "usd"
+    usd_dir.mkdir(parents=True, exist_ok=True)
+    return {
+        "asset_info_path": looks_path,
+        "asset_alembic_path": standin_path,
+        "usd_base_location": usd_dir.as_posix(),
+        "asset_type": asset_type,
+        "asset_name": asset_name,
+        "asset_base_prim_path": "/root",
+    }
@@ -0,0 +1,63 @@
+# copyright PhantomFX 2024
+"""
+* Compares the layer formats compose_pfx_usd can write (usda text, usdc / usd crate).
+* For every format the synthetic asset is composed in a fresh worker (write time, file sizes),
+* then opened downstream in another fresh worker (Usd.Stage.Open with and without payloads).
+*
+* python -m ptx_publish.benchmarks.usd_format_bench --meshes 100000 --materials 10000 --backend sdf
+"""
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import json
+import multiprocessing
+import tempfile
+
+from . import compose_scale_bench as csb
+from . import synthetic_assets as sa
+from .payload_granularity_bench import time_open_and_load
+
+
+__FORMATS__ = ["usda", "usdc"]
+
+
+def run(work_dir: str, num_meshes: int, num_materials: int, texture_density: float, formats: list, backend: str) -> dict:
+    """
+    * Composes and opens the synthetic asset in every format
+    """
+    case_id = f"m{num_meshes}_mat{num_materials}_tex{int(texture_density * 100)}"
+    compose_args = sa.generate_asset(f"{work_dir}/{case_id}", num_meshes, num_materials, texture_density,
+                                     asset_name=f"Synth_{case_id}")
+    case = {"case": case_id, "meshes": num_meshes, "materials": num_materials,
+            "texture_density": texture_density, "compose_args": compose_args}
+
+    results = {}
+    ctx = multiprocessing.get_context("spawn")
+    for usd_format in formats:
+        compose = csb.run([case], {"usd_format": usd_format, "backend": backend})[0]
+        geo_path = csb.layer_paths(compose_args, usd_format)["geo"]
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+            timings = pool.submit(time_open_and_load, geo_path, f"/{compose_args['asset_name']}").result()
+        results[usd_format] = {"write_time": compose["wall_time"], "file_size_bytes": compose["file_size_bytes"],
+                               "total_bytes": sum(compose["file_size_bytes"].values()), **timings}
+        print(f"{usd_format:5s} write {compose['wall_time']:8.2f}s  bytes {results[usd_format]['total_bytes']:12d}  "
+              f"open {timings['open_unloaded']:8.3f}s  open loaded {timings['open_loaded']:8.3f}s")
+    return {"case": case_id, "backend": backend, "results": results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compare write time, size and open time of the composed layer formats.')
+    parser.add_argument('--meshes', type=int, default=10000, help='Number of meshes')
+    parser.add_argument('--materials', type=int, default=1000, help='Number of materials')
+    parser.add_argument('--texture-density', type=float, default=0.5, help='Textured fraction of color parameters')
+    parser.add_argument('--formats', nargs='+', default=__FORMATS__, help='Formats to compare: usda, usdc, usd')
+    parser.add_argument('--backend', choices=['usd', 'sdf'], default='usd', help='The compose backend')
+    parser.add_argument('--work-dir', type=str, default='', help='Where to generate the inputs; a temp folder by default')
+    parser.add_argument('--json', dest='json_path', default='', help='Optional path to write the results to')
+
+    args = parser.parse_args()
+    report = run(args.work_dir or tempfile.mkdtemp(prefix="ptx_format_bench_"), args.meshes, args.materials,
+                 args.texture_density, args.formats, args.backend)
+
+    if args.json_path:
+        with open(args.json_path, 'w') as file:
+            json.dump(report, file, indent=4)
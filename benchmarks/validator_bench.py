@@ -0,0 +1,88 @@
+# copyright PhantomFX 2024
+"""
+* Times the Sdf level validator (ptx_compose_validator) against the viewer style check it replaces:
+* opening the composed GEO layer as a stage with every payload loaded and resolving the bound
+* material of every mesh. Both run in fresh worker processes on the same synthetic asset.
+*
+* python -m ptx_publish.benchmarks.validator_bench --meshes 100000 --materials 10000 --backend sdf
+"""
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import json
+import multiprocessing
+import tempfile
+import time
+
+from . import compose_scale_bench as csb
+from . import synthetic_assets as sa
+
+
+def time_validator(usd_base_location: str, asset_type: str, asset_name: str, usd_format: str) -> dict:
+    """
+    * Runs the validator; the pxr import isn't part of the measurement
+    """
+    import pxr.Sdf
+    from ..app_modules.usd.composers import ptx_compose_validator as pcv
+
+    start = time.perf_counter()
+    report = pcv.validate_composed_asset(usd_base_location, asset_type, asset_name, usd_format)
+    return {"time": time.perf_counter() - start, "errors": report["errors"],
+            "checked": {name: check["checked"] for name, check in report["checks"].items()},
+            "unverified": {name: check["unverified"] for name, check in report["checks"].items()}}
+
+
+def time_stage_check(geo_path: str) -> dict:
+    """
+    * Opens the stage fully loaded and resolves every mesh's material, like a viewer would
+    """
+    from pxr import Usd, UsdGeom, UsdShade
+
+    start = time.perf_counter()
+    stage = Usd.Stage.Open(geo_path, Usd.Stage.LoadAll)
+    meshes = [prim for prim in stage.Traverse() if prim.IsA(UsdGeom.Mesh)]
+    materials, _ = UsdShade.MaterialBindingAPI.ComputeBoundMaterials(meshes)
+    return {"time": time.perf_counter() - start, "meshes": len(meshes), "unbound": sum(1 for mtl in materials if not mtl)}
+
+
+def run(work_dir: str, num_meshes: int, num_materials: int, texture_density: float, compose_kwargs: dict) -> dict:
+    """
+    * Composes the synthetic asset once, then times both checks on it
+    """
+    case_id = f"m{num_meshes}_mat{num_materials}_tex{int(texture_density * 100)}"
+    compose_args = sa.generate_asset(f"{work_dir}/{case_id}", num_meshes, num_materials, texture_density,
+                                     asset_name=f"Synth_{case_id}")
+    case = {"case": case_id, "meshes": num_meshes, "materials": num_materials,
+            "texture_density": texture_density, "compose_args": compose_args}
+    csb.run([case], compose_kwargs)
+
+    usd_format = compose_kwargs.get("usd_format", "usda")
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+        validator = pool.submit(time_validator, compose_args["usd_base_location"], compose_args["asset_type"],
+                                compose_args["asset_name"], usd_format).result()
+    with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+        stage_check = pool.submit(time_stage_check, csb.layer_paths(compose_args, usd_format)["geo"]).result()
+
+    print(f"validator {validator['time']:8.3f}s  checked {validator['checked']}  errors {validator['errors']}")
+    print(f"stage     {stage_check['time']:8.3f}s  meshes {stage_check['meshes']}  unbound {stage_check['unbound']}")
+    return {"case": case_id, "compose_kwargs": compose_kwargs, "validator": validator, "stage_check": stage_check,
+            "speedup": stage_check["time"] / validator["time"] if validator["time"] else None}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Time the Sdf level validator against opening the composed stage.')
+    parser.add_argument('--meshes', type=int, default=100000, help='Number of meshes')
+    parser.add_argument('--materials', type=int, default=10000, help='Number of materials')
+    parser.add_argument('--texture-density', type=float, default=0.5, help='Textured fraction of color parameters')
+    parser.add_argument('--backend', choices=['usd', 'sdf'], default='sdf', help='The compose backend')
+    parser.add_argument('--compose-kwargs', type=json.loads, default={}, help='Extra compose_pfx_usd keyword arguments, as json')
+    parser.add_argument('--work-dir', type=str, default='', help='Where to generate the inputs; a temp folder by default')
+    parser.add_argument('--json', dest='json_path', default='', help='Optional path to write the results to')
+
+    args = parser.parse_args()
+    report = run(args.work_dir or tempfile.mkdtemp(prefix="ptx_validator_bench_"), args.meshes, args.materials,
+                 args.texture_density, {"backend": args.backend, **args.compose_kwargs})
+
+    if args.json_path:
+        with open(args.json_path, 'w') as file:
+            json.dump(report, file, indent=4)
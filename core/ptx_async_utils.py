@@ -0,0 +1,82 @@
+# copyright PhantomFX 2024
+"""
+* Awaitable helpers for publish stages that mostly wait on child processes or disk.
+* A single event loop can overlap texture conversion, composition and file transfer
+* without a thread per stage.
+"""
+from typing import Awaitable, Iterable, List, Dict
+import asyncio
+import logging
+import shutil
+
+
+async def run_subprocess_async(cmd, shell: bool = True, env: Dict = None, cwd: str = None) -> tuple:
+    """
+    * @param cmd: type str or list: The command to run; a string when shell is True, else a list of args
+    * @param shell: type bool: Run the command through the shell
+    * @param env: type dict: Optional environment for the child process
+    * @param cwd: type str: Optional working directory for the child process
+    * @return: type tuple: (stdout bytes, stderr bytes, return code)
+    * Awaitable counterpart of subprocess.Popen(...).communicate()
+    """
+    if shell:
+        proc = await asyncio.create_subprocess_shell(cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+                                                     env=env, cwd=cwd)
+    else:
+        proc = await asyncio.create_subprocess_exec(*cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+                                                    env=env, cwd=cwd)
+
+    out, err = await proc.communicate()
+    if proc.returncode != 0:
+        logging.warning(f"Command exited with {proc.returncode}: {cmd}")
+    return (out, err, proc.returncode)
+
+
+async def copy_file_async(src: str, dst: str) -> str:
+    """
+    * @param src: type str: The file to copy
+    * @param dst: type str: The destination file or folder
+    * @return: type str: The path of the copied file
+    * Copies a file without blocking the event loop. There's no portable non-blocking file
+    * copy, so the copy itself is handed to the loop's default executor.
+    """
+    return await asyncio.get_running_loop().run_in_executor(None, shutil.copy2, src, dst)
+
+
+async def gather_limited(awaitables: Iterable[Awaitable], limit: int = 4, return_exceptions: bool = False) -> List:
+    """
+    * @param awaitables: type iterable: The coroutines to run
+    * @param limit: type int: The maximum number of coroutines in flight at once
+    * Like asyncio.gather, but only `limit` of the awaitables run at the same time, eg: to
+    * cap the number of concurrent maketx processes. Results are returned in input order.
+    """
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def _bounded(aw):
+        async with semaphore:
+            return await aw
+
+    return await asyncio.gather(*[_bounded(aw) for aw in awaitables], return_exceptions=return_exceptions)
+
+
+async def publish_all_async(publishes: Iterable, limit: int = 4) -> List[int]:
+    """
+    * @param publishes: type iterable: Publish objects to run
+    * @param limit: type int: The maximum number of publishes in flight at once
+    * @return: type list: The publish state of every publish, in input order
+    * Runs publish_async() on every publish in a single event loop. An exception in a publish
+    * marks it as failed (0) rather than cancelling the others.
+    * Only publishes that override publish_async to await their child processes or disk, eg:
+    * through run_subprocess_async, overlap each other, and limit only bounds those. The default
+    * publish_async runs the blocking publish() on the loop's thread, so publishes that don't
+    * override it run strictly one after another, in input order.
+    """
+    async def _run(pub):
+        try:
+            return await pub.publish_async()
+        except Exception:
+            logging.exception("Publish failed")
+            pub.publish_state = 0
+            return pub.publish_state
+
+    return await gather_limited([_run(pub) for pub in publishes], limit)
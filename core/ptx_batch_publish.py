@@ -0,0 +1,254 @@
+# copyright PhantomFX 2024
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Any
+import importlib
+import json
+import logging
+import multiprocessing
+import os
+import time
+import traceback
+
+from .ptx_publish_factory import AssetInfo, PtxPublishFactory
+from .ptx_publish_cache import cached_publish
+from .ptx_publish_journal import PublishJournal
+
+
+# "module:function" that opens a scene file in an app, for jobs that publish from a scene
+__SCENE_OPENERS__ = {"maya": "ptx_publish.app_modules.maya.utils.scene_utils:open_scene"}
+
+
+@dataclass
+class PublishJob:
+    """
+    * A single publish to run: the app and publish type registered in ptx_publish.conf,
+    * the positional asset info and the keyword arguments handed to the publish object.
+    * depends_on lists the job ids that have to finish before this job can start.
+    * use_cache skips the publish when a previous run had identical inputs.
+    * scene is opened in the worker before the publish is built, see __SCENE_OPENERS__; without
+    * one the publish runs in whatever scene the worker has open.
+    """
+    job_id: str
+    app: str
+    pub_type: str
+    args: List = field(default_factory=list)
+    kwargs: Dict = field(default_factory=dict)
+    depends_on: List[str] = field(default_factory=list)
+    use_cache: bool = False
+    scene: str = ""
+
+
+def _read_manifest(manifest_path: str) -> Dict:
+    """
+    * Reads a json or yaml manifest from disk
+    """
+    with open(manifest_path) as file:
+        if Path(manifest_path).suffix.lower() in ('.yaml', '.yml'):
+            try:
+                import yaml
+            except ImportError as err:
+                raise ImportError("PyYAML is required to read yaml manifests; use a json manifest instead") from err
+            return yaml.safe_load(file)
+        return json.load(file)
+
+
+def load_manifest(manifest) -> List[PublishJob]:
+    """
+    * Expands a manifest into a flat list of publish jobs.
+    * The manifest is either a path to a json/yaml file or the already loaded dictionary:
+    *   {
+    *     "defaults": {"app": "maya", "use_cache": true, "kwargs": {...}},
+    *     "assets": [
+    *       {"asset_name": "Alien", "asset_type": "Character", "asset_process": "mdl",
+    *        "scene": "/show/asset/Alien/mdl/work/Alien_mdl_v012.ma", "kwargs": {...},
+    *        "publishes": ["mshc", {"type": "mshp", "app": "maya", "kwargs": {...}, "depends_on": [...]}]}
+    *     ]
+    *   }
+    * Keyword arguments are merged in the order defaults -> asset -> publish, and a publish can
+    * override the scene of its asset. Job ids default to "<asset name>:<app>:<type>"; two jobs
+    * with the same id, eg: two assets of the same name, are rejected.
+    """
+    if not isinstance(manifest, dict):
+        manifest = _read_manifest(manifest)
+
+    defaults = manifest.get("defaults", {})
+    jobs = []
+    for asset in manifest.get("assets", []):
+        args = asset.get("args") or [asset.get(fld) for fld in AssetInfo.__dataclass_fields__.keys()]
+        for pub in asset.get("publishes", []):
+            if isinstance(pub, str):
+                pub = {"type": pub}
+
+            app = pub.get("app", asset.get("app", defaults.get("app", "maya")))
+            kwargs = {**defaults.get("kwargs", {}), **asset.get("kwargs", {}), **pub.get("kwargs", {})}
+            job_id = pub.get("id", f"{args[0]}:{app}:{pub['type']}")
+            use_cache = pub.get("use_cache", asset.get("use_cache", defaults.get("use_cache", False)))
+            scene = pub.get("scene", asset.get("scene", ""))
+            jobs.append(PublishJob(job_id, app, pub["type"], list(args), kwargs, list(pub.get("depends_on", [])), use_cache, scene))
+
+    job_ids = [job.job_id for job in jobs]
+    duplicates = sorted({job_id for job_id in job_ids if job_ids.count(job_id) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate publish job ids {duplicates}; give the publishes an explicit \"id\"")
+    return jobs
+
+
+def _resolve(dotted: str, default: str = "initialize"):
+    """
+    * The function of a dotted "module:function" string
+    """
+    mod_name, _, func_name = dotted.partition(":")
+    return getattr(importlib.import_module(mod_name), func_name or default)
+
+
+def _init_worker(initializer: str = ""):
+    """
+    * Runs once in every worker process. The initializer is a dotted "module:function"
+    * string, eg: "maya.standalone:initialize", so the interpreter is warm before the first job.
+    """
+    if not initializer:
+        return
+
+    _resolve(initializer)()
+
+
+def _open_scene(app: str, scene: str):
+    """
+    * Opens the job's scene with the scene opener of its app
+    """
+    if app not in __SCENE_OPENERS__:
+        raise ValueError(f"Don't know how to open a scene in {app}; no scene opener registered")
+    _resolve(__SCENE_OPENERS__[app])(scene)
+
+
+def _json_safe(val: Any) -> Any:
+    """
+    * Round-trips the value through json so that it can be pickled back and written to the summary
+    """
+    return json.loads(json.dumps(val, default=str))
+
+
+def run_publish_job(job: PublishJob) -> Dict:
+    """
+    * Builds the publish through the PtxPublishFactory, runs it and returns its result.
+    * Never raises; an exception in the publish is reported as a failed (0) publish state.
+    """
+    result = {"job_id": job.job_id, "app": job.app, "pub_type": job.pub_type, "asset": list(job.args), "scene": job.scene,
+              "version": job.kwargs.get("version"), "publish_state": -1, "publish_info": {}, "out_file": "", "error": "", "cache_hit": False, "pid": os.getpid()}
+    result["started_at"] = time.time()
+    start = time.perf_counter()
+    try:
+        # Publishes look at the open scene as soon as they're built, so it's opened first
+        if job.scene:
+            _open_scene(job.app, job.scene)
+        factory = PtxPublishFactory()
+        mod_spec = factory.register_app(job.app, job.pub_type)
+        publish = factory.create(mod_spec, *job.args, **job.kwargs)
+        if job.use_cache:
+            result["cache_hit"] = cached_publish(publish)
+        else:
+            publish.publish()
+
+        result["publish_state"] = publish.publish_state
+        result["publish_info"] = _json_safe(publish.publish_info)
+        result["out_file"] = publish.out_file
+    except Exception:
+        result["publish_state"] = 0
+        result["error"] = traceback.format_exc()
+        logging.error(f"Publish {job.job_id} failed")
+
+    result["duration"] = time.perf_counter() - start
+    result["finished_at"] = time.time()
+    return result
+
+
+def summarize(results: List[Dict], wall_time: float) -> Dict:
+    """
+    * Collects the per job results into a single summary
+    """
+    states = [res["publish_state"] for res in results]
+    return {
+        "total": len(results),
+        "succeeded": states.count(2),
+        "warnings": states.count(1),
+        "failed": states.count(0),
+        "not_started": states.count(-1),
+        "cache_hits": sum(1 for res in results if res.get("cache_hit")),
+        "wall_time": wall_time,
+        "cpu_time": sum(res.get("duration", 0.0) for res in results),
+        "results": results,
+    }
+
+
+def run_batch(jobs: List[PublishJob], max_workers: int = None, initializer: str = "", journal: PublishJournal = None) -> Dict:
+    """
+    * Runs the publish jobs on a bounded pool of worker processes and returns the summary.
+    * When any job declares depends_on, the batch runs in dependency order through
+    * ptx_publish_dag.run_dag instead, rather than running dependent jobs side by side.
+    *   @param max_workers: type int: Number of worker processes; defaults to the number of cores
+    *   @param initializer: type str: Optional "module:function" run once in every worker
+    *   @param journal: type PublishJournal: Optional journal every result is recorded to
+    """
+    if any(job.depends_on for job in jobs):
+        # Imported here, ptx_publish_dag builds on this module
+        from .ptx_publish_dag import run_dag
+        logging.info("Some publish jobs declare depends_on; running the batch in dependency order")
+        return run_dag(jobs, max_workers, initializer, journal=journal)
+
+    start = time.perf_counter()
+    results = []
+    if not jobs:
+        return summarize(results, 0.0)
+
+    max_workers = max(1, min(max_workers or os.cpu_count() or 1, len(jobs)))
+
+    # Spawn rather than fork, DCC interpreters don't survive being forked
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=ctx, initializer=_init_worker, initargs=(initializer,)) as pool:
+        futures = {pool.submit(run_publish_job, job): job for job in jobs}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                res = future.result()
+            except Exception:
+                # The worker itself died (eg: a crash inside the DCC)
+                res = {"job_id": job.job_id, "app": job.app, "pub_type": job.pub_type, "asset": list(job.args),
+                       "version": job.kwargs.get("version"), "publish_state": 0, "publish_info": {}, "out_file": "", "error": traceback.format_exc(), "duration": 0.0}
+            logging.info(f"{res['job_id']}: state {res['publish_state']} in {res.get('duration', 0.0):.2f}s")
+            if journal is not None:
+                journal.record_result(res)
+            results.append(res)
+
+    # Report in manifest order regardless of completion order
+    order = {job.job_id: idx for idx, job in enumerate(jobs)}
+    results.sort(key=lambda res: order.get(res["job_id"], len(order)))
+    return summarize(results, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description='Run a manifest of publishes on a pool of worker processes.')
+    parser.add_argument('manifest', type=str, help='The json/yaml publish manifest')
+    parser.add_argument('--workers', type=int, default=None, help='Number of worker processes')
+    parser.add_argument('--initializer', type=str, default='', help='module:function run once per worker, eg: maya.standalone:initialize')
+    parser.add_argument('--summary', type=str, default='', help='Path to write the json summary to')
+    parser.add_argument('--journal', type=str, default='', help='Publish journal database to record the results in')
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    manifest = _read_manifest(args.manifest)
+    journal = PublishJournal(args.journal) if args.journal else None
+    summary = run_batch(load_manifest(manifest), args.workers or manifest.get("max_workers"),
+                        args.initializer or manifest.get("initializer", ""), journal)
+    if journal is not None:
+        journal.close()
+
+    print(f"{summary['succeeded']} succeeded, {summary['warnings']} with warnings, {summary['failed']} failed "
+          f"out of {summary['total']} in {summary['wall_time']:.1f}s")
+
+    if args.summary:
+        with open(args.summary, 'w') as file:
+            json.dump(summary, file, indent=4)
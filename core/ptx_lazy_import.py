@@ -0,0 +1,51 @@
+# copyright PhantomFX 2024
+import importlib
+import threading
+
+
+class LazyModule:
+    """
+    * Stand-in for a heavy module (pymel.core, pxr.*, ...) that is only imported the first time
+    * one of its attributes is accessed. Lets config readers, farm wrappers and CLI tools import
+    * our modules without paying for the DCC / USD imports they never use.
+    """
+    _lock = threading.Lock()
+
+    def __init__(self, name: str) -> None:
+        self.__dict__['_LazyModule__name'] = name
+        self.__dict__['_LazyModule__module'] = None
+
+    def _load(self):
+        """
+        * Imports the wrapped module if it hasn't been imported yet, and returns it.
+        """
+        module = self.__module
+        if module is None:
+            with self._lock:
+                if self.__module is None:
+                    self.__dict__['_LazyModule__module'] = importlib.import_module(self.__name)
+                module = self.__module
+        return module
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.__module is not None
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr: str, val):
+        setattr(self._load(), attr, val)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        return f"<LazyModule '{self.__name}' ({'loaded' if self.is_loaded else 'not loaded'})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    """
+    * Returns a LazyModule for the fully qualified module name, eg: lazy_import("pymel.core")
+    """
+    return LazyModule(name)
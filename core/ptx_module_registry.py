@@ -0,0 +1,123 @@
+# copyright PhantomFX 2024
+from pathlib import Path
+from typing import Dict, Any
+import importlib
+import importlib.util
+import json
+import threading
+
+
+class PtxModuleRegistry:
+    """
+    * Process-wide cache shared by the publish, Maya process and USD factories.
+    * Every .conf file is parsed once, every module spec is resolved once, every module
+    * is imported once and every builder class is looked up once. Call invalidate() to
+    * drop the cached state on purpose, eg: after editing a conf or a process module.
+    """
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+
+        # conf path -> parsed json
+        self._configs: Dict[str, Dict] = {}
+
+        # module name -> importlib.machinery.ModuleSpec (or None if it can't be found)
+        self._specs: Dict[str, Any] = {}
+
+        # module name -> imported module
+        self._modules: Dict[str, Any] = {}
+
+        # (module name, builder name) -> builder class
+        self._builders: Dict[tuple, Any] = {}
+
+        # module names that have been invalidated and need a reload on the next load
+        self._stale = set()
+
+    def config(self, conf_path: str) -> Dict:
+        """
+        * Returns the parsed json for the given conf file, parsing it only the first time.
+        * The returned dictionary is shared, so callers must treat it as read-only.
+        """
+        key = Path(conf_path).as_posix()
+        conf = self._configs.get(key)
+        if conf is not None:
+            return conf
+
+        with self._lock:
+            if key not in self._configs:
+                with open(key) as file:
+                    self._configs[key] = json.load(file)
+            return self._configs[key]
+
+    def find_spec(self, mod_name: str):
+        """
+        * Returns the module spec for the fully qualified module name, resolving it only once.
+        """
+        try:
+            return self._specs[mod_name]
+        except KeyError:
+            pass
+
+        with self._lock:
+            if mod_name not in self._specs:
+                self._specs[mod_name] = importlib.util.find_spec(mod_name)
+            return self._specs[mod_name]
+
+    def load_module(self, mod_spec):
+        """
+        * Imports the module described by the spec once and returns it. Unlike
+        * mod_spec.loader.load_module(), this doesn't re-execute the module on every call.
+        """
+        mod = self._modules.get(mod_spec.name)
+        if mod is not None:
+            return mod
+
+        with self._lock:
+            if mod_spec.name not in self._modules:
+                mod = importlib.import_module(mod_spec.name)
+                if mod_spec.name in self._stale:
+                    mod = importlib.reload(mod)
+                    self._stale.discard(mod_spec.name)
+                self._modules[mod_spec.name] = mod
+            return self._modules[mod_spec.name]
+
+    def builder(self, mod_spec, builder_name: str):
+        """
+        * Returns the builder class named builder_name from the module described by the spec.
+        """
+        key = (mod_spec.name, builder_name)
+        builder_cls = self._builders.get(key)
+        if builder_cls is not None:
+            return builder_cls
+
+        with self._lock:
+            if key not in self._builders:
+                self._builders[key] = getattr(self.load_module(mod_spec), builder_name)
+            return self._builders[key]
+
+    def invalidate(self, conf_path: str = None, mod_name: str = None):
+        """
+        * Drops cached state. With no arguments everything is dropped; otherwise only the given
+        * conf file and/or module is. Invalidated modules are reloaded the next time they're loaded.
+        """
+        with self._lock:
+            if conf_path is None and mod_name is None:
+                self._configs.clear()
+                self._specs.clear()
+                self._stale.update(self._modules.keys())
+                self._modules.clear()
+                self._builders.clear()
+                return
+
+            if conf_path is not None:
+                self._configs.pop(Path(conf_path).as_posix(), None)
+
+            if mod_name is not None:
+                self._specs.pop(mod_name, None)
+                if self._modules.pop(mod_name, None) is not None:
+                    self._stale.add(mod_name)
+                for key in [key for key in self._builders.keys() if key[0] == mod_name]:
+                    del self._builders[key]
+
+
+# The registry shared by every factory in the process
+registry = PtxModuleRegistry()
@@ -0,0 +1,229 @@
+# copyright PhantomFX 2024
+"""
+* Input-hash memoization for publishes.
+* A publish is fingerprinted from its class, asset info, keyword arguments and the contents of
+* its input files (source scene, looks files, textures). When a previous run with the same
+* fingerprint succeeded, its out_file / publish_info / publish_state are handed back instead of
+* running the publish again.
+"""
+from dataclasses import is_dataclass, asdict
+from pathlib import Path
+from typing import Dict, List
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+
+# Set to a non-empty value to bypass the publish cache everywhere, eg: on a forced re-publish
+__BYPASS_ENV__ = "PTX_PUBLISH_NO_CACHE"
+
+# Overrides the default location of the cache store
+__CACHE_DIR_ENV__ = "PTX_PUBLISH_CACHE_DIR"
+
+
+class _FileDigests:
+    """
+    * Content hashes of input files, remembered per (path, size, mtime) so unchanged files
+    * aren't re-read on every fingerprint within a process.
+    """
+    _lock = threading.Lock()
+    _digests: Dict[tuple, str] = {}
+
+    @classmethod
+    def digest(cls, file_path: str) -> str:
+        stat = os.stat(file_path)
+        key = (Path(file_path).as_posix(), stat.st_size, stat.st_mtime_ns)
+        digest = cls._digests.get(key)
+        if digest is None:
+            sha = hashlib.sha256()
+            with open(file_path, 'rb') as file:
+                for chunk in iter(lambda: file.read(1 << 20), b''):
+                    sha.update(chunk)
+            digest = sha.hexdigest()
+            with cls._lock:
+                cls._digests[key] = digest
+        return digest
+
+
+def _file_entry(file_path: str) -> List:
+    """
+    * [path, content digest] for an input file; missing files are recorded as such so that
+    * a file appearing later changes the fingerprint.
+    """
+    if not os.path.isfile(file_path):
+        return [Path(file_path).as_posix(), None]
+    return [Path(file_path).as_posix(), _FileDigests.digest(file_path)]
+
+
+def _output_stamps(publish) -> List:
+    """
+    * [path, size, mtime] of the out_file and of any other file the publish_info lists, so a hit can tell
+    * when a later publish with other inputs wrote over them
+    """
+    paths = [publish.out_file] if publish.out_file else []
+    pending = [publish.publish_info]
+    while pending:
+        value = pending.pop()
+        if isinstance(value, dict):
+            pending.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            pending.extend(value)
+        elif isinstance(value, str) and value not in paths and os.path.isfile(value):
+            paths.append(value)
+
+    stamps = []
+    for file_path in paths:
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            continue
+        stamps.append([Path(file_path).as_posix(), stat.st_size, stat.st_mtime_ns])
+    return stamps
+
+
+def _outputs_unchanged(stamps: List) -> bool:
+    for file_path, size, mtime_ns in stamps:
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return False
+        if (stat.st_size, stat.st_mtime_ns) != (size, mtime_ns):
+            return False
+    return True
+
+
+class PublishCache:
+    """
+    * Size-bounded store of publish results keyed by input fingerprint. Every entry is a small
+    * json file so several worker processes can share one store; the least recently used entries
+    * are evicted once the store holds more than max_entries.
+    """
+    def __init__(self, cache_dir: str = None, max_entries: int = 1000) -> None:
+        self.cache_dir = Path(cache_dir or os.environ.get(__CACHE_DIR_ENV__) or Path.home() / ".ptx_publish" / "publish_cache")
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+    def fingerprint(self, publish) -> str:
+        """
+        * Returns the hex digest of everything that determines the publish's output
+        """
+        asset = getattr(publish, "asset", None)
+        payload = {
+            "publish": f"{type(publish).__module__}.{type(publish).__qualname__}",
+            "asset": asdict(asset) if is_dataclass(asset) else asset,
+            "kwargs": publish.publish_kwargs,
+            "files": sorted(_file_entry(fl) for fl in set(publish.input_files())),
+        }
+        encoded = json.dumps(payload, sort_keys=True, default=str).encode()
+        return hashlib.sha256(encoded).hexdigest()
+
+    def _entry_path(self, digest: str) -> Path:
+        return self.cache_dir / f"{digest}.json"
+
+    def lookup(self, digest: str) -> Dict:
+        """
+        * Returns the stored result for the fingerprint, or None. Entries whose outputs have
+        * since disappeared or been written over, eg: by a publish of other inputs to the same
+        * out_file, are dropped.
+        """
+        entry_path = self._entry_path(digest)
+        try:
+            with open(entry_path) as file:
+                entry = json.load(file)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        # Entries from before the outputs were recorded can't be checked, so they don't count either
+        if "outputs" not in entry or not _outputs_unchanged(entry["outputs"]):
+            self.invalidate(digest)
+            self.misses += 1
+            return None
+
+        # Touch the entry so eviction is least recently used rather than least recently stored
+        os.utime(entry_path, None)
+        self.hits += 1
+        return entry
+
+    def store(self, digest: str, publish):
+        """
+        * Stores the result of a publish that succeeded (with or without warnings)
+        """
+        if publish.publish_state not in (1, 2):
+            return
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        entry = {"out_file": publish.out_file, "publish_info": publish.publish_info,
+                 "publish_state": publish.publish_state, "outputs": _output_stamps(publish), "created": time.time(),
+                 "publish": f"{type(publish).__module__}.{type(publish).__qualname__}"}
+
+        # Write then rename, so a concurrent reader never sees a partial entry
+        tmp_path = self.cache_dir / f"{digest}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as file:
+            json.dump(entry, file, default=str)
+        os.replace(tmp_path, self._entry_path(digest))
+        self.evict()
+
+    def invalidate(self, digest: str):
+        try:
+            os.remove(self._entry_path(digest))
+        except OSError:
+            pass
+
+    def evict(self):
+        """
+        * Removes the least recently used entries beyond max_entries
+        """
+        entries = []
+        for entry_path in self.cache_dir.glob("*.json"):
+            try:
+                entries.append((entry_path.stat().st_mtime, entry_path))
+            except OSError:
+                continue
+
+        if len(entries) <= self.max_entries:
+            return
+
+        entries.sort()
+        for _, entry_path in entries[:len(entries) - self.max_entries]:
+            try:
+                os.remove(entry_path)
+            except OSError:
+                pass
+
+    def clear(self):
+        for entry_path in self.cache_dir.glob("*.json"):
+            os.remove(entry_path)
+
+
+def cached_publish(publish, cache: PublishCache = None, bypass: bool = False) -> bool:
+    """
+    * Runs publish.publish() unless a previous run with identical inputs can be reused.
+    * Returns True on a cache hit. With bypass (or PTX_PUBLISH_NO_CACHE set) the publish always
+    * runs, and its result still refreshes the cache. A publish whose inputs can't be fingerprinted
+    * right now (see Publish.cacheable), eg: an unsaved scene, always runs and isn't stored.
+    """
+    if not publish.cacheable():
+        logging.info(f"{type(publish).__name__}: inputs can't be fingerprinted, publishing without the cache")
+        publish.publish()
+        return False
+
+    cache = cache or PublishCache()
+    digest = cache.fingerprint(publish)
+
+    if not bypass and not os.environ.get(__BYPASS_ENV__):
+        entry = cache.lookup(digest)
+        if entry is not None:
+            publish.out_file = entry["out_file"]
+            publish.publish_info.update(entry["publish_info"])
+            publish.publish_state = entry["publish_state"]
+            logging.info(f"{type(publish).__name__}: inputs unchanged, reusing {entry['out_file']}")
+            return True
+
+    publish.publish()
+    cache.store(digest, publish)
+    return False
@@ -0,0 +1,237 @@
+# copyright PhantomFX 2024
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from pathlib import Path
+from typing import Dict, List
+import logging
+import multiprocessing
+import os
+import time
+import traceback
+
+from .ptx_batch_publish import PublishJob, load_manifest, run_publish_job, summarize, _init_worker, _read_manifest
+from .ptx_module_registry import registry
+from .ptx_publish_journal import PublishJournal
+
+
+def publish_dependencies() -> Dict:
+    """
+    * Returns the declared dependencies between publish types, per app, from ptx_publish_deps.conf
+    """
+    return registry.config(f"{Path(__file__).parent}/ptx_publish_deps.conf")
+
+
+def build_dag(jobs: List[PublishJob], deps_conf: Dict = None) -> Dict[str, List[str]]:
+    """
+    * Builds the dependency graph of the jobs as {job_id: [upstream job ids]}.
+    * A job depends on the jobs listed in its depends_on, and on every job of the same asset
+    * whose publish type is declared as a dependency of its own publish type in deps_conf.
+    * Raises a ValueError on unknown job ids and on cycles.
+    """
+    deps_conf = publish_dependencies() if deps_conf is None else deps_conf
+
+    job_map = {job.job_id: job for job in jobs}
+    if len(job_map) != len(jobs):
+        raise ValueError("Job ids in a publish DAG must be unique")
+
+    # (asset, app, pub_type) -> job ids, to resolve the declared dependencies per asset
+    by_type: Dict[tuple, List[str]] = {}
+    for job in jobs:
+        by_type.setdefault((tuple(job.args), job.app, job.pub_type), []).append(job.job_id)
+
+    dag = {}
+    for job in jobs:
+        upstream = list(job.depends_on)
+        for dep_type in deps_conf.get(job.app, {}).get(job.pub_type, []):
+            upstream.extend(by_type.get((tuple(job.args), job.app, dep_type), []))
+
+        for dep in upstream:
+            if dep not in job_map:
+                raise ValueError(f"Job {job.job_id} depends on the unknown job {dep}")
+
+        dag[job.job_id] = list(dict.fromkeys(upstream))
+
+    topological_order(dag)
+    return dag
+
+
+def topological_order(dag: Dict[str, List[str]]) -> List[str]:
+    """
+    * Returns the job ids in an order where every job comes after its upstream jobs
+    """
+    indegree = {node: len(ups) for node, ups in dag.items()}
+    downstream = downstream_map(dag)
+    ready = [node for node, deg in indegree.items() if deg == 0]
+    order = []
+    while ready:
+        node = ready.pop()
+        order.append(node)
+        for child in downstream[node]:
+            indegree[child] -= 1
+            if indegree[child] == 0:
+                ready.append(child)
+
+    if len(order) != len(dag):
+        cycle = sorted(node for node, deg in indegree.items() if deg > 0)
+        raise ValueError(f"The publish dependencies contain a cycle between: {', '.join(cycle)}")
+
+    return order
+
+
+def downstream_map(dag: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    """
+    * Inverts the graph into {job_id: [downstream job ids]}
+    """
+    downstream = {node: [] for node in dag}
+    for node, ups in dag.items():
+        for up in ups:
+            downstream[up].append(node)
+    return downstream
+
+
+def descendants(dag: Dict[str, List[str]], node: str) -> List[str]:
+    """
+    * Returns every job that directly or indirectly depends on the given job
+    """
+    downstream = downstream_map(dag)
+    seen = []
+    stack = list(downstream[node])
+    while stack:
+        child = stack.pop()
+        if child in seen:
+            continue
+        seen.append(child)
+        stack.extend(downstream[child])
+    return seen
+
+
+def critical_path(dag: Dict[str, List[str]], durations: Dict[str, float]) -> tuple:
+    """
+    * Returns the longest duration weighted chain through the graph as (job ids, total seconds).
+    * Jobs that didn't run count as zero.
+    """
+    finish: Dict[str, float] = {}
+    via: Dict[str, str] = {}
+    for node in topological_order(dag):
+        best = None
+        for up in dag[node]:
+            if best is None or finish[up] > finish[best]:
+                best = up
+        finish[node] = durations.get(node, 0.0) + (finish[best] if best else 0.0)
+        via[node] = best
+
+    if not finish:
+        return ([], 0.0)
+
+    node = max(finish, key=finish.get)
+    total = finish[node]
+    path = []
+    while node:
+        path.append(node)
+        node = via[node]
+    return (list(reversed(path)), total)
+
+
+def _skipped_result(job: PublishJob, failed_job: str) -> Dict:
+    return {"job_id": job.job_id, "app": job.app, "pub_type": job.pub_type, "asset": list(job.args),
+            "publish_state": -1, "publish_info": {}, "out_file": "", "duration": 0.0,
+            "error": f"Skipped; upstream publish {failed_job} failed"}
+
+
+def run_dag(jobs: List[PublishJob], max_workers: int = None, initializer: str = "", deps_conf: Dict = None,
+            journal: PublishJournal = None) -> Dict:
+    """
+    * Runs the jobs on a bounded pool of worker processes in dependency order. Independent
+    * branches run concurrently; when a job ends with a publish state of 0, only the jobs
+    * downstream of it are skipped. The summary also carries the critical path.
+    * When a journal is given, every finished job is recorded to it.
+    """
+    dag = build_dag(jobs, deps_conf)
+    job_map = {job.job_id: job for job in jobs}
+    downstream = downstream_map(dag)
+    remaining = {node: len(ups) for node, ups in dag.items()}
+
+    start = time.perf_counter()
+    results: Dict[str, Dict] = {}
+    if not jobs:
+        return summarize([], 0.0)
+
+    max_workers = max(1, min(max_workers or os.cpu_count() or 1, len(jobs)))
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=ctx, initializer=_init_worker, initargs=(initializer,)) as pool:
+        running = {}
+        submitted = {}
+
+        def submit(node):
+            submitted[node] = time.perf_counter() - start
+            running[pool.submit(run_publish_job, job_map[node])] = node
+
+        for node, count in remaining.items():
+            if count == 0:
+                submit(node)
+
+        while running:
+            done, _ = wait(running.keys(), return_when=FIRST_COMPLETED)
+            for future in done:
+                node = running.pop(future)
+                try:
+                    res = future.result()
+                except Exception:
+                    res = {"job_id": node, "app": job_map[node].app, "pub_type": job_map[node].pub_type,
+                           "asset": list(job_map[node].args), "version": job_map[node].kwargs.get("version"),
+                           "publish_state": 0, "publish_info": {},
+                           "out_file": "", "error": traceback.format_exc(), "duration": 0.0}
+                res["started"] = submitted[node]
+                res["finished"] = time.perf_counter() - start
+                results[node] = res
+                logging.info(f"{node}: state {res['publish_state']} in {res.get('duration', 0.0):.2f}s")
+                if journal is not None:
+                    journal.record_result(res)
+
+                if res["publish_state"] == 0:
+                    # Stop only what depends on this publish; the other branches carry on
+                    for child in descendants(dag, node):
+                        if child not in results:
+                            results[child] = _skipped_result(job_map[child], node)
+                            logging.warning(f"{child}: skipped, {node} failed")
+                    continue
+
+                for child in downstream[node]:
+                    remaining[child] -= 1
+                    if remaining[child] == 0 and child not in results:
+                        submit(child)
+
+    ordered = [results[job.job_id] for job in jobs if job.job_id in results]
+    summary = summarize(ordered, time.perf_counter() - start)
+    summary["skipped"] = [res["job_id"] for res in ordered if res["publish_state"] == -1 and res["error"].startswith("Skipped")]
+    summary["critical_path"], summary["critical_path_time"] = critical_path(
+        dag, {res["job_id"]: res.get("duration", 0.0) for res in ordered})
+    return summary
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    parser = argparse.ArgumentParser(description='Run a manifest of publishes in dependency order on a pool of worker processes.')
+    parser.add_argument('manifest', type=str, help='The json/yaml publish manifest')
+    parser.add_argument('--workers', type=int, default=None, help='Number of worker processes')
+    parser.add_argument('--initializer', type=str, default='', help='module:function run once per worker, eg: maya.standalone:initialize')
+    parser.add_argument('--summary', type=str, default='', help='Path to write the json summary to')
+    parser.add_argument('--journal', type=str, default='', help='Publish journal database to record the results in')
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    manifest = _read_manifest(args.manifest)
+    journal = PublishJournal(args.journal) if args.journal else None
+    summary = run_dag(load_manifest(manifest), args.workers or manifest.get("max_workers"),
+                      args.initializer or manifest.get("initializer", ""), journal=journal)
+    if journal is not None:
+        journal.close()
+
+    print(f"{summary['succeeded']} succeeded, {summary['warnings']} with warnings, {summary['failed']} failed, "
+          f"{len(summary['skipped'])} skipped out of {summary['total']} in {summary['wall_time']:.1f}s")
+    print(f"Critical path ({summary['critical_path_time']:.1f}s): {' -> '.join(summary['critical_path'])}")
+
+    if args.summary:
+        with open(args.summary, 'w') as file:
+            json.dump(summary, file, indent=4)
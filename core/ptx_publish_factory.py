@@ -1,14 +1,14 @@
 # copyright PhantomFX 2024
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Dict, Any
+from typing import Dict, List
 import logging
 import os
-import json
 from pathlib import Path
-import importlib.util
 
-logging.basicConfig(level=logging.WARNING)
+from .ptx_module_registry import registry
+from .ptx_trace import call_asset, span, trace_subclass_method
+from .ptx_publish_cache import cached_publish
 
 @dataclass
 class AssetInfo:
@@ -45,6 +45,15 @@ class Publish(ABC):
         # Property to store the processed out file
         self.__out_file: str = ""
 
+        # Property to store the keyword arguments the publish was created with.
+        # Used to fingerprint the publish's inputs for the publish cache
+        self.__publish_kwargs: Dict = dict(kwargs)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Every publish implementation records a span when tracing is on
+        trace_subclass_method(cls, "publish")
+
     @property
     def out_file(self):
         return self.__out_file
@@ -64,13 +73,17 @@ class Publish(ABC):
 
         self.__publish_state = val
 
+    @property
+    def publish_kwargs(self):
+        return self.__publish_kwargs
+
     @property
     def publish_info(self):
         return self.__publish_info
     
     @publish_info.setter
-    def publish_info(self, key: str, val: Any):
-        self.__publish_info[key] = val
+    def publish_info(self, val: Dict):
+        self.__publish_info = dict(val)
 
     @abstractmethod
     def publish(self):
@@ -80,13 +93,50 @@ class Publish(ABC):
         """
         pass
 
+    def input_files(self) -> List[str]:
+        """
+        * Files whose contents determine the output of this publish, eg: the source scene, looks
+        * files and textures. Used to fingerprint the publish for the publish cache.
+        * The default returns the 'source_files' keyword argument; override it to add inputs
+        * only the DCC knows about.
+        """
+        return list(self.publish_kwargs.get('source_files', []))
+
+    def cacheable(self) -> bool:
+        """
+        * Whether input_files() fully describes the inputs right now. Override it to return False when
+        * they don't, eg: a scene with unsaved edits, which the saved scene file doesn't fingerprint.
+        """
+        return True
+
+    def publish_cached(self, cache=None, bypass: bool = False) -> int:
+        """
+        * Runs publish() unless a previous run with identical inputs succeeded, in which case its
+        * out_file, publish_info and publish_state are reused. Returns the publish state.
+        *   @param cache: type PublishCache: The store to use; the default store if not given
+        *   @param bypass: type bool: Always run the publish (the result still refreshes the cache)
+        """
+        cached_publish(self, cache, bypass)
+        return self.publish_state
+
+    async def publish_async(self) -> int:
+        """
+        * Awaitable counterpart of publish(); returns the publish state, with the same meaning.
+        * The default implementation runs publish() on the event loop's thread so that DCC calls
+        * stay on the main thread, which blocks the loop: nothing else in it runs meanwhile. Override
+        * it in publishes that mostly wait on child processes or disk, using the helpers in
+        * ptx_async_utils, eg: compose_pfx_usd_async or create_txfile_async, for them to overlap.
+        """
+        self.publish()
+        return self.publish_state
+
 
 class Activate(Publish):
     """
     * Abstract class implementation for using in the Active/Passive workflow. Derives from the Publish class.
     """
     def __init__(self, *args, **kwargs) -> None:
-        super().__init__()
+        super().__init__(*args, **kwargs)
 
     def publish(self):
         """
@@ -132,9 +182,8 @@ class PtxPublishFactory:
     * The "Factory" class to return an initialized object of the particular type of publish
     """
     def __init__(self) -> None:
-        self._apps = dict()
-        with open(f"{Path(__file__).parent}/ptx_publish.conf") as file:
-            self._apps = json.load(file)
+        # The conf is parsed once per process and shared between factory instances
+        self._apps = registry.config(f"{Path(__file__).parent}/ptx_publish.conf")
 
     def register_app(self, app, pub_type):
         """
@@ -147,7 +196,7 @@ class PtxPublishFactory:
         if pub_type not in self._apps[app].keys():
             raise ValueError("Given publish method isn't registered with the system")
         
-        return importlib.util.find_spec(".".join(['ptx_publish', 'app_modules', app.lower(), self._apps[app][pub_type]]))
+        return registry.find_spec(".".join(['ptx_publish', 'app_modules', app.lower(), self._apps[app][pub_type]]))
 
     def create(self, mod_spec, *args, **kwargs):
         """
@@ -156,12 +205,14 @@ class PtxPublishFactory:
         if mod_spec == None:
             raise ValueError("Invalid module specified")
         
-        mod = mod_spec.loader.load_module()
-        NodeBuilder = mod.PtxNodeBuilder()
-        return NodeBuilder(*args, **kwargs)
+        with span("PtxPublishFactory.create", call_asset(args, kwargs), module=mod_spec.name):
+            NodeBuilder = registry.builder(mod_spec, "PtxNodeBuilder")()
+            return NodeBuilder(*args, **kwargs)
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+
     class ExamplePublish(Publish):
         def publish(self):
             print("Example Publish")
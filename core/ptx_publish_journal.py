@@ -0,0 +1,259 @@
+# copyright PhantomFX 2024
+"""
+* Persistent, indexed journal of every publish.
+* Records go onto a queue and a background thread writes them to SQLite (in WAL mode) in
+* batched transactions, so recording never blocks the publish hot path. Indexes on
+* asset/type/version/state make questions like "latest successful mshc for asset X" a
+* single index lookup instead of a filesystem crawl.
+"""
+from dataclasses import is_dataclass, asdict
+from pathlib import Path
+from typing import Dict, List
+import atexit
+import json
+import logging
+import os
+import queue
+import socket
+import sqlite3
+import threading
+import time
+
+
+# Overrides the default location of the journal database
+__JOURNAL_ENV__ = "PTX_PUBLISH_JOURNAL"
+
+__COLUMNS__ = ["asset_name", "asset_type", "asset_process", "pub_type", "version", "state", "out_file",
+               "outputs", "publish_info", "started", "finished", "duration", "bytes_out", "host", "pid", "error"]
+
+__SCHEMA__ = """
+CREATE TABLE IF NOT EXISTS publishes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    asset_name TEXT NOT NULL,
+    asset_type TEXT,
+    asset_process TEXT,
+    pub_type TEXT NOT NULL,
+    version TEXT,
+    state INTEGER NOT NULL,
+    out_file TEXT,
+    outputs TEXT,
+    publish_info TEXT,
+    started REAL,
+    finished REAL,
+    duration REAL,
+    bytes_out INTEGER,
+    host TEXT,
+    pid INTEGER,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_publishes_asset_type_version ON publishes (asset_name, pub_type, version);
+CREATE INDEX IF NOT EXISTS idx_publishes_asset_type_state_finished ON publishes (asset_name, pub_type, state, finished);
+CREATE INDEX IF NOT EXISTS idx_publishes_finished ON publishes (finished);
+"""
+
+
+def _connect(db_path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path, timeout=30.0)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def _bytes_out(paths: List[str]) -> int:
+    total = 0
+    for path in paths:
+        try:
+            total += os.stat(path).st_size
+        except OSError:
+            pass
+    return total
+
+
+class PublishJournal:
+    """
+    * Append-only publish journal backed by SQLite.
+    *   @param db_path: type str: The database file; PTX_PUBLISH_JOURNAL or ~/.ptx_publish/journal.db by default
+    *   @param batch_size: type int: The maximum number of records written per transaction
+    *   @param flush_interval: type float: How long the writer waits to fill a batch, in seconds
+    """
+    def __init__(self, db_path: str = None, batch_size: int = 200, flush_interval: float = 0.25) -> None:
+        self.db_path = Path(db_path or os.environ.get(__JOURNAL_ENV__) or Path.home() / ".ptx_publish" / "journal.db").as_posix()
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        conn = _connect(self.db_path)
+        conn.executescript(__SCHEMA__)
+        conn.close()
+
+        self._queue: queue.Queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="ptx-publish-journal", daemon=True)
+        self._writer.start()
+        self._local = threading.local()
+        atexit.register(self.close)
+
+    def _write_loop(self):
+        """
+        * Background writer; groups queued records into one transaction per batch
+        """
+        conn = _connect(self.db_path)
+        insert = f"INSERT INTO publishes ({', '.join(__COLUMNS__)}) VALUES ({', '.join('?' * len(__COLUMNS__))})"
+        running = True
+        while running:
+            rows = []
+            item = self._queue.get()
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item is None:
+                    running = False
+                    self._queue.task_done()
+                    break
+
+                rows.append(item)
+                if len(rows) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+
+            if rows:
+                try:
+                    rows = [[row.get(col) for col in __COLUMNS__] for row in map(self._finalize, rows)]
+                    with conn:
+                        conn.executemany(insert, rows)
+                except Exception:
+                    logging.exception("Failed to write publish journal records")
+                finally:
+                    for _ in rows:
+                        self._queue.task_done()
+        conn.close()
+
+    @staticmethod
+    def _finalize(row: Dict) -> Dict:
+        """
+        * Work that's deferred to the writer thread: output sizes and json encoding
+        """
+        outputs = row.get("outputs") or ([row["out_file"]] if row.get("out_file") else [])
+        row["bytes_out"] = row.get("bytes_out") if row.get("bytes_out") is not None else _bytes_out(outputs)
+        row["outputs"] = json.dumps(outputs, default=str)
+        row["publish_info"] = json.dumps(row.get("publish_info") or {}, default=str)
+        return row
+
+    def record(self, publish, pub_type: str = "", started: float = None, finished: float = None,
+               outputs: List[str] = None, version: str = None, error: str = ""):
+        """
+        * Queues a record for the publish object; returns immediately.
+        *   @param pub_type: type str: The publish type, eg: mshc. Defaults to the class name
+        *   @param started / finished: type float: Epoch seconds of the start and end of the publish
+        """
+        asset = getattr(publish, "asset", None)
+        asset = asdict(asset) if is_dataclass(asset) else {}
+        kwargs = getattr(publish, "publish_kwargs", {})
+        info = dict(publish.publish_info)
+        self.record_values(asset.get("asset_name", ""), pub_type or type(publish).__name__, publish.publish_state,
+                           asset_type=asset.get("asset_type", ""), asset_process=asset.get("asset_process", ""),
+                           version=version or kwargs.get("version") or info.get("version"),
+                           out_file=publish.out_file, outputs=outputs, publish_info=info,
+                           started=started, finished=finished, error=error)
+
+    def record_result(self, result: Dict):
+        """
+        * Queues a record for a batch/DAG runner result dictionary. The version is the job's, ie: its
+        * version keyword argument, or the one the publish reported in its publish_info.
+        """
+        version = result.get("version")
+        asset = list(result.get("asset") or []) + ["", "", ""]
+        finished = result.get("finished_at") or time.time()
+        started = result.get("started_at") or finished - result.get("duration", 0.0)
+        self.record_values(asset[0], result.get("pub_type", ""), result.get("publish_state", -1),
+                           asset_type=asset[1], asset_process=asset[2],
+                           version=version if version is not None else (result.get("publish_info") or {}).get("version"),
+                           out_file=result.get("out_file", ""), publish_info=result.get("publish_info"),
+                           started=started, finished=finished, pid=result.get("pid") or os.getpid(),
+                           error=result.get("error", ""))
+
+    def record_values(self, asset_name: str, pub_type: str, state: int, **values):
+        """
+        * Queues a record from plain values; see __COLUMNS__ for the accepted keys
+        """
+        row = {"asset_name": asset_name, "pub_type": pub_type, "state": state, "host": socket.gethostname(),
+               "pid": os.getpid(), **values}
+        if row.get("duration") is None and row.get("started") is not None and row.get("finished") is not None:
+            row["duration"] = row["finished"] - row["started"]
+        if row.get("version") is not None:
+            row["version"] = str(row["version"])
+        self._queue.put(row)
+
+    def flush(self):
+        """
+        * Blocks until every queued record has been written
+        """
+        self._queue.join()
+
+    def close(self):
+        """
+        * Writes the remaining records and stops the writer thread
+        """
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = _connect(self.db_path)
+            self._local.conn = conn
+        return conn
+
+    def query(self, sql: str, params: tuple = ()) -> List[Dict]:
+        """
+        * Runs a read query against the journal and returns the rows as dictionaries
+        """
+        rows = [dict(row) for row in self._reader().execute(sql, params).fetchall()]
+        for row in rows:
+            for col in ("outputs", "publish_info"):
+                if isinstance(row.get(col), str):
+                    row[col] = json.loads(row[col])
+        return rows
+
+    def latest(self, asset_name: str, pub_type: str, min_state: int = 2, version: str = None) -> Dict:
+        """
+        * The most recent publish of the type for the asset whose state is at least min_state,
+        * eg: journal.latest("Alien", "mshc") for the latest successful mesh cache. None if there's none.
+        """
+        sql = "SELECT * FROM publishes WHERE asset_name = ? AND pub_type = ? AND state >= ?"
+        params = [asset_name, pub_type, min_state]
+        if version is not None:
+            sql += " AND version = ?"
+            params.append(str(version))
+        rows = self.query(sql + " ORDER BY finished DESC, id DESC LIMIT 1", tuple(params))
+        return rows[0] if rows else None
+
+    def history(self, asset_name: str, pub_type: str = None, limit: int = 50) -> List[Dict]:
+        """
+        * The most recent publishes of the asset, optionally of one type only, newest first
+        """
+        if pub_type is None:
+            return self.query("SELECT * FROM publishes WHERE asset_name = ? ORDER BY finished DESC, id DESC LIMIT ?",
+                              (asset_name, limit))
+        return self.query("SELECT * FROM publishes WHERE asset_name = ? AND pub_type = ? ORDER BY finished DESC, id DESC LIMIT ?",
+                          (asset_name, pub_type, limit))
+
+
+def journaled_publish(publish, journal: PublishJournal, pub_type: str = "") -> int:
+    """
+    * Runs publish.publish(), times it and queues the journal record. Returns the publish state.
+    """
+    started = time.time()
+    error = ""
+    try:
+        publish.publish()
+    except Exception as err:
+        publish.publish_state = 0
+        error = repr(err)
+        raise
+    finally:
+        journal.record(publish, pub_type, started, time.time(), error=error)
+    return publish.publish_state
@@ -0,0 +1,236 @@
+# copyright PhantomFX 2024
+"""
+* Lightweight span tracing for publishes and composes.
+*
+*   with span("usd_create_mtlx", asset="Alien", material="skin_MTL"):
+*       ...
+*
+* Tracing is off by default; turn it on with enable_tracing() or by setting PTX_TRACE=1 in the
+* environment. When it's off span() hands back a shared no-op context manager, so the cost of an
+* instrumented call is a function call and a flag check. Recorded spans can be exported to the
+* Chrome trace format (chrome://tracing, Perfetto) or to plain json. Only the latest
+* PTX_TRACE_MAX_EVENTS spans (100000 by default) are kept, so a long session that never exports
+* doesn't grow without bound; the older ones are dropped and counted.
+"""
+from collections import deque
+from typing import Dict, List
+import functools
+import json
+import os
+import threading
+import time
+
+
+class _TraceState:
+    """
+    * Process-wide tracing switch and the latest spans recorded so far
+    """
+    enabled: bool = os.environ.get("PTX_TRACE", "") not in ("", "0")
+    events: deque = deque(maxlen=int(os.environ.get("PTX_TRACE_MAX_EVENTS", "") or 100000))
+    dropped: int = 0
+
+
+# The assets of the spans each thread is in, so a span without an asset takes its enclosing span's
+_SPAN_ASSETS = threading.local()
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Span:
+    """
+    * A timed section of work. Records its name, asset, duration and any extra arguments
+    * when it exits. A span without an asset takes the asset of the span it runs in.
+    """
+    __slots__ = ("name", "asset", "args", "start")
+
+    def __init__(self, name: str, asset: str = "", **args) -> None:
+        self.name = name
+        self.asset = asset
+        self.args = args
+        self.start = 0
+
+    def __enter__(self):
+        assets = _SPAN_ASSETS.__dict__.setdefault("stack", [])
+        if not self.asset and assets:
+            self.asset = assets[-1]
+        assets.append(self.asset)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        _SPAN_ASSETS.stack.pop()
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        if len(_TraceState.events) == _TraceState.events.maxlen:
+            _TraceState.dropped += 1
+        _TraceState.events.append({
+            "name": self.name,
+            "asset": self.asset,
+            "start_ns": self.start,
+            "duration_ns": end - self.start,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": self.args,
+        })
+        return False
+
+    def set(self, **args):
+        """
+        * Adds arguments to the span once they're known, eg: a prim count
+        """
+        self.args.update(args)
+
+
+def span(name: str, asset: str = "", **args):
+    """
+    * Returns a span context manager, or a shared no-op one when tracing is off
+    """
+    if not _TraceState.enabled:
+        return _NOOP_SPAN
+    return Span(name, asset, **args)
+
+
+def call_asset(args: tuple, kwargs: dict, positional: bool = True) -> str:
+    """
+    * The asset a factory create call is for: its asset_name keyword, else its first positional
+    * argument when that's an AssetInfo or a name. "" when there's none, the span then takes the
+    * asset of the span it runs in.
+    """
+    if kwargs.get("asset_name"):
+        return str(kwargs["asset_name"])
+    if not positional or not args:
+        return ""
+    return getattr(args[0], "asset_name", args[0]) if isinstance(args[0], str) or hasattr(args[0], "asset_name") else ""
+
+
+def _asset_name(obj) -> str:
+    asset = getattr(obj, "asset", None)
+    return getattr(asset, "asset_name", "") if asset is not None else ""
+
+
+def traced(func):
+    """
+    * Decorator for methods; records a span named <Class>.<method> with the asset name of the
+    * object it's called on.
+    """
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        if not _TraceState.enabled:
+            return func(self, *args, **kwargs)
+        with Span(f"{type(self).__name__}.{func.__name__}", _asset_name(self)):
+            return func(self, *args, **kwargs)
+    wrapper.__ptx_traced__ = True
+    return wrapper
+
+
+def trace_subclass_method(cls, method_name: str):
+    """
+    * Wraps the method in a span if the class defines it itself. Called from __init_subclass__
+    * of the publish and process base classes so every implementation is traced.
+    """
+    method = cls.__dict__.get(method_name)
+    if callable(method) and not getattr(method, "__ptx_traced__", False):
+        setattr(cls, method_name, traced(method))
+
+
+def enable_tracing(max_events: int = None):
+    """
+    * Turns tracing on; max_events changes how many of the latest spans are kept
+    """
+    _TraceState.enabled = True
+    if max_events is not None and max_events != _TraceState.events.maxlen:
+        _TraceState.events = deque(_TraceState.events, maxlen=max_events)
+
+
+def disable_tracing():
+    _TraceState.enabled = False
+
+
+def is_tracing() -> bool:
+    return _TraceState.enabled
+
+
+def clear_trace():
+    _TraceState.events.clear()
+    _TraceState.dropped = 0
+
+
+def dropped_events() -> int:
+    """
+    * How many spans were dropped to stay within the event cap since the last clear_trace()
+    """
+    return _TraceState.dropped
+
+
+def trace_events() -> List[Dict]:
+    """
+    * Returns a copy of the spans recorded so far
+    """
+    return list(_TraceState.events)
+
+
+def to_chrome_trace(events: List[Dict] = None) -> Dict:
+    """
+    * Converts spans into the Chrome trace event format, using complete ("X") events
+    """
+    events = trace_events() if events is None else events
+    trace = []
+    for evt in events:
+        trace.append({
+            "name": evt["name"],
+            "cat": "ptx",
+            "ph": "X",
+            "ts": evt["start_ns"] / 1000.0,
+            "dur": evt["duration_ns"] / 1000.0,
+            "pid": evt["pid"],
+            "tid": evt["tid"],
+            "args": {"asset": evt["asset"], **evt["args"]},
+        })
+    return {"traceEvents": trace, "displayTimeUnit": "ms"}
+
+
+def _drain(events: List[Dict] = None, drain: bool = False) -> List[Dict]:
+    if events is not None:
+        return events
+    events = trace_events()
+    if drain:
+        clear_trace()
+    return events
+
+
+def export_chrome_trace(out_path: str, events: List[Dict] = None, drain: bool = False) -> str:
+    """
+    * Writes the spans to a json file that can be loaded in chrome://tracing or Perfetto. With drain,
+    * the recorded spans are cleared once exported, for periodic exports from a long session.
+    """
+    events = _drain(events, drain)
+    with open(out_path, 'w') as file:
+        json.dump(to_chrome_trace(events), file, default=str)
+    return out_path
+
+
+def export_json(out_path: str, events: List[Dict] = None, drain: bool = False) -> str:
+    """
+    * Writes the spans as a plain json list of {name, asset, duration_ms, ...}, see export_chrome_trace
+    """
+    events = _drain(events, drain)
+    with open(out_path, 'w') as file:
+        json.dump([{"name": evt["name"], "asset": evt["asset"], "duration_ms": evt["duration_ns"] / 1e6,
+                    "start_ms": evt["start_ns"] / 1e6, "pid": evt["pid"], "tid": evt["tid"], "args": evt["args"]}
+                   for evt in events], file, indent=4, default=str)
+    return out_path
@@ -0,0 +1,39 @@
+import pytest
+
+from ..app_modules.usd.composers.ptx_asset_profiler import compare_profiles, profile_layers, _distribution
+
+
+def test_compare_profiles_flags_only_timings_over_the_threshold():
+    baseline = {"timings": {"open_load_none": 1.0, "open_load_all": 2.0, "bbox_first_query": 0.0}}
+    profile = {"timings": {"open_load_none": 1.1, "open_load_all": 3.0, "bbox_first_query": 0.5, "binding_resolve_bulk": 1.0}}
+
+    regressions = compare_profiles(profile, baseline, threshold=0.15)
+    assert len(regressions) == 1 and regressions[0].startswith("open_load_all")
+    assert compare_profiles(profile, {}) == []
+
+    stats = _distribution([0.3, 0.1, 0.2])
+    assert stats["count"] == 3 and stats["p50"] == 0.2 and stats["max"] == 0.3
+    assert _distribution([]) == {"count": 0, "total": 0.0}
+
+
+def test_profile_layers_counts_the_composed_asset(tmp_path):
+    pytest.importorskip("pxr")
+    pytest.importorskip("chitragupta")
+    from pxr import Sdf
+
+    from ..app_modules.usd.composers import ptx_base_composer as pbc
+    from ..benchmarks import synthetic_assets as sa
+
+    compose_args = sa.generate_asset(tmp_path.as_posix(), 12, 3, asset_name="Profiled")
+    pbc.compose_pfx_usd(**compose_args, looks_reader=sa.read_looks_info)
+    # Leave the meshes of the last material unbound
+    unbound = len(sa.read_looks_info(compose_args["asset_info_path"])[-1]["meshes"])
+    luk_layer = Sdf.Layer.FindOrOpen(f"{compose_args['usd_base_location']}/LUK_Prop_Profiled/LUK_Prop_Profiled.usda")
+    del luk_layer.GetPrimAtPath("/Looks").nameChildren["mat_2_MTL"]
+    luk_layer.Save()
+
+    report = profile_layers(f"{compose_args['usd_base_location']}/GEO_Prop_Profiled.usda", repeat=1)
+    assert report["repeat"] == 1 and report["registry_warmup"] > 0.0
+    assert report["counts"]["meshes"] == 12 and report["counts"]["payload_prims"] == 12
+    assert report["counts"]["unbound_meshes"] == unbound > 0
+    assert report["binding_resolve"]["count"] == 12
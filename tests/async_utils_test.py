@@ -0,0 +1,40 @@
+import asyncio
+import sys
+
+from ..core.ptx_async_utils import gather_limited, publish_all_async, run_subprocess_async
+
+
+def test_gather_limited_bounds_the_coroutines_in_flight():
+    in_flight = {"now": 0, "max": 0}
+
+    async def work(idx):
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        await asyncio.sleep(0.01 * (5 - idx % 5))
+        in_flight["now"] -= 1
+        return idx
+
+    assert asyncio.run(gather_limited([work(idx) for idx in range(12)], limit=3)) == list(range(12))
+    assert in_flight["max"] == 3
+
+
+def test_run_subprocess_async_returns_the_output_and_return_code():
+    cmd = [sys.executable, "-c", "import sys; print('out'); print('err', file=sys.stderr); sys.exit(3)"]
+    out, err, return_code = asyncio.run(run_subprocess_async(cmd, shell=False))
+    assert out.strip() == b"out" and err.strip() == b"err" and return_code == 3
+
+
+def test_publish_all_async_reports_a_raising_publish_as_failed():
+    class _Publish:
+        publish_state = -1
+
+        def __init__(self, fail):
+            self.fail = fail
+
+        async def publish_async(self):
+            if self.fail:
+                raise RuntimeError("publish failed")
+            self.publish_state = 2
+            return self.publish_state
+
+    assert asyncio.run(publish_all_async([_Publish(False), _Publish(True), _Publish(False)], limit=2)) == [2, 0, 2]
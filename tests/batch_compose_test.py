@@ -0,0 +1,31 @@
+import pytest
+
+from ..app_modules.usd.composers.ptx_batch_compose import ComposeJob, load_compose_manifest, run_compose_batch
+
+
+def _asset(name, **kwargs):
+    return {"asset_info_path": f"/missing/{name}.json", "asset_alembic_path": f"/missing/{name}.abc",
+            "usd_base_location": "/missing/usd", "asset_type": "Prop", "asset_name": name, **kwargs}
+
+
+def test_manifest_merges_defaults_and_rejects_unknown_arguments():
+    manifest = {"defaults": {"backend": "sdf", "asset_base_prim_path": "/render_GRP"},
+                "assets": [_asset("Tree"), _asset("Rock", backend="usd", id="rock")]}
+    jobs = load_compose_manifest(manifest)
+    assert [job.job_id for job in jobs] == ["Prop_Tree", "rock"]
+    assert jobs[0].kwargs["backend"] == "sdf" and jobs[1].kwargs["backend"] == "usd"
+
+    with pytest.raises(ValueError, match="share_texture"):
+        load_compose_manifest({"defaults": {"asset_base_prim_path": "/render_GRP"},
+                               "assets": [_asset("Tree", share_texture=True)]})
+    with pytest.raises(ValueError, match="asset_base_prim_path"):
+        load_compose_manifest({"assets": [_asset("Tree")]})
+
+
+def test_failing_assets_dont_stop_the_batch():
+    jobs = [ComposeJob(name, _asset(name, asset_base_prim_path="/render_GRP", looks_reader="json:load"))
+            for name in ("Tree", "Rock")]
+    summary = run_compose_batch(jobs, max_workers=1)
+    assert summary["total"] == 2 and summary["failed"] == 2
+    assert [res["job_id"] for res in summary["results"]] == ["Tree", "Rock"]
+    assert all(res["error"] and res["duration"] >= 0.0 for res in summary["results"])
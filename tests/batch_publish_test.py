@@ -0,0 +1,51 @@
+import pytest
+
+from ..core.ptx_batch_publish import PublishJob, load_manifest, run_batch, run_publish_job
+
+
+def test_manifest_merges_kwargs_and_scenes():
+    jobs = load_manifest({
+        "defaults": {"app": "maya", "use_cache": True, "kwargs": {"frame_range": [1, 1], "take": 1}},
+        "assets": [
+            {"asset_name": "Alien", "asset_type": "Character", "asset_process": "mdl", "scene": "/work/Alien.ma",
+             "kwargs": {"take": 2}, "publishes": ["mshc", {"type": "exws", "scene": "/work/Alien_clean.ma", "kwargs": {"take": 3}}]},
+        ]
+    })
+    assert [job.job_id for job in jobs] == ["Alien:maya:mshc", "Alien:maya:exws"]
+    assert jobs[0].args == ["Alien", "Character", "mdl"] and jobs[0].use_cache
+    assert jobs[0].kwargs == {"frame_range": [1, 1], "take": 2} and jobs[1].kwargs["take"] == 3
+    assert jobs[0].scene == "/work/Alien.ma" and jobs[1].scene == "/work/Alien_clean.ma"
+
+
+def test_duplicate_job_ids_are_rejected():
+    assets = [{"asset_name": "Rock", "asset_type": "Prop", "asset_process": "mdl", "publishes": ["mshc"]},
+              {"asset_name": "Rock", "asset_type": "Environment", "asset_process": "mdl", "publishes": ["mshc"]}]
+    with pytest.raises(ValueError, match="Rock:maya:mshc"):
+        load_manifest({"assets": assets})
+
+    assets[1]["publishes"] = [{"type": "mshc", "id": "Rock_env:maya:mshc"}]
+    assert len(load_manifest({"assets": assets})) == 2
+
+
+def test_scenes_are_opened_before_the_publish():
+    result = run_publish_job(PublishJob("Alien:blender:mshc", "blender", "mshc", ["Alien", "Character", "mdl"],
+                                        scene="/work/Alien.blend"))
+    assert result["publish_state"] == 0 and "scene opener" in result["error"]
+
+
+def test_failing_jobs_dont_stop_the_batch_and_results_keep_manifest_order():
+    jobs = [PublishJob(f"{name}:maya:{pub_type}", "maya", pub_type, [name, "Prop", "mdl"])
+            for name, pub_type in (("Tree", "nope"), ("Rock", "nope"), ("Bush", "missing"))]
+    summary = run_batch(jobs, max_workers=2)
+    assert summary["total"] == 3 and summary["failed"] == 3
+    assert [res["job_id"] for res in summary["results"]] == [job.job_id for job in jobs]
+    assert all("isn't registered" in res["error"] for res in summary["results"])
+
+
+def test_batches_with_dependencies_run_in_dependency_order():
+    jobs = [PublishJob("Tree:maya:nope", "maya", "nope", ["Tree", "Prop", "mdl"]),
+            PublishJob("Tree:maya:after", "maya", "after", ["Tree", "Prop", "mdl"], depends_on=["Tree:maya:nope"]),
+            PublishJob("Rock:maya:nope", "maya", "nope", ["Rock", "Prop", "mdl"])]
+    summary = run_batch(jobs, max_workers=2)
+    assert summary["failed"] == 2 and summary["skipped"] == ["Tree:maya:after"]
+    assert [res["job_id"] for res in summary["results"]] == [job.job_id for job in jobs]
@@ -0,0 +1,54 @@
+import os
+import stat
+import threading
+
+from ..app_modules.usd.composers.ptx_compose_service import ComposeService, make_server, request, submit_compose
+
+
+def test_service_reports_failed_jobs_and_stats(tmp_path):
+    address = f"unix:{tmp_path}/compose.sock"
+    service = ComposeService(max_jobs=1)
+    server = make_server(address, service)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        assert request(address, {"op": "ping"}, timeout=10)["ok"]
+        job = {"asset_info_path": str(tmp_path / "missing.json"), "asset_alembic_path": str(tmp_path / "missing.abc"),
+               "usd_base_location": str(tmp_path), "asset_type": "Prop", "asset_name": "Tree",
+               "asset_base_prim_path": "/render_GRP",
+               "looks_reader": "ptx_publish.app_modules.usd.composers.ptx_looks_utils:iter_looks_info"}
+        result = submit_compose(address, job, timeout=120)
+        assert result["job_id"] == "Prop_Tree" and result["publish_state"] == 0 and result["error"]
+
+        refused = request(address, {"op": "compose", "job": dict(job, share_texture=True)}, timeout=10)
+        assert not refused["ok"] and "share_texture" in refused["error"]
+
+        stats = request(address, {"op": "stats"}, timeout=10)["stats"]
+        assert (stats["submitted"], stats["completed"], stats["failed"], stats["rejected"]) == (1, 1, 1, 1)
+        assert stats["queue_depth"] == 0 and stats["latency"]["total"]["count"] == 1
+    finally:
+        server.shutdown()
+        server.server_close()
+        service.shutdown()
+
+
+def test_service_only_runs_its_own_looks_readers(tmp_path):
+    address = f"unix:{tmp_path}/compose.sock"
+    service = ComposeService(max_jobs=1)
+    server = make_server(address, service)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        assert stat.S_IMODE(os.stat(tmp_path / "compose.sock").st_mode) == 0o600
+        marker = tmp_path / "marker"
+        job = {"asset_info_path": f"touch {marker}", "asset_alembic_path": str(tmp_path / "missing.abc"),
+               "usd_base_location": str(tmp_path), "asset_type": "Prop", "asset_name": "Tree", "looks_reader": "os:system"}
+        refused = request(address, {"op": "compose", "job": job}, timeout=10)
+        assert not refused["ok"] and "looks_reader" in refused["error"]
+        refused = request(address, {"op": "compose", "job": dict(job, looks_reader={"os": "system"})}, timeout=10)
+        assert not refused["ok"]
+        assert not marker.exists() and request(address, {"op": "stats"}, timeout=10)["stats"]["submitted"] == 0
+    finally:
+        server.shutdown()
+        server.server_close()
+        service.shutdown()
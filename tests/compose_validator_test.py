@@ -0,0 +1,81 @@
+import os
+
+import pytest
+
+from ..app_modules.usd.composers.ptx_compose_validator import (composed_layer_paths, resolve_prim, validate_layers,
+                                                                _LayerCache, _list_folder, _texture_exists)
+
+
+def test_texture_lookup_lists_each_folder_once(tmp_path):
+    for name in ("base.exr", "skin.1001.exr", "skin.1002.exr"):
+        (tmp_path / name).write_text("")
+    (tmp_path / "sub").mkdir()
+    listings = {str(tmp_path): _list_folder(str(tmp_path)), str(tmp_path / "gone"): _list_folder(str(tmp_path / "gone"))}
+
+    assert listings[str(tmp_path)] == {"base.exr", "skin.1001.exr", "skin.1002.exr"}
+    assert _texture_exists(str(tmp_path / "base.exr"), listings)
+    assert _texture_exists(str(tmp_path / "skin.<UDIM>.exr"), listings)
+    assert not _texture_exists(str(tmp_path / "eyes.<UDIM>.exr"), listings)
+    assert not _texture_exists(str(tmp_path / "sub"), listings)
+    assert not _texture_exists(str(tmp_path / "gone" / "base.exr"), listings)
+
+
+def _composed_asset(tmp_path, monkeypatch):
+    pytest.importorskip("pxr")
+    pytest.importorskip("chitragupta")
+    from ..app_modules.usd.composers import ptx_base_composer as pbc
+    from ..benchmarks import synthetic_assets as sa
+
+    compose_args = sa.generate_asset((tmp_path / "asset").as_posix(), 8, 2, texture_density=1.0, asset_name="Checked")
+    pbc.compose_pfx_usd(**compose_args, looks_reader=sa.read_looks_info)
+    paths = composed_layer_paths(compose_args["usd_base_location"], "Prop", "Checked")
+    luk_folder = os.path.dirname(paths["luk"])
+    for record in sa.read_looks_info(compose_args["asset_info_path"]):
+        for param in record["parameters"]:
+            if "texture" in param:
+                os.makedirs(os.path.join(luk_folder, "textures"), exist_ok=True)
+                open(os.path.join(luk_folder, param["texture"]["path"]), 'w').close()
+    monkeypatch.chdir(tmp_path)
+    return compose_args, paths
+
+
+def test_a_composed_asset_validates(tmp_path, monkeypatch):
+    _, paths = _composed_asset(tmp_path, monkeypatch)
+    report = validate_layers(paths["geo"], paths["luk"])
+    assert report["ok"], report
+    assert report["checks"]["payloads"]["checked"] == 8 and report["checks"]["bindings"]["checked"] > 8
+    assert report["checks"]["textures"]["checked"] > 0 and report["checks"]["textures"]["unverified"] == 0
+
+
+def test_missing_meshes_and_materials_are_reported(tmp_path, monkeypatch):
+    from pxr import Sdf
+
+    from ..benchmarks import synthetic_assets as sa
+
+    compose_args, paths = _composed_asset(tmp_path, monkeypatch)
+    standin = Sdf.Layer.FindOrOpen(compose_args["asset_alembic_path"])
+    del standin.GetPrimAtPath("/root/render_GRP/grp_0").nameChildren["mesh_0"]
+    standin.Save()
+    luk_layer = Sdf.Layer.FindOrOpen(paths["luk"])
+    del luk_layer.GetPrimAtPath("/Looks").nameChildren["mat_1_MTL"]
+    luk_layer.Save()
+    # The textures are search relative, eg: textures/x.exr; a missing one is looked up next to the looks layer,
+    # not in the cwd
+    texture = next(param["texture"]["path"] for param in sa.read_looks_info(compose_args["asset_info_path"])[0]["parameters"]
+                   if "texture" in param)
+    os.remove(os.path.join(os.path.dirname(paths["luk"]), texture))
+    os.makedirs(tmp_path / "textures", exist_ok=True)
+    open(tmp_path / texture, 'w').close()
+
+    report = validate_layers(paths["geo"], paths["luk"])
+    payload_errors = report["checks"]["payloads"]["errors"]
+    assert not report["ok"] and [error["path"] for error in payload_errors] == ["/Checked/mesh_0Shape"]
+    assert {error["target"] for error in report["checks"]["bindings"]["errors"]} == {"/Looks/mat_1_MTL"}
+    texture_errors = report["checks"]["textures"]["errors"]
+    assert [error["target"] for error in texture_errors] == [os.path.join(os.path.dirname(paths["luk"]), texture)]
+
+    geo_layer = Sdf.Layer.FindOrOpen(paths["geo"])
+    layers = _LayerCache()
+    assert resolve_prim(layers, geo_layer, Sdf.Path("/Looks/mat_0_MTL"))
+    assert not resolve_prim(layers, geo_layer, Sdf.Path("/Looks/mat_1_MTL"))
+    assert resolve_prim(layers, geo_layer, Sdf.Path("/Looks/mat_0_MTL"), max_arc_depth=0) is None
@@ -0,0 +1,52 @@
+import json
+
+import pytest
+
+pytest.importorskip("pxr")
+pytest.importorskip("chitragupta")
+
+from pxr import Sdf
+
+from ..app_modules.usd.composers import ptx_base_composer as pbc
+from ..benchmarks import synthetic_assets as sa
+
+
+def _prim_paths(layer_path):
+    layer = Sdf.Layer.FindOrOpen(layer_path)
+    layer.Reload()
+    paths = []
+    layer.Traverse(Sdf.Path.absoluteRootPath, lambda path: paths.append(path.pathString) if path.IsPrimPath() else None)
+    return sorted(paths)
+
+
+def _layers(compose_args):
+    base, name = compose_args["usd_base_location"], f"{compose_args['asset_type']}_{compose_args['asset_name']}"
+    return {"geo": f"{base}/GEO_{name}.usda", "luk": f"{base}/LUK_{name}/LUK_{name}.usda"}
+
+
+@pytest.mark.parametrize("backend", ["usd", "sdf"])
+def test_recompose_matches_a_fresh_compose(tmp_path, backend):
+    options = {"backend": backend, "share_textures": True, "incremental": True, "looks_reader": sa.read_looks_info}
+    compose_args = sa.generate_asset((tmp_path / "recompose").as_posix(), 24, 6, texture_density=1.0, asset_name=f"Inc{backend}")
+    pbc.compose_pfx_usd(**compose_args, **options)
+
+    # Retexture one material and drop another, meshes and all
+    records = sa.read_looks_info(compose_args["asset_info_path"])
+    for param in records[0]["parameters"]:
+        if "texture" in param:
+            param["texture"]["path"] = param["texture"]["path"].replace("textures/", "textures/v2/")
+    del records[1]
+    with open(compose_args["asset_info_path"], 'w') as file:
+        json.dump(records, file)
+    pbc.compose_pfx_usd(**compose_args, **options)
+
+    fresh_args = sa.generate_asset((tmp_path / "fresh").as_posix(), 24, 6, texture_density=1.0, asset_name=f"Inc{backend}")
+    with open(fresh_args["asset_info_path"], 'w') as file:
+        json.dump(records, file)
+    pbc.compose_pfx_usd(**fresh_args, **options)
+
+    recomposed, fresh = _layers(compose_args), _layers(fresh_args)
+    assert _prim_paths(recomposed["luk"]) == _prim_paths(fresh["luk"])
+    assert _prim_paths(recomposed["geo"]) == _prim_paths(fresh["geo"])
+    assert any("/SharedTextures/" in path for path in _prim_paths(recomposed["luk"]))
+    assert "/Looks/mat_1_MTL" not in _prim_paths(recomposed["luk"])
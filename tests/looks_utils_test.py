@@ -0,0 +1,122 @@
+import json
+
+import pytest
+
+from ..app_modules.usd.composers.ptx_looks_utils import (material_digest, merge_identical_materials, payload_layout,
+                                                           compose_manifest, diff_manifests, split_shards,
+                                                           iter_looks_info, BindingCompiler)
+
+
+def _material(name, meshes, base=0.8, texture=None):
+    params = [{"name": "base", "value": base}, {"name": "baseColor", "value": [1, 0.5, 0.25]}]
+    if texture:
+        params[1]["texture"] = {"path": texture}
+    return {"material_type": "aiStandardSurface", "shader_name": name, "meshes": meshes,
+            "parameters": params, "sg_node": f"{name}SG"}
+
+
+def test_identical_materials_are_merged():
+    mat_list = [_material("a_MTL", ["|r|m1|m1Shape"]),
+                _material("b_MTL", ["|r|m2|m2Shape", "|r|m1|m1Shape"], base=0.8000000001),
+                _material("c_MTL", ["|r|m3|m3Shape"], texture="tex/base.exr"),
+                _material("d_MTL", ["|r|m4|m4Shape"], base=0.5)]
+
+    merged = merge_identical_materials(mat_list)
+    assert [mat["shader_name"] for mat in merged] == ["a_MTL", "c_MTL", "d_MTL"]
+    assert merged[0]["meshes"] == ["|r|m1|m1Shape", "|r|m2|m2Shape"]
+    assert merged[0]["merged_names"] == ["a_MTL", "b_MTL"]
+    assert "merged_names" not in merged[1]
+    assert mat_list[0]["meshes"] == ["|r|m1|m1Shape"]
+
+
+def test_digest_ignores_parameters_outside_the_export_list():
+    first, second = _material("a_MTL", []), _material("b_MTL", [])
+    second["parameters"].append({"name": "aiUnexported", "value": 1.0})
+    assert material_digest(first, ["base", "baseColor"]) == material_digest(second, ["base", "baseColor"])
+    assert material_digest(first) != material_digest(second)
+
+
+def test_payload_layout():
+    mesh = "|root|render_GRP|grp_3|mesh_42|mesh_42Shape"
+    assert payload_layout(mesh, "Tree", "group") == ("/Tree/render_GRP", "/Tree/render_GRP", "/Tree/render_GRP/grp_3/mesh_42")
+    assert payload_layout(mesh, "Tree", "group", 2)[0] == "/Tree/render_GRP/grp_3"
+    assert payload_layout(mesh, "Tree", "group", 9)[0] == "/Tree/render_GRP/grp_3/mesh_42"
+    assert payload_layout(mesh, "Tree", "asset")[:2] == ("/Tree", "/Tree")
+
+
+def test_manifest_diff_only_reports_what_changed():
+    options = {"payload_granularity": "mesh", "payload_group_depth": 1}
+    looks = [_material("a_MTL", ["|r|g|m1|m1Shape"]), _material("b_MTL", ["|r|g|m2|m2Shape"]),
+             _material("c_MTL", ["|r|g|m3|m3Shape"])]
+    old = compose_manifest(looks, "Tree", options)
+    assert old["payload_prims"] == ["/Tree/m1Shape", "/Tree/m2Shape", "/Tree/m3Shape"]
+
+    tweaked = [_material("a_MTL", ["|r|g|m1|m1Shape"], base=0.1), _material("b_MTL", ["|r|g|m2|m2Shape", "|r|g|m4|m4Shape"])]
+    changes = diff_manifests(old, compose_manifest(tweaked, "Tree", options))
+    assert not changes["full"]
+    assert changes["changed"] == {"a_MTL", "b_MTL"}
+    assert changes["removed"] == {"c_MTL"}
+    assert changes["stale_payloads"] == ["/Tree/m3Shape"]
+
+    assert diff_manifests(old, compose_manifest(looks, "Tree", options))["changed"] == set()
+    regrouped = diff_manifests(old, compose_manifest(looks, "Tree", dict(options, payload_granularity="asset")))
+    assert regrouped["full"] and regrouped["changed"] == {"a_MTL", "b_MTL", "c_MTL"}
+    assert diff_manifests(None, old)["changed"] == {"a_MTL", "b_MTL", "c_MTL"}
+
+
+def test_split_shards_keeps_order_and_balances():
+    mat_list = [_material(f"m{index}_MTL", []) for index in range(10)]
+    shards = split_shards(mat_list, 3)
+    assert [len(shard) for shard in shards] == [4, 3, 3]
+    assert [mat for shard in shards for mat in shard] == mat_list
+    assert len(split_shards(mat_list[:2], 8)) == 2
+    assert split_shards([], 4) == []
+
+
+def test_iter_looks_info_streams_arrays_and_json_lines(tmp_path):
+    mat_list = [_material(f"m{index}_MTL", [f"|r|m{index}|m{index}Shape"], texture="tex/a.exr") for index in range(5)]
+    array_path, lines_path = tmp_path / "looks.json", tmp_path / "looks.jsonl"
+    array_path.write_text(json.dumps(mat_list, indent=2))
+    lines_path.write_text("\n".join(json.dumps(mat) for mat in mat_list) + "\n")
+
+    assert list(iter_looks_info(str(array_path), chunk_size=16)) == mat_list
+    assert list(iter_looks_info(str(lines_path), chunk_size=7)) == mat_list
+
+    lines_path.write_text(json.dumps(mat_list)[:-20])
+    with pytest.raises(ValueError):
+        list(iter_looks_info(str(lines_path), chunk_size=64))
+
+
+def test_binding_compiler_collapses_fully_covered_groups():
+    compiler = BindingCompiler(["/A/body/arm", "/A/body/leg", "/A/head/eye_L", "/A/head/eye_R", "/A/head/teeth/top"])
+    assert compiler.compile(["/A/body/leg", "/A/body/arm", "/A/head/eye_L"]) == ["/A/body", "/A/head/eye_L"]
+    assert compiler.compile(["/A/head/teeth/top", "/A/head/eye_R", "/A/head/eye_L"]) == ["/A/head"]
+    # The asset root is never included, even when all of its meshes are covered
+    assert compiler.compile(["/A/body/arm", "/A/body/leg", "/A/head/eye_L", "/A/head/eye_R", "/A/head/teeth/top"]) == ["/A/body", "/A/head"]
+    assert BindingCompiler(["/A/rockShape", "/A/treeShape"]).compile(["/A/rockShape", "/A/treeShape"]) == ["/A/rockShape", "/A/treeShape"]
+    # Meshes outside the hierarchy never collapse into a group
+    assert compiler.compile(["/A/body/arm", "/A/body/tail"]) == ["/A/body/arm", "/A/body/tail"]
+    assert compiler.digest() != BindingCompiler(["/A/body/arm"]).digest()
+
+
+def test_collapsed_bindings_leave_meshes_the_looks_info_doesnt_list_unbound(tmp_path):
+    pytest.importorskip("pxr")
+    pytest.importorskip("chitragupta")
+    from pxr import Usd, UsdGeom, UsdShade
+
+    from ..app_modules.usd.composers import ptx_base_composer as pbc
+    from ..benchmarks import synthetic_assets as sa
+
+    compose_args = sa.generate_asset(tmp_path.as_posix(), 8, 1, num_groups=2, asset_name="Collapsed")
+    records = sa.read_looks_info(compose_args["asset_info_path"])
+    unlisted = records[0]["meshes"].pop()
+    with open(compose_args["asset_info_path"], 'w') as file:
+        json.dump(records, file)
+    pbc.compose_pfx_usd(**compose_args, looks_reader=sa.read_looks_info, payload_granularity="group", collapse_bindings=True)
+
+    stage = Usd.Stage.Open(f"{compose_args['usd_base_location']}/GEO_Prop_Collapsed.usda", Usd.Stage.LoadAll)
+    materials, _ = UsdShade.MaterialBindingAPI.ComputeBoundMaterials(
+        [prim for prim in stage.Traverse() if prim.IsA(UsdGeom.Mesh)])
+    assert len(materials) == 8 and sum(1 for mtl in materials if mtl) == 7
+    unlisted_path = "/Collapsed/" + "/".join(unlisted.split("|")[2:-1])
+    assert not UsdShade.MaterialBindingAPI(stage.GetPrimAtPath(unlisted_path)).ComputeBoundMaterial()[0]
@@ -0,0 +1,77 @@
+from pathlib import Path
+
+from ..core.ptx_publish_factory import Publish, AssetInfo
+from ..core.ptx_publish_cache import PublishCache
+
+
+class CountingPublish(Publish):
+    runs = 0
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.asset = AssetInfo(*args)
+
+    def publish(self):
+        CountingPublish.runs += 1
+        self.out_file = self.publish_kwargs['out_file']
+        with open(self.out_file, 'w') as file:
+            source = Path(self.publish_kwargs['source_files'][0])
+            file.write(f"cache of {source.read_text() if source.exists() else ''}")
+        self.publish_info['frames'] = [1, 1]
+        self.publish_state = 2
+
+
+def _publish(tmp_path, **kwargs):
+    return CountingPublish('Alien', 'Character', 'mdl', out_file=str(tmp_path / "out.abc"),
+                           source_files=[str(tmp_path / "scene.ma")], **kwargs)
+
+
+def test_unchanged_inputs_are_reused(tmp_path):
+    (tmp_path / "scene.ma").write_text("v1")
+    cache = PublishCache(tmp_path / "cache")
+    CountingPublish.runs = 0
+
+    assert _publish(tmp_path).publish_cached(cache) == 2
+    second = _publish(tmp_path)
+    assert second.publish_cached(cache) == 2
+    assert CountingPublish.runs == 1
+    assert second.out_file == str(tmp_path / "out.abc")
+    assert second.publish_info == {'frames': [1, 1]}
+
+    # A changed source file, different kwargs or a bypass all run the publish again
+    (tmp_path / "scene.ma").write_text("v2")
+    _publish(tmp_path).publish_cached(cache)
+    _publish(tmp_path, frame_range=[1, 10]).publish_cached(cache)
+    _publish(tmp_path).publish_cached(cache, bypass=True)
+    assert CountingPublish.runs == 4
+
+
+def test_store_is_bounded(tmp_path):
+    cache = PublishCache(tmp_path / "cache", max_entries=2)
+    for idx in range(4):
+        _publish(tmp_path, take=idx).publish_cached(cache)
+    assert len(list((tmp_path / "cache").glob("*.json"))) == 2
+
+
+def test_outputs_written_over_by_another_publish_are_a_miss(tmp_path):
+    cache = PublishCache(tmp_path / "cache")
+    CountingPublish.runs = 0
+    for version in ("v1", "v2", "v1"):
+        (tmp_path / "scene.ma").write_text(version)
+        _publish(tmp_path).publish_cached(cache)
+
+    assert CountingPublish.runs == 3
+    assert (tmp_path / "out.abc").read_text() == "cache of v1"
+
+
+def test_uncacheable_inputs_always_publish(tmp_path):
+    (tmp_path / "scene.ma").write_text("v1")
+    cache = PublishCache(tmp_path / "cache")
+    CountingPublish.runs = 0
+    for _ in range(2):
+        publish = _publish(tmp_path)
+        publish.cacheable = lambda: False
+        publish.publish_cached(cache)
+
+    assert CountingPublish.runs == 2
+    assert not list((tmp_path / "cache").glob("*.json"))
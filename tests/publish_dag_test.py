@@ -0,0 +1,41 @@
+import pytest
+
+from ..core.ptx_batch_publish import load_manifest
+from ..core.ptx_publish_dag import build_dag, critical_path, descendants
+
+__DEPS__ = {"maya": {"mshc": [], "mshp": ["mshc"], "mshi": ["mshp"], "lukp": []}}
+
+
+def _jobs():
+    return load_manifest({
+        "defaults": {"app": "maya"},
+        "assets": [
+            {"asset_name": "Alien", "asset_type": "Character", "asset_process": "mdl",
+             "publishes": ["mshc", "mshp", "mshi", "lukp"]},
+            {"asset_name": "Rock", "asset_type": "Prop", "asset_process": "mdl",
+             "publishes": ["mshc", {"type": "mshp", "depends_on": ["Alien:maya:lukp"]}]},
+        ]
+    })
+
+
+def test_declared_dependencies_stay_within_an_asset():
+    dag = build_dag(_jobs(), __DEPS__)
+    assert dag["Alien:maya:mshp"] == ["Alien:maya:mshc"]
+    assert dag["Alien:maya:lukp"] == []
+    assert dag["Rock:maya:mshp"] == ["Alien:maya:lukp", "Rock:maya:mshc"]
+    assert sorted(descendants(dag, "Alien:maya:mshc")) == ["Alien:maya:mshi", "Alien:maya:mshp"]
+
+
+def test_cycles_are_rejected():
+    deps = {"maya": {"mshc": ["mshp"], "mshp": ["mshc"]}}
+    with pytest.raises(ValueError):
+        build_dag(_jobs(), deps)
+
+
+def test_critical_path():
+    dag = build_dag(_jobs(), __DEPS__)
+    durations = {"Alien:maya:mshc": 10.0, "Alien:maya:mshp": 2.0, "Alien:maya:mshi": 1.0,
+                 "Alien:maya:lukp": 4.0, "Rock:maya:mshc": 1.0, "Rock:maya:mshp": 3.0}
+    path, total = critical_path(dag, durations)
+    assert path == ["Alien:maya:mshc", "Alien:maya:mshp", "Alien:maya:mshi"]
+    assert total == 13.0
@@ -0,0 +1,55 @@
+from ..core.ptx_publish_factory import Publish, AssetInfo
+from ..core.ptx_publish_journal import PublishJournal, journaled_publish
+
+
+class MeshCachePublish(Publish):
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.asset = AssetInfo(*args)
+
+    def publish(self):
+        self.out_file = self.publish_kwargs['out_file']
+        with open(self.out_file, 'w') as file:
+            file.write("mesh cache")
+        self.publish_info = {'version': self.publish_kwargs['version']}
+        self.publish_state = self.publish_kwargs.get('state', 2)
+
+
+def test_latest_successful_publish(tmp_path):
+    journal = PublishJournal(tmp_path / "journal.db", flush_interval=0.01)
+    for version, state in ((1, 2), (2, 2), (3, 0)):
+        pub = MeshCachePublish('Alien', 'Character', 'mdl', out_file=str(tmp_path / f"v{version}.abc"),
+                               version=version, state=state)
+        journaled_publish(pub, journal, "mshc")
+    journal.record_result({"job_id": "Tree:maya:mshc", "pub_type": "mshc", "asset": ["Tree", "Prop", "mdl"],
+                           "publish_state": 2, "publish_info": {}, "out_file": "", "duration": 1.5})
+    journal.flush()
+
+    latest = journal.latest("Alien", "mshc")
+    assert latest["version"] == "2"
+    assert latest["bytes_out"] == len("mesh cache")
+    assert latest["outputs"] == [str(tmp_path / "v2.abc")]
+    assert journal.latest("Alien", "mshc", min_state=0)["version"] == "3"
+    assert journal.latest("Alien", "mshp") is None
+    assert len(journal.history("Alien")) == 3
+    assert journal.history("Tree", "mshc")[0]["duration"] == 1.5
+    journal.close()
+
+
+def test_batch_results_are_journaled_with_the_job_version(tmp_path):
+    from ..app_modules.usd.composers.ptx_batch_compose import load_compose_manifest, run_compose_job
+    from ..core.ptx_batch_publish import PublishJob, run_publish_job
+
+    journal = PublishJournal(tmp_path / "journal.db", flush_interval=0.01)
+    journal.record_result(run_publish_job(PublishJob("Tree:maya:nope", "maya", "nope", ["Tree", "Prop", "mdl"],
+                                                     kwargs={"version": 7})))
+    compose_job = load_compose_manifest({"assets": [{"asset_info_path": "", "asset_alembic_path": "", "usd_base_location": "",
+                                                     "asset_type": "Prop", "asset_name": "Tree", "asset_base_prim_path": "/root",
+                                                     "version": "v003"}]})[0]
+    assert compose_job.version == "v003" and "version" not in compose_job.kwargs
+    journal.record_result(run_compose_job(compose_job))
+    journal.flush()
+
+    assert journal.latest("Tree", "nope", min_state=0, version=7)["version"] == "7"
+    assert journal.latest("Tree", "usd_compose", min_state=0, version="v003")["state"] == 0
+    journal.close()
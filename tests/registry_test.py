@@ -0,0 +1,38 @@
+import json
+
+from ..core.ptx_module_registry import PtxModuleRegistry
+
+
+def test_config_is_parsed_once(tmp_path):
+    conf_path = tmp_path / "test.conf"
+    conf_path.write_text(json.dumps({"maya": {"mshc": "ptx_mesh_cache"}}))
+
+    registry = PtxModuleRegistry()
+    conf = registry.config(str(conf_path))
+    conf_path.write_text(json.dumps({"maya": {}}))
+    assert registry.config(str(conf_path)) is conf
+
+    registry.invalidate(conf_path=str(conf_path))
+    assert registry.config(str(conf_path)) == {"maya": {}}
+
+
+def test_module_and_builder_are_cached():
+    registry = PtxModuleRegistry()
+    mod_spec = registry.find_spec("ptx_publish.app_modules.blender.ptx_mdl_publish")
+    assert registry.find_spec("ptx_publish.app_modules.blender.ptx_mdl_publish") is mod_spec
+
+    builder_cls = registry.builder(mod_spec, "PtxMdlPublishBuilder")
+    assert registry.builder(mod_spec, "PtxMdlPublishBuilder") is builder_cls
+    assert registry.load_module(mod_spec) is registry.load_module(mod_spec)
+
+    publish = builder_cls()('muks', 'hero', 'mdl', 'root', ['geom1'])
+    assert publish.asset.geom_list == ['geom1']
+
+
+def test_invalidate_reloads_module():
+    registry = PtxModuleRegistry()
+    mod_spec = registry.find_spec("ptx_publish.app_modules.blender.ptx_mdl_publish")
+    builder_cls = registry.builder(mod_spec, "PtxMdlPublishBuilder")
+
+    registry.invalidate(mod_name=mod_spec.name)
+    assert registry.builder(mod_spec, "PtxMdlPublishBuilder") is not builder_cls
@@ -0,0 +1,61 @@
+from dataclasses import FrozenInstanceError, InitVar, dataclass, field
+
+import pytest
+
+from ..app_modules.usd.shaders import shader_inputs as si
+
+
+@dataclass
+class _Attribute:
+    name: str = ''
+    value: float = 0.0
+
+
+@si.shader_inputs
+@dataclass
+class _Material:
+    name: str = ''
+    base: InitVar[_Attribute] = None
+    coat: InitVar[_Attribute] = None
+    _inputs: dict = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self, *inputs):
+        si.set_inputs(self, inputs)
+
+
+def test_only_the_inputs_that_were_set_are_held():
+    untouched = _Material(name="a")
+    assert _Material.__shader_inputs__ == ("base", "coat")
+    assert untouched.coat.name == "coat" and untouched.coat.value == 0.0
+    assert untouched._inputs is None and untouched.coat is _Material(name="c").coat
+
+    material = _Material(name="b", base=_Attribute(value=0.5))
+    assert list(si.authored_inputs(material)) == ["base"]
+    assert material.base.name == "base" and material.base.value == 0.5
+
+    with pytest.raises(FrozenInstanceError):
+        material.coat.value = 1.0
+    si.edit_input(material, "coat").value = 1.0
+    assert material.coat.value == 1.0 and _Material(name="c").coat.value == 0.0
+
+    material.base = None
+    assert list(si.authored_inputs(material)) == ["coat"]
+
+
+def test_inputs_take_part_in_eq_and_repr():
+    assert _Material(name="a") == _Material(name="a")
+    assert _Material(name="a", base=_Attribute(value=0.0)) == _Material(name="a")
+    assert _Material(name="a", base=_Attribute(value=0.5)) != _Material(name="a")
+    assert repr(_Material(name="a", coat=_Attribute(value=0.5))) == \
+        "_Material(name='a', base=_Attribute(name='base', value=0.0), coat=_Attribute(name='coat', value=0.5))"
+
+
+def test_mtlx_param_types_resolves_the_standard_surface_inputs():
+    pytest.importorskip("chitragupta")
+    from ..app_modules.usd.composers import ptx_base_composer as pbc
+    from ..app_modules.usd.shaders.phantom_standard_matx import PhantomUsdMaterialX
+
+    param_types = pbc.mtlx_param_types()
+    assert param_types
+    assert {input_name for input_name, _ in param_types.values()} <= set(PhantomUsdMaterialX.__shader_inputs__)
+    assert param_types["baseColor"][0] == "base_color"
@@ -0,0 +1,69 @@
+import shutil
+
+import pytest
+
+pytest.importorskip("pxr")
+
+from pxr import Sdf
+
+from ..app_modules.usd.composers import ptx_base_composer as pbc
+from ..app_modules.usd.composers import ptx_stage_pool as psp
+
+
+def _layer(path, prim="root", payload=None):
+    lines = ['#usda 1.0', '', f'def Xform "{prim}"' + (f' (\n    prepend payload = @{payload}@\n)' if payload else ''), '{', '}', '']
+    path.write_text("\n".join(lines))
+    return path.as_posix()
+
+
+def test_pool_evicts_least_recently_used_by_count_and_memory(tmp_path):
+    paths = [_layer(tmp_path / f"{name}.usda") for name in "abc"]
+    pool = psp.StagePool(max_stages=2)
+    first = pool.open(paths[0])
+    assert pool.open(paths[0]) is first
+    pool.open(paths[1])
+    pool.open(paths[0])
+    pool.open(paths[2])
+
+    assert len(pool) == 2 and pool.evictions == 1
+    assert pool.open(paths[0]) is first
+    assert pool.stats()["hits"] == 3 and pool.stats()["misses"] == 3
+
+    pool = psp.StagePool(max_stages=8, max_memory_mb=1e-9)
+    for path in paths:
+        pool.open(path)
+    assert len(pool) == 1 and pool.evictions == 2
+
+
+def test_pool_reloads_layers_rewritten_on_disk(tmp_path):
+    root = _layer(tmp_path / "asset.usda", "before")
+    pool = psp.StagePool()
+    stage = pool.open(root)
+    assert stage.GetPrimAtPath("/before")
+
+    # A layer of a different size, as another worker would write it
+    _layer(tmp_path / "asset.usda", "after_the_rewrite")
+    stage = pool.open(root)
+    assert stage.GetPrimAtPath("/after_the_rewrite") and not stage.GetPrimAtPath("/before")
+    assert pool.stats()["hits"] == 1
+
+
+def test_layers_deleted_from_disk_can_be_created_again(tmp_path):
+    out_dir = tmp_path / "usd"
+    out_dir.mkdir()
+    payload = _layer(out_dir / "Payload_Prop_A.usda", "A")
+    geo = _layer(out_dir / "GEO_Prop_A.usda", "A", payload="./Payload_Prop_A.usda")
+    pool = psp.StagePool()
+    psp.set_active_pool(pool)
+    try:
+        assert pbc.usd_stage(geo).GetPrimAtPath("/A")
+        pbc.usd_stage(payload)
+
+        shutil.rmtree(out_dir)
+        out_dir.mkdir()
+        stage = pbc.usd_stage(payload)
+        stage.DefinePrim("/B")
+        stage.Save()
+        assert len(pool) == 1 and Sdf.Layer.FindOrOpen(payload).GetPrimAtPath("/B")
+    finally:
+        psp.set_active_pool(None)
@@ -0,0 +1,108 @@
+import json
+
+import pytest
+
+from ..core import ptx_trace
+
+
+@pytest.fixture
+def tracing():
+    was_on, max_events = ptx_trace.is_tracing(), ptx_trace._TraceState.events.maxlen
+    ptx_trace.clear_trace()
+    ptx_trace.enable_tracing()
+    yield
+    ptx_trace.enable_tracing(max_events)
+    if not was_on:
+        ptx_trace.disable_tracing()
+    ptx_trace.clear_trace()
+
+
+def test_span_records_its_name_asset_and_args(tracing):
+    with ptx_trace.span("usd_create_mtlx", asset="Alien", material="skin_MTL") as spn:
+        spn.set(prims=3)
+    with pytest.raises(ValueError):
+        with ptx_trace.span("usd_save"):
+            raise ValueError("bad layer")
+
+    first, second = ptx_trace.trace_events()
+    assert first["name"] == "usd_create_mtlx" and first["asset"] == "Alien" and first["duration_ns"] >= 0
+    assert first["args"] == {"material": "skin_MTL", "prims": 3}
+    assert second["args"] == {"error": "ValueError"}
+
+
+def test_spans_are_shared_no_ops_when_tracing_is_off(tracing):
+    ptx_trace.disable_tracing()
+    spn = ptx_trace.span("usd_save", asset="Alien")
+    assert spn is ptx_trace.span("other")
+    with spn:
+        spn.set(prims=3)
+    assert ptx_trace.trace_events() == []
+
+
+def test_subclass_methods_are_traced_once(tracing):
+    class _Base:
+        def __init_subclass__(cls, **kwargs):
+            super().__init_subclass__(**kwargs)
+            ptx_trace.trace_subclass_method(cls, "publish")
+
+    class _Asset:
+        asset_name = "Alien"
+
+    class _Publish(_Base):
+        asset = _Asset()
+
+        def publish(self):
+            return 2
+
+    class _Derived(_Publish):
+        pass
+
+    assert _Publish().publish() == 2 and _Derived().publish() == 2
+    assert [evt["name"] for evt in ptx_trace.trace_events()] == ["_Publish.publish", "_Derived.publish"]
+    assert ptx_trace.trace_events()[0]["asset"] == "Alien"
+    assert _Publish.publish.__name__ == "publish"
+
+
+def test_chrome_trace_uses_complete_events_in_microseconds(tracing, tmp_path):
+    with ptx_trace.span("usd_save", asset="Alien", layer="GEO"):
+        pass
+    evt = ptx_trace.trace_events()[0]
+    trace = ptx_trace.to_chrome_trace()
+    assert trace["displayTimeUnit"] == "ms"
+    assert trace["traceEvents"] == [{"name": "usd_save", "cat": "ptx", "ph": "X", "ts": evt["start_ns"] / 1000.0,
+                                     "dur": evt["duration_ns"] / 1000.0, "pid": evt["pid"], "tid": evt["tid"],
+                                     "args": {"asset": "Alien", "layer": "GEO"}}]
+
+    out_path = ptx_trace.export_chrome_trace((tmp_path / "trace.json").as_posix(), drain=True)
+    with open(out_path) as file:
+        assert json.load(file) == trace
+    assert ptx_trace.trace_events() == []
+
+
+def test_only_the_latest_spans_are_kept(tracing):
+    ptx_trace.enable_tracing(max_events=3)
+    for idx in range(5):
+        with ptx_trace.span(f"span_{idx}"):
+            pass
+    assert [evt["name"] for evt in ptx_trace.trace_events()] == ["span_2", "span_3", "span_4"]
+    assert ptx_trace.dropped_events() == 2
+
+
+def test_factory_spans_record_the_asset_they_create_for(tracing):
+    class _AssetInfo:
+        asset_name = "Rock"
+
+    assert ptx_trace.call_asset(("Alien", "Character", "mdl"), {}) == "Alien"
+    assert ptx_trace.call_asset((_AssetInfo(),), {}) == "Rock"
+    assert ptx_trace.call_asset(("MtlX", []), {"asset_name": "Tree"}, positional=False) == "Tree"
+    assert ptx_trace.call_asset(("MtlX", []), {}, positional=False) == ""
+
+    with ptx_trace.span("compose_pfx_usd", asset="Alien"):
+        with ptx_trace.span("PhantomUsdFactory.create", ptx_trace.call_asset(("MtlX", []), {}, positional=False)):
+            pass
+        with ptx_trace.span("usd_save", asset="Rock"):
+            pass
+    with ptx_trace.span("after"):
+        pass
+    assert [(evt["name"], evt["asset"]) for evt in ptx_trace.trace_events()] == [
+        ("PhantomUsdFactory.create", "Alien"), ("usd_save", "Rock"), ("compose_pfx_usd", "Alien"), ("after", "")]